@@ -0,0 +1,147 @@
+# Arquivo: core/acumulador.py
+import math
+from array import array
+
+import numpy as np
+import pandas as pd
+
+# Inteiro ausente (ou inválido) nas colunas "inteiro"
+_INTEIRO_VAZIO = -2 ** 31
+
+
+class _Dicionario(dict):
+    """Valor -> código inteiro; valor novo recebe o próximo código, None e NaN ficam com -1."""
+
+    def __init__(self):
+        super().__init__({None: -1})
+
+    def __missing__(self, valor):
+        if valor != valor: return -1  # NaN
+        codigo = self[valor] = len(self) - 1
+        return codigo
+
+
+class TabelaColunar:
+    """
+    Acumula as linhas do lote por coluna, em vez de guardar um dict por linha até o
+    fim do processamento:
+    - colunas "numero" do esquema vão para um array('d') (8 bytes por valor) e as
+      "inteiro" (Item) para um array('i') (4 bytes);
+    - as demais são codificadas em dicionário: cada valor distinto é guardado uma
+      vez só (o CNPJ, a data e o nome do emitente repetidos em todos os itens da
+      nota, e entre notas, viram o mesmo objeto) e a linha guarda um código int32.
+    dataframe() entrega os números em float32 quando a conversão não perde nada
+    (colunas zeradas, quantidades inteiras) e em float64 nos demais casos; inteiros
+    em int32 (float64 se faltar algum valor); nas colunas codificadas, categorias
+    (pd.Categorical, códigos int8/int16) quando os valores se repetem ao menos duas
+    vezes em média; texto quase sem repetição (descrições) sai como coluna comum.
+    Linhas de uma fonte podem ser retiradas (duplicata substituída) até o dataframe().
+    """
+
+    def __init__(self, campos=(), colunas=None):
+        """
+        campos: registros do esquema (tipo de cada coluna; sem registro = texto).
+        colunas: guarda só estas colunas (padrão: todas as da primeira linha recebida).
+        """
+        self._tipos = {c.coluna: c.tipo for c in campos}
+        self._filtro = tuple(colunas) if colunas is not None else None
+        self._colunas = None
+        self._valores = []       # por coluna: array('d'), array('i') de inteiros ou de códigos
+        self._dicionarios = []   # por coluna: _Dicionario, "numero" ou "inteiro"
+        self._faixas = {}        # fonte -> (primeira linha, fim)
+        self._retiradas = []     # (primeira linha, fim) das fontes retiradas
+        self.linhas = 0
+
+    def _iniciar(self, colunas):
+        self._colunas = colunas
+        for col in colunas:
+            tipo = self._tipos.get(col)
+            self._valores.append(array('d') if tipo == "numero" else array('i'))
+            self._dicionarios.append(tipo if tipo in ("numero", "inteiro") else _Dicionario())
+
+    @staticmethod
+    def _numero(valor):
+        try:
+            return float(valor)
+        except (TypeError, ValueError):
+            return math.nan
+
+    @staticmethod
+    def _inteiro(valor):
+        try:
+            valor = int(valor)
+        except (TypeError, ValueError):
+            return _INTEIRO_VAZIO
+        return valor if _INTEIRO_VAZIO < valor < 2 ** 31 else _INTEIRO_VAZIO
+
+    def adicionar(self, fonte, linhas):
+        """Acrescenta as linhas (dicts com as mesmas colunas) extraídas de uma fonte."""
+        if not linhas: return
+        if self._colunas is None:
+            self._iniciar(self._filtro if self._filtro is not None else tuple(linhas[0]))
+
+        # Linhas do extrator já vêm na ordem das colunas: transpõe direto
+        if self._filtro is None and tuple(linhas[0]) == self._colunas:
+            colunas = zip(*(l.values() for l in linhas))
+        else:
+            colunas = ([l.get(c) for l in linhas] for c in self._colunas)
+
+        for valores, dicionario, coluna in zip(self._valores, self._dicionarios, colunas):
+            if dicionario == "inteiro":
+                valores.extend(map(TabelaColunar._inteiro, coluna))
+                continue
+            if dicionario != "numero":
+                valores.extend(map(dicionario.__getitem__, coluna))
+                continue
+            inicio = len(valores)
+            try:
+                valores.extend(coluna)
+            except TypeError:
+                # Valor não numérico (None, texto): converte um a um, o que falhar vira NaN
+                del valores[inicio:]
+                valores.extend(map(TabelaColunar._numero, coluna))
+
+        self._faixas[fonte] = (self.linhas, self.linhas + len(linhas))
+        self.linhas += len(linhas)
+
+    def remover(self, fonte):
+        """Retira as linhas de uma fonte já recebida (ex.: duplicata substituída)."""
+        faixa = self._faixas.pop(fonte, None)
+        if faixa is not None: self._retiradas.append(faixa)
+
+    def dataframe(self):
+        """Monta o DataFrame do que foi acumulado e esvazia a tabela."""
+        if not self._colunas: return pd.DataFrame()
+        manter = None
+        if self._retiradas:
+            manter = np.ones(self.linhas, dtype=bool)
+            for inicio, fim in self._retiradas: manter[inicio:fim] = False
+        n = self.linhas if manter is None else int(manter.sum())
+
+        dados = {}
+        for col, valores, dicionario in zip(self._colunas, self._valores, self._dicionarios):
+            if dicionario == "numero":
+                coluna = np.frombuffer(valores, dtype=np.float64) if valores else np.zeros(0)
+                if manter is not None: coluna = coluna[manter]
+                compacta = coluna.astype(np.float32)
+                # float32 só quando todos os valores voltam exatamente iguais
+                dados[col] = compacta if np.array_equal(compacta, coluna, equal_nan=True) else coluna
+                continue
+            codigos = np.frombuffer(valores, dtype=np.int32) if valores else np.zeros(0, dtype=np.int32)
+            if manter is not None: codigos = codigos[manter]
+            if dicionario == "inteiro":
+                vazios = codigos == _INTEIRO_VAZIO
+                dados[col] = np.where(vazios, np.nan, codigos) if vazios.any() else codigos
+                continue
+            distintos = list(dicionario)[1:]
+            if len(distintos) * 2 <= n:
+                dados[col] = pd.Categorical.from_codes(codigos, categories=pd.Index(distintos))
+            else:
+                # Código -1 (vazio) aponta para o None no fim da lista
+                dados[col] = np.array(distintos + [None], dtype=object)[codigos]
+
+        self._colunas = None
+        self._valores, self._dicionarios = [], []
+        self._faixas, self._retiradas = {}, []
+        self.linhas = 0
+        return pd.DataFrame(dados, copy=False)
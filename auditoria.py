@@ -0,0 +1,126 @@
+# Arquivo: core/auditoria.py
+import numpy as np
+import pandas as pd
+
+from core.esquema import CAMPOS_AUDITORIA
+import config
+
+# Identificação do item na aba de auditoria
+COLUNAS_ITEM = ("Chave de Acesso", "Numero NF", "Fornecedor/Emitente", "Item", "Produto", "CST")
+
+# Conferências de imposto do item: nome -> (base, alíquota, valor declarado)
+IMPOSTOS = {
+    "ICMS": ("Base Cálc. ICMS", "ALIQ. ICMS", "Valor ICMS"),
+    "ICMS ST": ("Base ST", "Aliq. ICMS ST", "Valor ICMS ST"),
+    "PIS": ("Base Pis", "Aliquota Pis", "Valor Pis"),
+    "COFINS": ("Base Cofins", "Aliquota Cofins", "Valor Cofins"),
+    "IPI": ("Base IPI", "Aliquota IPI", "Valor IPI"),
+}
+
+# Parcelas do item que compõem o vNF: (coluna, sinal)
+COMPOSICAO_NOTA = (
+    ("Valor Total", 1.0), ("Valor Desconto", -1.0), ("Valor Frete", 1.0), ("Valor Seguro", 1.0),
+    ("Outras Desp.", 1.0), ("Valor ICMS ST", 1.0), ("Valor FCP ST", 1.0), ("Valor IPI", 1.0),
+    ("IPI Devolvido", 1.0), ("Valor II", 1.0),
+)
+# Descontado do vNF só quando a nota indica (indDeduzDeson): vale o total com ou sem ele
+DESONERACAO = "ICMS Desonerado"
+
+# Colunas da tabela NFe que a auditoria lê
+COLUNAS_NFE = tuple(dict.fromkeys(
+    COLUNAS_ITEM + tuple(c for trio in IMPOSTOS.values() for c in trio)
+    + tuple(c for c, _ in COMPOSICAO_NOTA) + (DESONERACAO, "Valor Total Nota")
+))
+
+NOME_TABELA = "Auditoria Impostos"
+OK = "OK"
+DIVERGENCIA = "DIVERGÊNCIA"
+
+
+class AuditoriaFiscal:
+    """
+    Conferência dos impostos de todos os itens do lote, em operações de vetor
+    (NumPy) sobre as colunas da tabela NFe, sem laço por linha:
+    - ICMS, PIS, COFINS e IPI: Base x Alíquota contra o valor declarado;
+    - ICMS ST: Base ST x Aliq. ST menos o ICMS próprio contra o Valor ICMS ST;
+    - Total da nota: soma dos itens (produto - desconto + frete + seguro + outras
+      + ST + FCP-ST + IPI + IPI devolvido + II, menos o ICMS desonerado quando a nota
+      o deduz) contra o Valor Total Nota. Os itens de serviço (ISSQN) entram pelo
+      Valor Total, como o vServ no vNF. Fica fora o total da Reforma Tributária
+      (vNFTot, com CBS/IBS), que não é o Valor Total Nota.
+    Cada imposto só é conferido quando o item traz base ou alíquota (tributação por
+    quantidade e isenções ficam de fora). O ICMS do diferimento (CST 51) e o ST do
+    Simples Nacional (CSOSN, sem ICMS próprio destacado) também não são conferidos.
+    As diferenças (declarado - calculado) acima da tolerância, em reais, marcam o item
+    como "DIVERGÊNCIA: <impostos>"; os demais saem "OK". Notas canceladas (coluna
+    Situação preenchida) ficam de fora, como no resumo.
+    """
+
+    @staticmethod
+    def _numeros(df, coluna):
+        if coluna not in df.columns: return np.zeros(len(df))
+        return pd.to_numeric(df[coluna], errors="coerce").fillna(0.0).to_numpy(dtype=np.float64)
+
+    @staticmethod
+    def calcular(df_nfe, tolerancias=None, somente_divergencias=None):
+        """
+        Retorna o DataFrame da auditoria (colunas de CAMPOS_AUDITORIA) ou None sem NFe.
+        tolerancias: {conferência: diferença máxima em R$} (padrão: config.AUDITORIA_TOLERANCIAS).
+        somente_divergencias: grava só os itens com divergência (padrão: config.AUDITORIA_SOMENTE_DIVERGENCIAS).
+        """
+        if df_nfe is None or df_nfe.empty: return None
+        tolerancias = {**config.AUDITORIA_TOLERANCIAS, **(tolerancias or {})}
+        if somente_divergencias is None: somente_divergencias = config.AUDITORIA_SOMENTE_DIVERGENCIAS
+        if "Situação" in df_nfe.columns:
+            df_nfe = df_nfe[df_nfe["Situação"].fillna("").astype(str) == ""]
+            if df_nfe.empty: return None
+
+        num = lambda col: AuditoriaFiscal._numeros(df_nfe, col)
+        cst = df_nfe["CST"].astype(object).fillna("").astype(str).to_numpy() if "CST" in df_nfe.columns else np.full(len(df_nfe), "")
+        csosn = np.char.str_len(cst.astype(str)) == 3
+        v_icms = num("Valor ICMS")
+
+        resultado = df_nfe.loc[:, [c for c in COLUNAS_ITEM if c in df_nfe.columns]].reset_index(drop=True)
+        divergentes = np.full(len(df_nfe), "", dtype=object)
+
+        for nome, (col_base, col_aliq, col_valor) in IMPOSTOS.items():
+            base, aliq, declarado = num(col_base), num(col_aliq), num(col_valor)
+            calculado = base * aliq
+            if nome == "ICMS ST":
+                calculado = calculado - v_icms
+                conferir = ((base > 0) | (aliq > 0)) & ~csosn
+            elif nome == "ICMS":
+                conferir = ((base > 0) | (aliq > 0)) & (cst != "51")
+            else:
+                conferir = (base > 0) | (aliq > 0)
+
+            dif = np.round(declarado - np.round(calculado, 2), 2) + 0.0  # + 0.0: sem "-0,00"
+            falha = conferir & (np.abs(dif) > tolerancias[nome] + 1e-9)
+            resultado[f"Dif. {nome}"] = np.where(conferir, dif, np.nan)
+            divergentes = divergentes + np.where(falha, f", {nome}", "")
+
+        # Total da nota: soma por chave com bincount sobre os códigos da chave; cada
+        # (chave, item) entra uma vez (a mesma nota repetida no lote não soma em dobro)
+        codigos, _ = pd.factorize(df_nfe["Chave de Acesso"])
+        unicos = ~df_nfe.duplicated(["Chave de Acesso", "Item"]).to_numpy()
+        parcelas = sum(sinal * num(col) for col, sinal in COMPOSICAO_NOTA) * unicos
+        soma = np.round(np.bincount(codigos, weights=parcelas)[codigos], 2)
+        total_nota = num("Valor Total Nota")
+        dif = np.round(total_nota - soma, 2) + 0.0
+        desonerado = np.round(np.bincount(codigos, weights=num(DESONERACAO) * unicos)[codigos], 2)
+        deduzido = (desonerado > 0) & (np.abs(dif + desonerado) < np.abs(dif))
+        soma = np.where(deduzido, np.round(soma - desonerado, 2), soma)
+        dif = np.where(deduzido, np.round(dif + desonerado, 2) + 0.0, dif)
+        falha = np.abs(dif) > tolerancias["Total Nota"] + 1e-9
+        resultado["Soma Itens"] = soma
+        resultado["Valor Total Nota"] = total_nota
+        resultado["Dif. Total Nota"] = dif
+        divergentes = divergentes + np.where(falha, ", Total Nota", "")
+
+        tem_divergencia = divergentes != ""
+        resultado["Status"] = np.where(
+            tem_divergencia, DIVERGENCIA + ": " + pd.Series(divergentes).str[2:].to_numpy(dtype=object), OK
+        )
+        if somente_divergencias:
+            resultado = resultado[tem_divergencia].reset_index(drop=True)
+        return resultado.reindex(columns=[c.coluna for c in CAMPOS_AUDITORIA])
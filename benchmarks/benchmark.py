@@ -0,0 +1,283 @@
+# Arquivo: benchmarks/benchmark.py
+# Mede o desempenho do leitor: arquivos/s do processamento completo, microbenchmarks
+# de cada extrator, montagem dos DataFrames e gravação do Excel. O resultado vai para
+# um JSON que pode ser comparado com uma execução anterior (--baseline).
+#
+# Exemplos:
+#   python benchmarks/benchmark.py --nfe 2000 --cte 200 --saida base.json
+#   python benchmarks/benchmark.py --pasta /dados/xml --baseline base.json --tolerancia 10
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import tempfile
+import argparse
+from datetime import datetime
+
+# Adiciona o diretório pai ao path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import pandas as pd
+
+import config
+from core.xml_parser import XMLParser
+from core.extrator import ExtratorFiscal
+from core.processador import ProcessadorFiscal
+from core.acumulador import TabelaColunar
+from core.esquema import CAMPOS_NFE, CAMPOS_CTE
+from core.excel_writer import ExcelReportWriter
+from gerador_corpus import GeradorCorpus
+
+FORMATO_RESULTADO = 1
+
+
+def _cronometrar(funcao, chamadas, repeticoes):
+    """Melhor tempo entre as repetições, em microssegundos por chamada."""
+    if not chamadas: return None
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        for args in chamadas: funcao(*args)
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return round(melhor / len(chamadas) * 1e6, 3)
+
+
+def _melhor_tempo(funcao, repeticoes):
+    melhor = float("inf")
+    retorno = None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        retorno = funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor, retorno
+
+
+class Benchmark:
+    def __init__(self, pasta, repeticoes=3, amostra=200, backend=None, workers=None, modos_excel=("streaming",)):
+        self.pasta = pasta
+        self.repeticoes = repeticoes
+        self.amostra = amostra
+        self.backend = backend or config.BACKEND_EXECUCAO
+        self.workers = workers
+        self.modos_excel = modos_excel
+        self.arquivos = sorted(os.path.join(pasta, n) for n in os.listdir(pasta) if n.lower().endswith(".xml"))
+        if not self.arquivos:
+            raise Exception(f"Nenhum arquivo .XML encontrado em: {pasta}")
+        self.metricas = {}
+
+    def log(self, msg):
+        print(msg, file=sys.stderr, flush=True)
+
+    # --- 1. Processamento completo ----------------------------------------------------------
+    def medir_processamento(self, pasta_tmp):
+        saida = os.path.join(pasta_tmp, "bench.csv")
+        totais = {}
+
+        def rodar():
+            ProcessadorFiscal.executar(
+                self.pasta, saida, lambda msg: None, lambda valor, texto: None,
+                backend=self.backend, max_workers=self.workers, usar_cache=False,
+                politica_duplicados="nenhuma", recursivo=False, formato="csv",
+                callback_metricas=totais.update, relatorio_execucao=False
+            )
+
+        segundos, _ = _melhor_tempo(rodar, self.repeticoes)
+        self.metricas["processamento.segundos"] = round(segundos, 4)
+        self.metricas["processamento.arquivos_s"] = round(len(self.arquivos) / segundos, 2)
+        self.metricas["processamento.linhas_s"] = round(totais.get("linhas", 0) / segundos, 2)
+
+    # --- 2. Microbenchmarks dos extratores --------------------------------------------------
+    def medir_extratores(self):
+        ns = config.NS_MAP
+        pre = f"{{{ns['nfe']}}}"
+        amostra = self.arquivos[:self.amostra]
+        conteudos = []
+        for caminho in amostra:
+            with open(caminho, "rb") as f: conteudos.append(f.read())
+
+        self.metricas["extrator.parse.us"] = _cronometrar(XMLParser.carregar_bytes, [(c,) for c in conteudos], self.repeticoes)
+
+        raizes = [XMLParser.carregar_bytes(c) for c in conteudos]
+        nfes = [r for r in raizes if "nfe" in r.tag.lower()]
+        ctes = [r for r in raizes if "cte" in r.tag.lower()]
+        infs = [inf for r in nfes for inf in r.iter(f"{pre}infNFe")]
+        dets = [det for inf in infs for det in inf.findall("nfe:det", ns)]
+
+        casos = {
+            # Documento completo
+            "ExtratorFiscal.extrair_documento": (ExtratorFiscal.extrair_documento, [(r, ns) for r in raizes]),
+            "ExtratorFiscal.linhas_nfe": (ExtratorFiscal.linhas_nfe, [(inf, ns) for inf in infs]),
+            "ExtratorFiscal.linha_cte": (ExtratorFiscal.linha_cte, [(r, ns) for r in ctes]),
+            "ExtratorFiscal._extrair_item": (ExtratorFiscal._extrair_item, [(d, pre) for d in dets]),
+            # XMLParser: cabeçalho
+            "XMLParser.obter_chave": (XMLParser.obter_chave, [(r, ns) for r in nfes]),
+            "XMLParser.obter_emitente": (XMLParser.obter_emitente, [(r, ns) for r in nfes]),
+            "XMLParser.obter_uf_destinatario": (XMLParser.obter_uf_destinatario, [(r, ns) for r in nfes]),
+            "XMLParser.obter_valor_total_xml": (XMLParser.obter_valor_total_xml, [(r, ns) for r in nfes]),
+            "XMLParser.obter_inf_complementar": (XMLParser.obter_inf_complementar, [(r, ns) for r in nfes]),
+            "XMLParser.verificar_simples": (XMLParser.verificar_simples, [(r, ns) for r in nfes]),
+            "XMLParser.obter_data_hora": (XMLParser.obter_data_hora, [(r, ns) for r in nfes]),
+            # XMLParser: itens
+            "XMLParser.extrair_tributos": (XMLParser.extrair_tributos, [(d, ns) for d in dets]),
+            "XMLParser.extrair_reforma": (XMLParser.extrair_reforma, [(d, ns) for d in dets]),
+            "XMLParser.extrair_pis_cofins": (XMLParser.extrair_pis_cofins, [(d, ns) for d in dets]),
+            "XMLParser.extrair_ipi": (XMLParser.extrair_ipi, [(d, ns) for d in dets]),
+            "XMLParser.extrair_origem": (XMLParser.extrair_origem, [(d, ns) for d in dets]),
+            # XMLParser: CTe
+            "XMLParser.obter_pagador_cte": (XMLParser.obter_pagador_cte, [(r, ns) for r in ctes]),
+            "XMLParser.obter_dados_carga_cte": (XMLParser.obter_dados_carga_cte, [(r, ns) for r in ctes]),
+            "XMLParser.obter_modal_rodoviario": (XMLParser.obter_modal_rodoviario, [(r, ns) for r in ctes]),
+            "XMLParser.obter_chaves_nfe_vinculadas": (XMLParser.obter_chaves_nfe_vinculadas, [(r, ns) for r in ctes]),
+            "XMLParser.obter_rota_e_obs": (XMLParser.obter_rota_e_obs, [(r, ns) for r in ctes]),
+            "XMLParser.obter_atores_cte": (XMLParser.obter_atores_cte, [(r, ns) for r in ctes]),
+        }
+        for nome, (funcao, chamadas) in casos.items():
+            us = _cronometrar(funcao, chamadas, self.repeticoes)
+            if us is not None: self.metricas[f"extrator.{nome}.us"] = us
+
+    # --- 3. DataFrames e 4. Excel -----------------------------------------------------------
+    def medir_saida(self, pasta_tmp):
+        extraidos = [ProcessadorFiscal._processar_um_xml(caminho, config.NS_MAP) for caminho in self.arquivos]
+
+        def montar():
+            # Mesmo caminho do processamento: acumulação por coluna + DataFrame no final
+            tabela_nfe, tabela_cte = TabelaColunar(CAMPOS_NFE), TabelaColunar(CAMPOS_CTE)
+            for i, (nfe, cte) in enumerate(extraidos):
+                tabela_nfe.adicionar(i, nfe)
+                tabela_cte.adicionar(i, cte)
+            return tabela_nfe.dataframe(), tabela_cte.dataframe()
+
+        segundos, (df_nfe, df_cte) = _melhor_tempo(montar, self.repeticoes)
+        self.metricas["dataframe.segundos"] = round(segundos, 4)
+        self.metricas["dataframe.linhas"] = len(df_nfe) + len(df_cte)
+        memoria = sum(df.memory_usage(deep=True).sum() for df in (df_nfe, df_cte))
+        self.metricas["dataframe.memoria_mb"] = round(memoria / 2**20, 2)
+
+        for modo in self.modos_excel:
+            destino = os.path.join(pasta_tmp, f"bench_{modo}.xlsx")
+            segundos, _ = _melhor_tempo(
+                lambda: ExcelReportWriter.gerar_relatorio(destino, None, df_nfe, df_cte, modo=modo),
+                self.repeticoes
+            )
+            self.metricas[f"excel.{modo}.segundos"] = round(segundos, 4)
+
+    def executar(self):
+        pasta_tmp = tempfile.mkdtemp(prefix="leitor_bench_")
+        try:
+            self.log(f"Processamento completo ({len(self.arquivos)} arquivos, backend {self.backend})...")
+            self.medir_processamento(pasta_tmp)
+            self.log("Microbenchmarks dos extratores...")
+            self.medir_extratores()
+            self.log("DataFrames e Excel...")
+            self.medir_saida(pasta_tmp)
+        finally:
+            shutil.rmtree(pasta_tmp, ignore_errors=True)
+        return self.metricas
+
+    def resultado(self, corpus):
+        return {
+            "formato": FORMATO_RESULTADO,
+            "data": datetime.now().isoformat(timespec="seconds"),
+            "ambiente": {
+                "python": platform.python_version(),
+                "plataforma": platform.platform(),
+                "cpus": os.cpu_count(),
+                "pandas": pd.__version__,
+                "versao_extrator": ExtratorFiscal.VERSAO,
+                "backend_xml": XMLParser.backend(),
+            },
+            "corpus": corpus,
+            "parametros": {"backend": self.backend, "workers": self.workers, "repeticoes": self.repeticoes,
+                           "amostra": self.amostra},
+            "metricas": self.metricas,
+        }
+
+
+def comparar(atual, baseline, tolerancia):
+    """
+    Compara as métricas em comum. Vazões (*_s) pioram quando caem; tempos
+    (segundos, us) pioram quando sobem. Retorna a lista de métricas que pioraram
+    além da tolerância (em %).
+    """
+    piores = []
+    print(f"{'métrica':<52} {'baseline':>12} {'atual':>12} {'var.':>8}")
+    for nome, base in baseline.get("metricas", {}).items():
+        valor = atual["metricas"].get(nome)
+        if valor is None or not base or nome.endswith(".linhas"): continue
+        variacao = (valor - base) / base * 100
+        piora = -variacao if nome.endswith("_s") else variacao
+        marca = ""
+        if piora > tolerancia:
+            marca = "  PIOR"
+            piores.append(nome)
+        elif piora < -tolerancia:
+            marca = "  melhor"
+        print(f"{nome:<52} {base:>12} {valor:>12} {variacao:>+7.1f}%{marca}")
+    return piores
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark do Leitor XML (NFe/CTe).")
+    corpus = parser.add_argument_group("corpus")
+    corpus.add_argument("--pasta", help="Usa os XMLs desta pasta em vez de gerar um corpus sintético")
+    corpus.add_argument("--nfe", type=int, default=500, help="NFes do corpus sintético (padrão: 500)")
+    corpus.add_argument("--cte", type=int, default=50, help="CTes do corpus sintético (padrão: 50)")
+    corpus.add_argument("--itens", type=int, nargs=2, default=(1, 30), metavar=("MIN", "MAX"),
+                        help="Faixa de itens por NFe (padrão: 1 30)")
+    corpus.add_argument("--semente", type=int, default=42)
+    parser.add_argument("-b", "--backend", choices=("threads", "processos"))
+    parser.add_argument("-w", "--workers", type=int)
+    parser.add_argument("-r", "--repeticoes", type=int, default=3, help="Repetições por medida (vale a melhor)")
+    parser.add_argument("--amostra", type=int, default=200, help="Arquivos usados nos microbenchmarks")
+    parser.add_argument("--excel-pandas", action="store_true", help="Mede também o modo 'pandas' do Excel")
+    parser.add_argument("-o", "--saida", help="Arquivo JSON do resultado (padrão: benchmark_<data>.json na pasta atual)")
+    parser.add_argument("--baseline", help="JSON de uma execução anterior para comparação")
+    parser.add_argument("--tolerancia", type=float, default=10.0,
+                        help="Variação (%%) aceita antes de apontar piora (padrão: 10)")
+    args = parser.parse_args(argv)
+
+    pasta_corpus = None
+    if args.pasta:
+        pasta = args.pasta
+        info_corpus = {"pasta": os.path.abspath(pasta)}
+    else:
+        pasta = pasta_corpus = tempfile.mkdtemp(prefix="leitor_corpus_")
+        print(f"Gerando corpus sintético: {args.nfe} NFe + {args.cte} CTe...", file=sys.stderr)
+        GeradorCorpus(args.semente, args.itens[0], args.itens[1]).gerar(pasta, args.nfe, args.cte)
+        info_corpus = {"sintetico": True, "nfe": args.nfe, "cte": args.cte,
+                       "itens": list(args.itens), "semente": args.semente}
+
+    try:
+        modos = ("streaming", "pandas") if args.excel_pandas else ("streaming",)
+        bench = Benchmark(pasta, args.repeticoes, args.amostra, args.backend, args.workers, modos)
+        info_corpus["arquivos"] = len(bench.arquivos)
+        info_corpus["bytes"] = sum(os.path.getsize(a) for a in bench.arquivos)
+        bench.executar()
+        resultado = bench.resultado(info_corpus)
+    finally:
+        if pasta_corpus: shutil.rmtree(pasta_corpus, ignore_errors=True)
+
+    # Fora do repositório por padrão: os resultados dependem da máquina
+    saida = args.saida or f"benchmark_{datetime.now():%Y%m%d_%H%M%S}.json"
+    pasta_saida = os.path.dirname(saida)
+    if pasta_saida: os.makedirs(pasta_saida, exist_ok=True)
+    with open(saida, "w", encoding="utf-8") as f:
+        json.dump(resultado, f, ensure_ascii=False, indent=2)
+    print(f"Resultado gravado em: {saida}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        piores = comparar(resultado, baseline, args.tolerancia)
+        if piores:
+            print(f"{len(piores)} métricas pioraram mais de {args.tolerancia}%.")
+            return 1
+    else:
+        for nome, valor in resultado["metricas"].items(): print(f"{nome:<52} {valor:>12}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,288 @@
+# Arquivo: benchmarks/gerador_corpus.py
+# Gera um corpus sintético de NFe (layout 4.00) e CTe (4.00) para os benchmarks.
+#
+# Exemplo:
+#   python benchmarks/gerador_corpus.py /tmp/corpus --nfe 2000 --cte 300 --itens 1 40
+import os
+import random
+import argparse
+from xml.sax.saxutils import escape
+
+NS_NFE = "http://www.portalfiscal.inf.br/nfe"
+NS_CTE = "http://www.portalfiscal.inf.br/cte"
+
+UFS = {"SP": "35", "RJ": "33", "MG": "31", "PR": "41", "SC": "42", "RS": "43", "GO": "52", "BA": "29"}
+MUNICIPIOS = {"SP": "Sao Paulo", "RJ": "Rio de Janeiro", "MG": "Belo Horizonte", "PR": "Curitiba",
+              "SC": "Joinville", "RS": "Porto Alegre", "GO": "Goiania", "BA": "Salvador"}
+NCMS = ["84713012", "85171231", "27101259", "39232190", "73181500", "40111000", "30049099", "22030000"]
+UNIDADES = ["UN", "CX", "KG", "LT", "PC"]
+
+
+def _v(valor, casas=2):
+    return f"{valor:.{casas}f}"
+
+
+def _digito_chave(chave43):
+    """Dígito verificador (módulo 11) da chave de acesso."""
+    soma = 0
+    peso = 2
+    for d in reversed(chave43):
+        soma += int(d) * peso
+        peso = 2 if peso == 9 else peso + 1
+    resto = soma % 11
+    return "0" if resto < 2 else str(11 - resto)
+
+
+def _chave(uf, aamm, cnpj, modelo, serie, numero, codigo):
+    base = f"{UFS[uf]}{aamm}{cnpj}{modelo}{serie:03d}{numero:09d}1{codigo:08d}"
+    return base + _digito_chave(base)
+
+
+def _cnpj(rnd):
+    return f"{rnd.randrange(10**7, 10**8)}0001{rnd.randrange(10, 100)}"
+
+
+class GeradorCorpus:
+    """
+    Documentos com os grupos que o extrator lê: ICMS (00/10/20/60/70 e Simples
+    Nacional), ST, IPI, PIS/COFINS, CBS/IBS, combustíveis e, no CTe, carga,
+    modal rodoviário e NFes vinculadas. Mesma semente -> mesmo corpus.
+    """
+
+    def __init__(self, semente=42, itens_min=1, itens_max=30, pct_reforma=0.5, pct_protocolo=0.8):
+        self.rnd = random.Random(semente)
+        self.itens_min = itens_min
+        self.itens_max = itens_max
+        self.pct_reforma = pct_reforma
+        self.pct_protocolo = pct_protocolo
+        self.emitentes = [(_cnpj(self.rnd), f"Industria e Comercio {i} LTDA", self.rnd.choice(list(UFS)))
+                          for i in range(40)]
+        self.transportadoras = [(_cnpj(self.rnd), f"Transportes {i} S.A.", self.rnd.choice(list(UFS)))
+                                for i in range(8)]
+
+    # --- NFe ---------------------------------------------------------------------------------
+    def _icms(self, rnd, crt, v_prod):
+        orig = rnd.choice("00012")
+        if crt == "1":
+            if rnd.random() < 0.6:
+                p = rnd.choice([1.25, 2.56, 3.95])
+                return (f"<ICMSSN101><orig>{orig}</orig><CSOSN>101</CSOSN><pCredSN>{_v(p)}</pCredSN>"
+                        f"<vCredICMSSN>{_v(v_prod * p / 100)}</vCredICMSSN></ICMSSN101>"), 0.0, 0.0
+            return f"<ICMSSN102><orig>{orig}</orig><CSOSN>102</CSOSN></ICMSSN102>", 0.0, 0.0
+
+        cst = rnd.choice(["00", "00", "10", "20", "60", "70"])
+        aliq = rnd.choice([4.0, 7.0, 12.0, 18.0])
+        if cst == "60":
+            return (f"<ICMS60><orig>{orig}</orig><CST>60</CST><vBCSTRet>{_v(v_prod)}</vBCSTRet>"
+                    f"<pST>18.00</pST><vICMSSTRet>{_v(v_prod * 0.18)}</vICMSSTRet></ICMS60>"), 0.0, 0.0
+
+        red = rnd.choice([33.33, 41.67, 61.11]) if cst in ("20", "70") else 0.0
+        v_bc = v_prod * (1 - red / 100)
+        v_icms = v_bc * aliq / 100
+        xml = f"<ICMS{cst}><orig>{orig}</orig><CST>{cst}</CST><modBC>3</modBC>"
+        if red: xml += f"<pRedBC>{_v(red)}</pRedBC>"
+        xml += f"<vBC>{_v(v_bc)}</vBC><pICMS>{_v(aliq)}</pICMS><vICMS>{_v(v_icms)}</vICMS>"
+
+        v_st = 0.0
+        if cst in ("10", "70"):
+            mva = rnd.choice([35.0, 40.0, 71.78])
+            v_bc_st = v_bc * (1 + mva / 100)
+            v_st = max(v_bc_st * 0.18 - v_icms, 0.0)
+            xml += f"<modBCST>4</modBCST><pMVAST>{_v(mva)}</pMVAST>"
+            if red: xml += f"<pRedBCST>{_v(red)}</pRedBCST>"
+            xml += f"<vBCST>{_v(v_bc_st)}</vBCST><pICMSST>18.00</pICMSST><vICMSST>{_v(v_st)}</vICMSST>"
+        return xml + f"</ICMS{cst}>", v_icms, v_st
+
+    def _pis_cofins(self, rnd, v_prod):
+        if rnd.random() < 0.2:
+            return ("<PIS><PISNT><CST>06</CST></PISNT></PIS>"
+                    "<COFINS><COFINSNT><CST>06</CST></COFINSNT></COFINS>"), 0.0, 0.0
+        p_pis, p_cof = rnd.choice([(1.65, 7.6), (0.65, 3.0)])
+        v_pis, v_cof = v_prod * p_pis / 100, v_prod * p_cof / 100
+        return (f"<PIS><PISAliq><CST>01</CST><vBC>{_v(v_prod)}</vBC><pPIS>{_v(p_pis, 4)}</pPIS>"
+                f"<vPIS>{_v(v_pis)}</vPIS></PISAliq></PIS>"
+                f"<COFINS><COFINSAliq><CST>01</CST><vBC>{_v(v_prod)}</vBC><pCOFINS>{_v(p_cof, 4)}</pCOFINS>"
+                f"<vCOFINS>{_v(v_cof)}</vCOFINS></COFINSAliq></COFINS>"), v_pis, v_cof
+
+    def _ipi(self, rnd, v_prod):
+        if rnd.random() < 0.5:
+            return "<IPI><cEnq>999</cEnq><IPINT><CST>53</CST></IPINT></IPI>", 0.0
+        p = rnd.choice([5.0, 10.0, 15.0])
+        return (f"<IPI><cEnq>999</cEnq><IPITrib><CST>50</CST><vBC>{_v(v_prod)}</vBC><pIPI>{_v(p)}</pIPI>"
+                f"<vIPI>{_v(v_prod * p / 100)}</vIPI></IPITrib></IPI>"), v_prod * p / 100
+
+    def _reforma(self, rnd, v_prod):
+        if rnd.random() >= self.pct_reforma: return ""
+        classe = rnd.choice(["000001", "200032", "410999"])
+        return (f"<CBS><CBS01><CST>000</CST><cClass>{classe}</cClass><vBC>{_v(v_prod)}</vBC>"
+                f"<pAliq>0.90</pAliq><vCBS>{_v(v_prod * 0.009)}</vCBS></CBS01></CBS>"
+                f"<IBS><IBS01><vBC>{_v(v_prod)}</vBC><pAliq>0.10</pAliq><vIBS>{_v(v_prod * 0.001)}</vIBS>"
+                f"<cClass>{classe}</cClass></IBS01></IBS>")
+
+    def _item(self, rnd, n, crt, uf_emit, uf_dest, totais):
+        combustivel = rnd.random() < 0.05
+        ncm = "27101259" if combustivel else rnd.choice(NCMS)
+        qtd = round(rnd.uniform(1, 500), 4)
+        unit = round(rnd.uniform(0.5, 2500), 4)
+        v_prod = round(qtd * unit, 2)
+        v_desc = round(v_prod * rnd.choice([0, 0, 0.02, 0.05]), 2)
+        v_frete = round(v_prod * rnd.choice([0, 0, 0.01]), 2)
+        cfop = ("5" if uf_emit == uf_dest else "6") + rnd.choice(["102", "102", "405", "101"])
+
+        prod = (f"<prod><cProd>{rnd.randrange(10**5, 10**6)}</cProd><cEAN>789{rnd.randrange(10**9, 10**10)}</cEAN>"
+                f"<xProd>{escape(f'Produto {ncm} Ref {rnd.randrange(1000)} & Acessorios')}</xProd><NCM>{ncm}</NCM>")
+        if rnd.random() < 0.3: prod += f"<CEST>{rnd.randrange(10**6, 10**7)}</CEST>"
+        unid = "LT" if combustivel else rnd.choice(UNIDADES)
+        prod += (f"<CFOP>{cfop}</CFOP><uCom>{unid}</uCom><qCom>{_v(qtd, 4)}</qCom><vUnCom>{_v(unit, 10)}</vUnCom>"
+                 f"<vProd>{_v(v_prod)}</vProd><cEANTrib>SEM GTIN</cEANTrib><uTrib>{unid}</uTrib><qTrib>{_v(qtd, 4)}</qTrib>"
+                 f"<vUnTrib>{_v(unit, 10)}</vUnTrib>")
+        if v_frete: prod += f"<vFrete>{_v(v_frete)}</vFrete>"
+        if v_desc: prod += f"<vDesc>{_v(v_desc)}</vDesc>"
+        prod += "<indTot>1</indTot>"
+        if rnd.random() < 0.4: prod += f"<xPed>{rnd.randrange(45 * 10**8, 46 * 10**8)}</xPed><nItemPed>{n * 10}</nItemPed>"
+        if combustivel: prod += "<comb><cProdANP>820101034</cProdANP><descANP>OLEO DIESEL S10</descANP><UFCons>SP</UFCons></comb>"
+        prod += "</prod>"
+
+        icms, v_icms, v_st = self._icms(rnd, crt, v_prod)
+        ipi, v_ipi = self._ipi(rnd, v_prod)
+        pis_cofins, v_pis, v_cof = self._pis_cofins(rnd, v_prod)
+        imposto = (f"<imposto><vTotTrib>{_v(v_prod * 0.3)}</vTotTrib><ICMS>{icms}</ICMS>{ipi}{pis_cofins}"
+                   f"{self._reforma(rnd, v_prod)}</imposto>")
+
+        for campo, valor in (("vProd", v_prod), ("vDesc", v_desc), ("vFrete", v_frete), ("vICMS", v_icms),
+                             ("vST", v_st), ("vIPI", v_ipi), ("vPIS", v_pis), ("vCOFINS", v_cof)):
+            totais[campo] += valor
+        return f'<det nItem="{n}">{prod}{imposto}</det>'
+
+    def nfe(self, numero, n_itens=None, com_protocolo=None):
+        """Retorna (chave, xml) de uma NFe modelo 55."""
+        rnd = self.rnd
+        n_itens = n_itens or rnd.randint(self.itens_min, self.itens_max)
+        if com_protocolo is None: com_protocolo = rnd.random() < self.pct_protocolo
+        cnpj_emit, nome_emit, uf_emit = rnd.choice(self.emitentes)
+        cnpj_dest, nome_dest, uf_dest = rnd.choice(self.emitentes)
+        crt = "1" if rnd.random() < 0.2 else "3"
+        mes = rnd.randint(1, 12)
+        codigo = rnd.randrange(10**8)
+        chave = _chave(uf_emit, f"25{mes:02d}", cnpj_emit, "55", 1, numero, codigo)
+
+        totais = dict.fromkeys(("vProd", "vDesc", "vFrete", "vICMS", "vST", "vIPI", "vPIS", "vCOFINS"), 0.0)
+        itens = "".join(self._item(rnd, n, crt, uf_emit, uf_dest, totais) for n in range(1, n_itens + 1))
+        v_nf = totais["vProd"] - totais["vDesc"] + totais["vFrete"] + totais["vST"] + totais["vIPI"]
+
+        inf = (f'<infNFe Id="NFe{chave}" versao="4.00">'
+               f"<ide><cUF>{UFS[uf_emit]}</cUF><cNF>{codigo:08d}</cNF><natOp>VENDA DE MERCADORIA</natOp>"
+               f"<mod>55</mod><serie>1</serie><nNF>{numero}</nNF>"
+               f"<dhEmi>2025-{mes:02d}-{rnd.randint(1, 28):02d}T{rnd.randint(7, 19):02d}:{rnd.randint(0, 59):02d}:00-03:00</dhEmi>"
+               f"<tpNF>1</tpNF><idDest>{1 if uf_emit == uf_dest else 2}</idDest><tpImp>1</tpImp><tpEmis>1</tpEmis>"
+               f"<cDV>{chave[-1]}</cDV><tpAmb>1</tpAmb><finNFe>1</finNFe><indFinal>0</indFinal><indPres>9</indPres>"
+               f"<procEmi>0</procEmi><verProc>1.0</verProc></ide>"
+               f"<emit><CNPJ>{cnpj_emit}</CNPJ><xNome>{nome_emit}</xNome><enderEmit><xLgr>Rua A</xLgr><nro>100</nro>"
+               f"<xBairro>Centro</xBairro><xMun>{MUNICIPIOS[uf_emit]}</xMun><UF>{uf_emit}</UF><CEP>01000000</CEP>"
+               f"</enderEmit><IE>123456789</IE><CRT>{crt}</CRT></emit>"
+               f"<dest><CNPJ>{cnpj_dest}</CNPJ><xNome>{nome_dest}</xNome><enderDest><xLgr>Av B</xLgr><nro>200</nro>"
+               f"<xBairro>Distrito</xBairro><xMun>{MUNICIPIOS[uf_dest]}</xMun><UF>{uf_dest}</UF></enderDest>"
+               f"<indIEDest>1</indIEDest></dest>"
+               f"{itens}"
+               f"<total><ICMSTot><vBC>0.00</vBC><vICMS>{_v(totais['vICMS'])}</vICMS><vST>{_v(totais['vST'])}</vST>"
+               f"<vProd>{_v(totais['vProd'])}</vProd><vFrete>{_v(totais['vFrete'])}</vFrete><vDesc>{_v(totais['vDesc'])}</vDesc>"
+               f"<vIPI>{_v(totais['vIPI'])}</vIPI><vPIS>{_v(totais['vPIS'])}</vPIS><vCOFINS>{_v(totais['vCOFINS'])}</vCOFINS>"
+               f"<vNF>{_v(v_nf)}</vNF></ICMSTot></total>"
+               f"<transp><modFrete>0</modFrete></transp>"
+               f"<pag><detPag><tPag>15</tPag><vPag>{_v(v_nf)}</vPag></detPag></pag>"
+               f"<infAdic><infCpl>Pedido {rnd.randrange(10**6)} - Documento emitido para benchmark</infCpl></infAdic>"
+               f"</infNFe>")
+        nfe = f'<NFe xmlns="{NS_NFE}">{inf}</NFe>'
+        if com_protocolo:
+            xml = (f'<nfeProc xmlns="{NS_NFE}" versao="4.00">{nfe}<protNFe versao="4.00"><infProt>'
+                   f"<tpAmb>1</tpAmb><chNFe>{chave}</chNFe><nProt>1{rnd.randrange(10**14):014d}</nProt>"
+                   f"<cStat>100</cStat><xMotivo>Autorizado o uso da NF-e</xMotivo></infProt></protNFe></nfeProc>")
+        else:
+            xml = nfe
+        return chave, '<?xml version="1.0" encoding="UTF-8"?>' + xml
+
+    # --- CTe ---------------------------------------------------------------------------------
+    def cte(self, numero, chaves_nfe=()):
+        """Retorna (chave, xml) de um CTe rodoviário transportando as NFes informadas."""
+        rnd = self.rnd
+        cnpj_emit, nome_emit, uf_emit = rnd.choice(self.transportadoras)
+        cnpj_rem, nome_rem, uf_ini = rnd.choice(self.emitentes)
+        cnpj_dest, nome_dest, uf_fim = rnd.choice(self.emitentes)
+        mes = rnd.randint(1, 12)
+        chave = _chave(uf_emit, f"25{mes:02d}", cnpj_emit, "57", 1, numero, rnd.randrange(10**8))
+
+        v_carga = round(rnd.uniform(1000, 250000), 2)
+        v_frete = round(v_carga * rnd.uniform(0.01, 0.06), 2)
+        peso = round(rnd.uniform(50, 28000), 4)
+        toma = rnd.choice(["0", "3", "4"])
+        if toma == "4":
+            tomador = f"<toma4><toma>4</toma><CNPJ>{_cnpj(rnd)}</CNPJ><xNome>Operador Logistico</xNome></toma4>"
+        else:
+            tomador = f"<toma3><toma>{toma}</toma></toma3>"
+        docs = "".join(f"<infNFe><chave>{c}</chave></infNFe>" for c in chaves_nfe)
+
+        xml = (f'<cteProc xmlns="{NS_CTE}" versao="4.00"><CTe xmlns="{NS_CTE}"><infCte Id="CTe{chave}" versao="4.00">'
+               f"<ide><cUF>{UFS[uf_emit]}</cUF><CFOP>{'5' if uf_ini == uf_fim else '6'}353</CFOP>"
+               f"<natOp>PRESTACAO DE SERVICO DE TRANSPORTE</natOp><mod>57</mod><serie>1</serie><nCT>{numero}</nCT>"
+               f"<dhEmi>2025-{mes:02d}-{rnd.randint(1, 28):02d}T{rnd.randint(6, 22):02d}:00:00-03:00</dhEmi>"
+               f"<tpCTe>0</tpCTe><modal>01</modal><tpServ>0</tpServ>"
+               f"<xMunIni>{MUNICIPIOS[uf_ini]}</xMunIni><UFIni>{uf_ini}</UFIni>"
+               f"<xMunFim>{MUNICIPIOS[uf_fim]}</xMunFim><UFFim>{uf_fim}</UFFim>{tomador}</ide>"
+               f"<compl><xObs>Frete referente a {len(chaves_nfe)} nota(s)</xObs></compl>"
+               f"<emit><CNPJ>{cnpj_emit}</CNPJ><IE>987654321</IE><xNome>{nome_emit}</xNome>"
+               f"<enderEmit><xMun>{MUNICIPIOS[uf_emit]}</xMun><UF>{uf_emit}</UF></enderEmit></emit>"
+               f"<rem><CNPJ>{cnpj_rem}</CNPJ><xNome>{nome_rem}</xNome></rem>"
+               f"<dest><CNPJ>{cnpj_dest}</CNPJ><xNome>{nome_dest}</xNome></dest>"
+               f"<vPrest><vTPrest>{_v(v_frete)}</vTPrest><vRec>{_v(v_frete)}</vRec></vPrest>"
+               f"<imp><ICMS><ICMS00><CST>00</CST><vBC>{_v(v_frete)}</vBC><pICMS>12.00</pICMS>"
+               f"<vICMS>{_v(v_frete * 0.12)}</vICMS></ICMS00></ICMS></imp>"
+               f"<infCTeNorm><infCarga><vCarga>{_v(v_carga)}</vCarga><proPred>DIVERSOS</proPred>"
+               f"<infQ><cUnid>01</cUnid><tpMed>PESO BRUTO</tpMed><qCarga>{_v(peso, 4)}</qCarga></infQ>"
+               f"<infQ><cUnid>03</cUnid><tpMed>UNIDADE</tpMed><qCarga>{rnd.randint(1, 400)}.0000</qCarga></infQ>"
+               f"</infCarga><infDoc>{docs}</infDoc>"
+               f"<infModal versaoModal=\"4.00\"><rodo><RNTRC>{rnd.randrange(10**7, 10**8)}</RNTRC>"
+               f"<veic><placa>{''.join(rnd.choice('ABCDEFGHJKLMNPRSTUVWXYZ') for _ in range(3))}{rnd.randint(1, 9)}"
+               f"{rnd.choice('ABCDEFGHIJ')}{rnd.randint(10, 99)}</placa></veic></rodo></infModal></infCTeNorm>"
+               f"</infCte></CTe><protCTe versao=\"4.00\"><infProt><chCTe>{chave}</chCTe><cStat>100</cStat>"
+               f"</infProt></protCTe></cteProc>")
+        return chave, '<?xml version="1.0" encoding="UTF-8"?>' + xml
+
+    # --- Corpus ------------------------------------------------------------------------------
+    def gerar(self, pasta, n_nfe, n_cte):
+        """Grava n_nfe NFes e n_cte CTes em 'pasta'. Cada CTe referencia NFes do corpus."""
+        os.makedirs(pasta, exist_ok=True)
+        arquivos = []
+        chaves = []
+        for i in range(n_nfe):
+            chave, xml = self.nfe(1000 + i)
+            chaves.append(chave)
+            caminho = os.path.join(pasta, f"NFe{chave}.xml")
+            with open(caminho, "w", encoding="utf-8") as f: f.write(xml)
+            arquivos.append(caminho)
+
+        for i in range(n_cte):
+            vinculadas = self.rnd.sample(chaves, min(len(chaves), self.rnd.randint(1, 5))) if chaves else []
+            chave, xml = self.cte(5000 + i, vinculadas)
+            caminho = os.path.join(pasta, f"CTe{chave}.xml")
+            with open(caminho, "w", encoding="utf-8") as f: f.write(xml)
+            arquivos.append(caminho)
+        return arquivos
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gera um corpus sintético de NFe/CTe para benchmark.")
+    parser.add_argument("pasta", help="Pasta de destino")
+    parser.add_argument("--nfe", type=int, default=1000, help="Quantidade de NFes (padrão: 1000)")
+    parser.add_argument("--cte", type=int, default=100, help="Quantidade de CTes (padrão: 100)")
+    parser.add_argument("--itens", type=int, nargs=2, default=(1, 30), metavar=("MIN", "MAX"),
+                        help="Faixa de itens por NFe (padrão: 1 30)")
+    parser.add_argument("--semente", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    gerador = GeradorCorpus(args.semente, args.itens[0], args.itens[1])
+    arquivos = gerador.gerar(args.pasta, args.nfe, args.cte)
+    print(f"{len(arquivos)} arquivos gerados em {args.pasta}")
+
+
+if __name__ == "__main__":
+    main()
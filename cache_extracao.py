@@ -0,0 +1,133 @@
+# Arquivo: core/cache_extracao.py
+import os
+import time
+import pickle
+import sqlite3
+import zlib
+
+from core.logger import SistemaLog
+
+
+class CacheExtracao:
+    """
+    Cache persistente (SQLite) das linhas NFe/CTe extraídas de cada FonteXML.
+    - Chave: caminho (ou zip::membro) + tamanho + mtime; se o arquivo foi
+      tocado/copiado, o hash do conteúdo ainda permite reaproveitar a extração.
+    - O cache não lê arquivos: o hash vem das threads de leitura (calculado sobre os
+      bytes já lidos para o parse) e as linhas chegam serializadas pelos workers;
+      aqui ficam só as consultas e gravações no SQLite.
+    - Invalidação automática quando a versão do extrator muda.
+    - Remoção por tamanho (os menos acessados primeiro).
+    """
+
+    def __init__(self, caminho_db, versao, limite_mb=512):
+        self.caminho_db = caminho_db
+        self.limite_bytes = int(limite_mb * 1024 * 1024)
+        self._hashes = {}
+        self.acertos = 0
+        self.falhas = 0
+
+        pasta = os.path.dirname(caminho_db)
+        if pasta: os.makedirs(pasta, exist_ok=True)
+
+        self.conn = sqlite3.connect(caminho_db)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (chave TEXT PRIMARY KEY, valor TEXT)")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS entradas ("
+            " caminho TEXT PRIMARY KEY, tamanho INTEGER, mtime INTEGER, hash TEXT,"
+            " dados BLOB, bytes INTEGER, acesso REAL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_entradas_hash ON entradas(hash)")
+        self._validar_versao(str(versao))
+
+    def _validar_versao(self, versao):
+        row = self.conn.execute("SELECT valor FROM meta WHERE chave = 'versao'").fetchone()
+        if row is None or row[0] != versao:
+            # Extrator mudou: nada do que está salvo é confiável
+            self.conn.execute("DELETE FROM entradas")
+            self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('versao', ?)", (versao,))
+            self.conn.commit()
+
+    @staticmethod
+    def serializar(linhas_nfe, linhas_cte):
+        """Linhas -> bytes gravados no cache (chamado nos workers, fora da thread principal)."""
+        return zlib.compress(pickle.dumps((linhas_nfe, linhas_cte), pickle.HIGHEST_PROTOCOL), 1)
+
+    def obter(self, fonte):
+        """
+        Retorna (linhas_nfe, linhas_cte) do cache pelo caminho + tamanho + mtime,
+        ou None se precisar ler o arquivo (sem calcular hash).
+        """
+        try:
+            ident = fonte.identidade()
+            row = self.conn.execute(
+                "SELECT dados FROM entradas WHERE caminho = ? AND tamanho = ? AND mtime = ?", ident
+            ).fetchone()
+            if row is None: return None
+            self.conn.execute("UPDATE entradas SET acesso = ? WHERE caminho = ?", (time.time(), ident[0]))
+            self.acertos += 1
+            return pickle.loads(zlib.decompress(row[0]))
+
+        except Exception as e:
+            SistemaLog.registrar_erro(f"Falha ao ler cache de: {fonte.nome}", e)
+            return None
+
+    def obter_por_hash(self, fonte, hash_conteudo):
+        """
+        Mesmo conteúdo com outro nome/data (cópias, arquivos re-baixados): retorna as
+        linhas e registra a fonte com a nova identidade, ou None. O hash fica guardado
+        para a gravação da fonte depois da extração.
+        """
+        self._hashes[fonte.id] = hash_conteudo
+        try:
+            row = self.conn.execute(
+                "SELECT dados FROM entradas WHERE hash = ? LIMIT 1", (hash_conteudo,)
+            ).fetchone()
+            if row is None:
+                self.falhas += 1
+                return None
+            self._gravar(fonte, fonte.identidade(), row[0])
+            self.acertos += 1
+            return pickle.loads(zlib.decompress(row[0]))
+
+        except Exception as e:
+            SistemaLog.registrar_erro(f"Falha ao ler cache de: {fonte.nome}", e)
+            self.falhas += 1
+            return None
+
+    def guardar(self, fonte, dados):
+        """Grava as linhas já serializadas (ver serializar) da fonte."""
+        try:
+            self._gravar(fonte, fonte.identidade(), dados)
+        except Exception as e:
+            SistemaLog.registrar_erro(f"Falha ao gravar cache de: {fonte.nome}", e)
+
+    def _gravar(self, fonte, ident, dados):
+        # Sem hash conhecido (arquivo grande ou sem threads de leitura): só a identidade vale
+        self.conn.execute(
+            "INSERT OR REPLACE INTO entradas VALUES (?, ?, ?, ?, ?, ?, ?)",
+            ident + (self._hashes.pop(fonte.id, None), dados, len(dados), time.time())
+        )
+
+    def _aplicar_limite(self):
+        total = self.conn.execute("SELECT COALESCE(SUM(bytes), 0) FROM entradas").fetchone()[0]
+        if total <= self.limite_bytes: return
+
+        excesso = total - self.limite_bytes
+        remover = []
+        for caminho, tam in self.conn.execute("SELECT caminho, bytes FROM entradas ORDER BY acesso ASC"):
+            remover.append((caminho,))
+            excesso -= tam
+            if excesso <= 0: break
+        self.conn.executemany("DELETE FROM entradas WHERE caminho = ?", remover)
+
+    def fechar(self):
+        try:
+            self._aplicar_limite()
+            self.conn.commit()
+        except Exception as e:
+            SistemaLog.registrar_erro("Falha ao finalizar cache de extração", e)
+        finally:
+            self.conn.close()
@@ -16,5 +16,95 @@ NS_MAP = {
     'cte': 'http://www.portalfiscal.inf.br/cte'
 }
 
+# --- DESEMPENHO ---
+# Parser XML: "etree" (ElementTree da biblioteca padrão), "lxml" ou "auto" (lxml se estiver instalado).
+# Medido de ponta a ponta, o lxml não ganha do ElementTree: o parse é mais rápido,
+# mas percorrer os elementos em Python é mais lento.
+BACKEND_XML = "etree"
+
+# Arquivos acima deste tamanho são lidos em modo streaming (iterparse),
+# mantendo a memória por arquivo limitada. Use 0 para sempre usar streaming.
+LIMITE_STREAMING_MB = 8
+
+# Backend de execução: "threads" ou "processos" (usa todos os núcleos na extração)
+BACKEND_EXECUCAO = "threads"
+# Máximo de arquivos por tarefa enviada a cada processo
+TAMANHO_LOTE_PROCESSOS = 32
+
+# Leitura antecipada (pipeline de I/O): threads dedicadas leem o conteúdo dos arquivos
+# à frente da extração, sobrepondo a latência do disco/rede (ex.: pastas SMB) ao parse.
+# 0 desliga: cada worker abre e lê o próprio arquivo.
+LEITURA_THREADS = 16
+# Máximo de arquivos lidos (ou em leitura) aguardando a extração; limita a memória
+LEITURA_EM_VOO = 64
+
+# Cache de extração (opcional): arquivos inalterados desde a última execução não são relidos.
+# Grava em PASTA_CACHE; desligado por padrão (ligue aqui ou com --cache na linha de comando)
+USAR_CACHE = False
+PASTA_CACHE = os.path.join(os.path.expanduser("~"), ".leitor_xml")
+CACHE_LIMITE_MB = 512
+
+# Documentos repetidos no lote (mesma chave de acesso):
+# "proc" prefere o XML com protocolo, "recente" o mais novo, "nenhuma" mantém todos
+POLITICA_DUPLICADOS = "proc"
+
+# Notas com evento de cancelamento (procEventoNFe/procEventoCTe) na mesma pasta:
+# "marcar" (coluna Situação), "excluir" (remove as linhas) ou "nenhuma" (não lê os eventos)
+NOTAS_CANCELADAS = "marcar"
+
+# Rateio do frete dos CTes entre as NFes vinculadas e seus itens (tabela "Rateio Frete"):
+# "valor" (proporcional ao valor da nota e do item), "igual" (partes iguais) ou "nenhum"
+RATEIO_FRETE = "valor"
+
+# Auditoria de impostos por item (aba "Auditoria Impostos"): Base x Alíquota contra o valor
+# de ICMS, ST, PIS, COFINS e IPI e a soma dos itens contra o total da nota
+AUDITORIA_IMPOSTOS = True
+# Diferença máxima aceita (em R$) em cada conferência
+AUDITORIA_TOLERANCIAS = {"ICMS": 0.01, "ICMS ST": 0.01, "PIS": 0.01, "COFINS": 0.01, "IPI": 0.01, "Total Nota": 0.05}
+# Grava só os itens com divergência (False: todos, com "OK" nos que conferem)
+AUDITORIA_SOMENTE_DIVERGENCIAS = False
+
+# Aba "Resumo" (primeira da planilha): totais dos itens NFe por agrupamento.
+# Opções: "CFOP", "NCM", "CNPJ Emitente", "UF Emitente", "UF Destinatário", "Mês"; () desliga
+RESUMO_AGRUPAMENTOS = ("CFOP", "NCM", "CNPJ Emitente", "UF Emitente", "UF Destinatário", "Mês")
+
+# Saída normalizada: a tabela NFe sai em "NFe Notas" (cabeçalho, uma linha por chave de acesso)
+# e "NFe Itens" (itens com a chave), sem repetir os dados da nota em cada item
+SAIDA_NORMALIZADA = False
+
+# Excel: "streaming" (linha a linha, memória constante) ou "pandas" (to_excel + estilo por célula)
+MODO_EXCEL = "streaming"
+# Tabelas maiores que o limite do Excel (1.048.575 linhas + cabeçalho) são divididas a cada
+# EXCEL_LINHAS_POR_ABA linhas: em novas abas ("abas") ou em arquivos gravados em paralelo ("arquivos")
+EXCEL_LINHAS_POR_ABA = 1048575
+EXCEL_DIVISAO = "arquivos"
+
+# CSV: separador e quantidade de linhas acumuladas antes de cada gravação em disco
+CSV_SEPARADOR = ";"
+CSV_BUFFER_LINHAS = 5000
+
+# --- VARREDURA DE ARQUIVOS ---
+# Desce em subpastas da pasta selecionada
+BUSCA_RECURSIVA = True
+# Padrões glob testados contra o nome e o caminho relativo (ex.: "*canc*", "backup/*")
+PADROES_INCLUIR = ("*.xml", "*.zip")
+PADROES_EXCLUIR = ()
+
+# --- DIAGNÓSTICO DE DESEMPENHO ---
+# Grava <saida>_execucao.json com tempos por etapa, arquivos mais lentos e pico de memória
+# (desligado por padrão; na linha de comando: --relatorio-execucao)
+RELATORIO_EXECUCAO = False
+INSTRUMENTACAO_MAIS_LENTOS = 10
+# Roda as tarefas dos workers sob cProfile e grava <saida>_perfil.prof (deixa o processamento mais lento)
+PERFILAR_WORKERS = False
+
+# --- INTERFACE ---
+# A tela consulta a fila do processamento UI_FPS vezes por segundo; o progresso
+# é repassado no máximo a cada UI_INTERVALO_PROGRESSO_MS (o log vai sempre inteiro)
+UI_FPS = 30
+UI_INTERVALO_PROGRESSO_MS = 100
+# Ao fechar a janela durante o processamento: espera máxima pelo fim da thread
+UI_ESPERA_FECHAR_S = 30
+
 # --- OUTROS ---
 PASTA_PADRAO_XML = ""
@@ -0,0 +1,368 @@
+# Arquivo: core/esquema.py
+# Registro declarativo das colunas das tabelas NFe e CTe: nome, origem no XML,
+# tipo lógico, escala e formato no Excel. É compilado uma única vez (na importação)
+# em funções que montam as linhas do extrator, nos tipos da exportação colunar e
+# nos formatos das colunas do Excel.
+import re
+from collections import namedtuple
+
+from core.xml_parser import XMLParser
+
+# Tipos lógicos (usados também pelo exportador Parquet/Arrow):
+#   "categoria" -> texto com dicionário (valores que se repetem: UF, CFOP, CNPJ...)
+#   "texto"     -> texto livre
+#   "chave"     -> chave de acesso sem o apóstrofo do Excel (com dicionário)
+#   "numero"    -> float64 | "inteiro" -> int32 | "data" -> date32 | "hora" -> time32(s)
+TIPOS = ("categoria", "texto", "chave", "numero", "inteiro", "data", "hora")
+
+# Formatos numéricos do Excel
+MOEDA = '#,##0.00_-'
+PERCENTUAL = '0.00%'
+
+# origem: "grupo/tag" (texto do filho), "grupo/@atributo", "grupo/a|b" (o primeiro
+#         preenchido) ou "=constante". Os grupos estão em GRUPOS_NFE/GRUPOS_CTE.
+# escala: divisor aplicado ao número (100 para as alíquotas em percentual)
+# regra:  nome de uma função de REGRAS aplicada ao valor já convertido
+# destaque: None, "cinza" ou "status" (cor da coluna no Excel)
+Campo = namedtuple("Campo", "coluna origem tipo escala regra formato largura destaque",
+                   defaults=(None, None, None, 15, None))
+
+
+def _float(txt):
+    if not txt: return 0.0
+    try:
+        return float(txt)
+    except ValueError:
+        return 0.0
+
+
+def _red_st(valor):
+    # pRedBCST: 1.0 significa "sem redução"; valores entre 0 e 1 vêm como fração a manter
+    if valor == 1.0: return 0.0
+    if 0.0 < valor < 1.0: return 1.0 - valor
+    return valor / 100
+
+
+REGRAS = {
+    "movimento": lambda tp: "ENTRADA" if tp == '0' else "SAÍDA" if tp == '1' else tp,
+    "data": lambda dh: XMLParser.formatar_data_hora(dh)[0],
+    "hora": lambda dh: XMLParser.formatar_data_hora(dh)[1],
+    "simples": lambda crt: "Sim" if crt == '1' else "Não",
+    "chave": lambda id_: "'" + re.sub(r'\D', '', id_ or ''),
+    "red_st": _red_st,
+}
+
+# Grupos de origem: nome -> (nível, o que contém). Nível "cabecalho" é lido uma vez por
+# documento; "item" uma vez por det; "pronto" traz valores já extraídos e tipados.
+GRUPOS_NFE = {
+    "inf": ("cabecalho", "atributos do infNFe"),
+    "ide": ("cabecalho", "infNFe/ide"),
+    "emit": ("cabecalho", "infNFe/emit"),
+    "enderEmit": ("cabecalho", "infNFe/emit/enderEmit"),
+    "dest": ("cabecalho", "infNFe/dest"),
+    "enderDest": ("cabecalho", "infNFe/dest/enderDest"),
+    "ICMSTot": ("cabecalho", "infNFe/total/ICMSTot"),
+    "infAdic": ("cabecalho", "infNFe/infAdic"),
+    "det": ("item", "atributos do det"),
+    "prod": ("item", "det/prod"),
+    "comb": ("item", "det/prod/comb"),
+    "ICMS": ("item", "det/imposto/ICMS/ICMSxx (primeiro subgrupo ICMS; 'orig' é o primeiro preenchido)"),
+    "PIS": ("item", "det/imposto/PIS/* (último subgrupo)"),
+    "COFINS": ("item", "det/imposto/COFINS/* (último subgrupo)"),
+    "IPITrib": ("item", "det/imposto/IPI/IPITrib"),
+    "CBS": ("item", "det/imposto/CBS/* (primeiro; sem CBS, o cClass vem do IBS)"),
+    "IBS": ("item", "det/imposto/IBS/*"),
+    "II": ("item", "det/imposto/II"),
+    "IPIDevol": ("item", "det/impostoDevol/IPI"),
+}
+
+CAMPOS_NFE = (
+    Campo("Tipo", "=NFe", "categoria"),
+    Campo("Mov", "ide/tpNF", "categoria", regra="movimento"),
+    Campo("Data Emissão", "ide/dhEmi", "data", regra="data"),
+    Campo("Hora Emissão", "ide/dhEmi", "hora", regra="hora"),
+    Campo("Modelo", "ide/mod", "categoria", largura=12),
+    Campo("Numero NF", "ide/nNF", "categoria", largura=12),
+    Campo("Serie", "ide/serie", "categoria", largura=12),
+    Campo("Natureza Op.", "ide/natOp", "categoria", largura=35),
+    Campo("Fornecedor/Emitente", "emit/xNome", "categoria", largura=35),
+    Campo("CNPJ", "emit/CNPJ|CPF", "categoria", largura=12),
+    Campo("UF Emit.", "enderEmit/UF", "categoria", largura=12),
+    Campo("Destinatario/Tomador", "dest/xNome", "categoria", largura=35),
+    Campo("CNPJ/CPF", "dest/CNPJ|CPF", "categoria", largura=12),
+    Campo("UF Destinatario", "enderDest/UF", "categoria", largura=12),
+    Campo("Item", "det/@nItem", "inteiro"),
+    Campo("Pedido Compra (xPed)", "prod/xPed", "texto"),
+    Campo("Item Pedido", "prod/nItemPed", "texto"),
+    Campo("EAN/GTIN", "prod/cEAN", "texto"),
+    Campo("Cod", "prod/cProd", "texto"),
+    Campo("Produto", "prod/xProd", "texto", largura=35),
+    Campo("NCM", "prod/NCM", "categoria", largura=12),
+    Campo("CFOP", "prod/CFOP", "categoria"),
+    Campo("Cod. ANP", "comb/cProdANP", "categoria", largura=12),
+    Campo("Unid.", "prod/uCom", "categoria"),
+    Campo("Qtde", "prod/qCom", "numero"),
+    Campo("Valor Unit.", "prod/vUnCom", "numero", formato=MOEDA, largura=18),
+    Campo("Valor Desconto", "prod/vDesc", "numero", formato=MOEDA, largura=18),
+    Campo("Valor Frete", "prod/vFrete", "numero", formato=MOEDA, largura=18),
+    Campo("Valor Seguro", "prod/vSeg", "numero", formato=MOEDA, largura=18),
+    Campo("Outras Desp.", "prod/vOutro", "numero", formato=MOEDA, largura=18),
+    Campo("Valor Total", "prod/vProd", "numero", formato=MOEDA, largura=18),
+    Campo("Valor Total Nota", "ICMSTot/vNF", "numero", formato=MOEDA, largura=18),
+    # Impostos
+    Campo("Origem", "ICMS/orig", "categoria", destaque="cinza"),
+    Campo("CST", "ICMS/CST|CSOSN", "categoria"),
+    Campo("Simples Nac.", "emit/CRT", "categoria", regra="simples"),
+    Campo("Credito Simples Nacional", "ICMS/vCredICMSSN", "numero", formato=MOEDA, largura=18),
+    Campo("Base Cálc. ICMS", "ICMS/vBC", "numero", formato=MOEDA, largura=18),
+    Campo("ALIQ. ICMS", "ICMS/pICMS", "numero", escala=100, formato=PERCENTUAL, largura=12),
+    Campo("Valor ICMS", "ICMS/vICMS", "numero", formato=MOEDA, largura=18),
+    Campo("ICMS Desonerado", "ICMS/vICMSDeson", "numero", formato=MOEDA, largura=18),
+    Campo("CEST", "prod/CEST", "categoria", largura=12),
+    Campo("MVA", "ICMS/pMVAST", "numero", escala=100, formato=PERCENTUAL, largura=12),
+    Campo("Base ST", "ICMS/vBCST", "numero", formato=MOEDA, largura=18),
+    Campo("Aliq. ICMS ST", "ICMS/pICMSST", "numero", escala=100, formato=PERCENTUAL, largura=12),
+    Campo("Red. ST", "ICMS/pRedBCST", "numero", regra="red_st", formato=PERCENTUAL, largura=12),
+    Campo("Valor ICMS ST", "ICMS/vICMSST", "numero", formato=MOEDA, largura=18),
+    Campo("Valor FCP ST", "ICMS/vFCPST", "numero", formato=MOEDA, largura=18),
+    Campo("Base Pis", "PIS/vBC", "numero", formato=MOEDA, largura=18),
+    Campo("CST Pis", "PIS/CST", "categoria"),
+    Campo("Aliquota Pis", "PIS/pPIS", "numero", escala=100, formato=PERCENTUAL, largura=12),
+    Campo("Valor Pis", "PIS/vPIS", "numero", formato=MOEDA, largura=18),
+    Campo("Base Cofins", "COFINS/vBC", "numero", formato=MOEDA, largura=18),
+    Campo("CST Cofins", "COFINS/CST", "categoria"),
+    Campo("Aliquota Cofins", "COFINS/pCOFINS", "numero", escala=100, formato=PERCENTUAL, largura=12),
+    Campo("Valor Cofins", "COFINS/vCOFINS", "numero", formato=MOEDA, largura=18),
+    Campo("Base IPI", "IPITrib/vBC", "numero", formato=MOEDA, largura=18),
+    Campo("CST IPI", "IPITrib/CST", "categoria"),
+    Campo("Aliquota IPI", "IPITrib/pIPI", "numero", escala=100, formato=PERCENTUAL, largura=12),
+    Campo("Valor IPI", "IPITrib/vIPI", "numero", formato=MOEDA, largura=18),
+    Campo("IPI Devolvido", "IPIDevol/vIPIDevol", "numero", formato=MOEDA, largura=18),
+    Campo("Valor II", "II/vII", "numero", formato=MOEDA, largura=18),
+    # Reforma Tributária
+    Campo("CST Reforma", "CBS/CST", "categoria"),
+    Campo("ClassTrib", "CBS/cClass", "categoria"),
+    Campo("Base CBS", "CBS/vBC", "numero", formato=MOEDA, largura=18),
+    Campo("Aliq. CBS", "CBS/pAliq", "numero", escala=100, formato=PERCENTUAL, largura=12),
+    Campo("Valor CBS", "CBS/vCBS", "numero", formato=MOEDA, largura=18),
+    Campo("Base IBS", "IBS/vBC", "numero", formato=MOEDA, largura=18),
+    Campo("Aliq. IBS", "IBS/pAliq", "numero", escala=100, formato=PERCENTUAL, largura=12),
+    Campo("Valor IBS", "IBS/vIBS", "numero", formato=MOEDA, largura=18),
+    Campo("Dados Complementares", "infAdic/infCpl", "categoria"),
+    Campo("Chave de Acesso", "inf/@Id", "chave", regra="chave", largura=47),
+)
+
+# O CTe é lido pelas funções do XMLParser: os grupos trazem os valores já extraídos
+GRUPOS_CTE = {
+    "cte": ("pronto", "ide, valores, carga, modal, ICMS e NFes vinculadas"),
+    "emit": ("pronto", "XMLParser.obter_emitente"),
+    "rota": ("pronto", "XMLParser.obter_rota_e_obs"),
+    "atores": ("pronto", "XMLParser.obter_atores_cte"),
+}
+
+CAMPOS_CTE = (
+    Campo("Chave de Acesso", "cte/chave", "chave", largura=47),
+    Campo("Data Emissão", "cte/data", "data"),
+    Campo("Numero CTe", "cte/nCT", "texto", largura=12),
+    Campo("Serie", "cte/serie", "categoria", largura=12),
+    Campo("CFOP", "cte/CFOP", "categoria"),
+    # Financeiro
+    Campo("Valor Total Frete", "cte/vTPrest", "numero", formato=MOEDA, largura=18),
+    Campo("Valor da Carga", "cte/vCarga", "numero", formato=MOEDA, largura=18),
+    Campo("Peso/Qtde", "cte/qCarga", "numero"),
+    Campo("Unid. Medida", "cte/unidade", "categoria"),
+    # Atores Envolvidos
+    Campo("Tomador (Pagador)", "cte/tomador", "categoria", largura=35),
+    Campo("CNPJ Tomador", "cte/doc_tomador", "categoria", largura=12),
+    Campo("Emitente (Transportadora)", "emit/Nome", "categoria", largura=35),
+    Campo("CNPJ Emitente", "emit/CNPJ", "categoria", largura=12),
+    Campo("UF Emit.", "emit/UF", "categoria", largura=12),
+    # Logística Detalhada
+    Campo("Placa Veículo", "cte/placa", "categoria"),
+    Campo("RNTRC", "cte/RNTRC", "categoria"),
+    Campo("Remetente (Origem)", "atores/Remetente_Nome", "categoria", destaque="cinza"),
+    Campo("Origem (Mun. Ini)", "rota/Inicio", "categoria", destaque="cinza"),
+    Campo("UF Origem", "rota/UF_Inicio", "categoria", largura=12, destaque="cinza"),
+    Campo("Destinatário (Destino)", "atores/Destinatario_Nome", "categoria"),
+    Campo("Destino (Mun. Fim)", "rota/Fim", "categoria"),
+    Campo("UF Destino", "rota/UF_Fim", "categoria", largura=12),
+    Campo("Observações", "rota/Obs", "texto", largura=35),
+    # Tributos
+    Campo("Base Cálc. ICMS", "cte/vBC", "numero", formato=MOEDA, largura=18),
+    Campo("ALIQ. ICMS", "cte/pICMS", "numero", formato=PERCENTUAL, largura=12),
+    Campo("Valor ICMS", "cte/vICMS", "numero", formato=MOEDA, largura=18),
+    Campo("NFes Vinculadas", "cte/chaves_nfe", "texto"),
+)
+
+
+# Colunas acrescentadas depois da extração (junção com o índice de eventos)
+CAMPOS_DERIVADOS = (
+    Campo("Situação", "eventos/situacao", "categoria", largura=26, destaque="status"),
+)
+
+# Tabela do rateio de frete CTe -> NFe (montada por core.rateio_frete, não pelo extrator)
+CAMPOS_RATEIO = (
+    Campo("Chave CTe", "rateio/chave_cte", "chave", largura=47),
+    Campo("Numero CTe", "rateio/nCT", "texto", largura=12),
+    Campo("Transportadora", "rateio/transportadora", "categoria", largura=35),
+    Campo("CNPJ Transportadora", "rateio/cnpj_transportadora", "categoria", largura=12),
+    Campo("Valor Total Frete", "rateio/vTPrest", "numero", formato=MOEDA, largura=18),
+    Campo("Chave NFe", "rateio/chave_nfe", "chave", largura=47),
+    Campo("Numero NF", "rateio/nNF", "categoria", largura=12),
+    Campo("Fornecedor/Emitente", "rateio/emitente_nfe", "categoria", largura=35),
+    Campo("% Rateio Nota", "rateio/participacao_nota", "numero", formato=PERCENTUAL, largura=12),
+    Campo("Frete Nota", "rateio/frete_nota", "numero", formato=MOEDA, largura=18),
+    Campo("Item", "rateio/nItem", "inteiro"),
+    Campo("Cod", "rateio/cProd", "texto"),
+    Campo("Produto", "rateio/xProd", "texto", largura=35),
+    Campo("Valor Total", "rateio/vProd", "numero", formato=MOEDA, largura=18),
+    Campo("% Rateio Item", "rateio/participacao_item", "numero", formato=PERCENTUAL, largura=12),
+    Campo("Frete Rateado", "rateio/frete_item", "numero", formato=MOEDA, largura=18),
+    Campo("Status Rateio", "rateio/status", "categoria", largura=18, destaque="status"),
+)
+
+# Tabela da auditoria de impostos por item (montada por core.auditoria)
+CAMPOS_AUDITORIA = (
+    Campo("Chave de Acesso", "auditoria/chave", "chave", largura=47),
+    Campo("Numero NF", "auditoria/nNF", "categoria", largura=12),
+    Campo("Fornecedor/Emitente", "auditoria/emitente", "categoria", largura=35),
+    Campo("Item", "auditoria/nItem", "inteiro"),
+    Campo("Produto", "auditoria/xProd", "texto", largura=35),
+    Campo("CST", "auditoria/CST", "categoria"),
+    Campo("Dif. ICMS", "auditoria/dif_icms", "numero", formato=MOEDA, largura=14),
+    Campo("Dif. ICMS ST", "auditoria/dif_st", "numero", formato=MOEDA, largura=14),
+    Campo("Dif. PIS", "auditoria/dif_pis", "numero", formato=MOEDA, largura=14),
+    Campo("Dif. COFINS", "auditoria/dif_cofins", "numero", formato=MOEDA, largura=14),
+    Campo("Dif. IPI", "auditoria/dif_ipi", "numero", formato=MOEDA, largura=14),
+    Campo("Soma Itens", "auditoria/soma_itens", "numero", formato=MOEDA, largura=18),
+    Campo("Valor Total Nota", "auditoria/vNF", "numero", formato=MOEDA, largura=18),
+    Campo("Dif. Total Nota", "auditoria/dif_total", "numero", formato=MOEDA, largura=14),
+    Campo("Status", "auditoria/status", "categoria", largura=30, destaque="status"),
+)
+
+# Tabela de totais por CFOP, NCM, emitente, UF e mês (montada por core.resumo)
+CAMPOS_RESUMO = (
+    Campo("Agrupamento", "resumo/agrupamento", "categoria", largura=18),
+    Campo("Código", "resumo/codigo", "categoria", largura=16),
+    Campo("Descrição", "resumo/descricao", "texto", largura=35),
+    Campo("Notas", "resumo/notas", "inteiro", largura=10),
+    Campo("Itens", "resumo/itens", "inteiro", largura=10),
+    Campo("Valor Total", "resumo/vProd", "numero", formato=MOEDA, largura=18),
+    Campo("Valor ICMS", "resumo/vICMS", "numero", formato=MOEDA, largura=18),
+    Campo("Valor ICMS ST", "resumo/vICMSST", "numero", formato=MOEDA, largura=18),
+    Campo("Valor Pis", "resumo/vPIS", "numero", formato=MOEDA, largura=18),
+    Campo("Valor Cofins", "resumo/vCOFINS", "numero", formato=MOEDA, largura=18),
+    Campo("Valor IPI", "resumo/vIPI", "numero", formato=MOEDA, largura=18),
+    Campo("Valor CBS", "resumo/vCBS", "numero", formato=MOEDA, largura=18),
+    Campo("Valor IBS", "resumo/vIBS", "numero", formato=MOEDA, largura=18),
+)
+
+
+class Esquema:
+    """Compila os registros de campos em funções de montagem de linha e tabelas de formato."""
+
+    @staticmethod
+    def _expressao(campo, grupos):
+        """Código Python que lê o valor do campo a partir das variáveis de grupo."""
+        if campo.tipo not in TIPOS:
+            raise Exception(f"Tipo inválido na coluna '{campo.coluna}': {campo.tipo}")
+        if campo.origem.startswith("="):
+            return repr(campo.origem[1:])
+
+        grupo, _, tag = campo.origem.partition("/")
+        if grupo not in grupos or not tag:
+            raise Exception(f"Origem inválida na coluna '{campo.coluna}': {campo.origem}")
+
+        if grupos[grupo][0] == "pronto":
+            expr = f"{grupo}[{tag!r}]"
+        elif tag.startswith("@") or campo.tipo == "inteiro":
+            # Atributos e inteiros seguem como texto (None se ausentes)
+            expr = f"{grupo}.get({tag.lstrip('@')!r})"
+        else:
+            alternativas = tag.split("|")
+            partes = [f"{grupo}.get({t!r})" for t in alternativas[:-1]]
+            partes.append(f"{grupo}.get({alternativas[-1]!r}, '')")
+            expr = " or ".join(partes)
+            if len(partes) > 1: expr = f"({expr})"
+            if campo.tipo == "numero":
+                expr = f"_float({expr})"
+
+        if campo.escala:
+            expr = f"{expr} / {campo.escala!r}"
+        if campo.regra:
+            if campo.regra not in REGRAS:
+                raise Exception(f"Regra inválida na coluna '{campo.coluna}': {campo.regra}")
+            expr = f"_regras[{campo.regra!r}]({expr})"
+        return expr
+
+    @staticmethod
+    def _definir(nome, parametros, corpo):
+        codigo = f"def {nome}({', '.join(parametros)}):\n    return {corpo}\n"
+        escopo = {"_float": _float, "_regras": REGRAS}
+        exec(compile(codigo, f"<esquema:{nome}>", "exec"), escopo)
+        return escopo[nome]
+
+    @staticmethod
+    def do_cabecalho(campo, grupos):
+        """True se o campo é lido uma vez por documento (constante ou grupo de nível "cabecalho")."""
+        return campo.origem.startswith("=") or grupos[campo.origem.partition("/")[0]][0] == "cabecalho"
+
+    @staticmethod
+    def compilar_nfe(campos=CAMPOS_NFE, grupos=GRUPOS_NFE):
+        """
+        Retorna (cabecalho, linha):
+          cabecalho(inf, ide, emit, ...) -> tupla com os campos do documento (uma vez por infNFe)
+          linha(cab, det, prod, ...)     -> dict da linha, na ordem de 'campos' (uma vez por item)
+        """
+        nomes_cab = [g for g, (nivel, _) in grupos.items() if nivel == "cabecalho"]
+        nomes_item = [g for g, (nivel, _) in grupos.items() if nivel == "item"]
+
+        exprs_cab = []
+        entradas = []
+        for campo in campos:
+            expr = Esquema._expressao(campo, grupos)
+            if Esquema.do_cabecalho(campo, grupos):
+                entradas.append(f"{campo.coluna!r}: cab[{len(exprs_cab)}]")
+                exprs_cab.append(expr)
+            else:
+                entradas.append(f"{campo.coluna!r}: {expr}")
+
+        cabecalho = Esquema._definir("cabecalho_nfe", nomes_cab, f"({', '.join(exprs_cab)},)")
+        linha = Esquema._definir("linha_nfe", ["cab"] + nomes_item, "{" + ", ".join(entradas) + "}")
+        return cabecalho, linha
+
+    @staticmethod
+    def compilar_pronto(nome, campos, grupos):
+        """Função (grupo1, grupo2, ...) -> dict da linha, para grupos de valores já extraídos."""
+        entradas = [f"{c.coluna!r}: {Esquema._expressao(c, grupos)}" for c in campos]
+        return Esquema._definir(nome, list(grupos), "{" + ", ".join(entradas) + "}")
+
+    @staticmethod
+    def tipos(campos):
+        """[(coluna, tipo lógico)] na ordem da tabela."""
+        return [(c.coluna, c.tipo) for c in campos]
+
+    @staticmethod
+    def formatos_excel(*tabelas):
+        """{coluna: (largura, formato, destaque)}; a mesma coluna não pode divergir entre tabelas."""
+        formatos = {}
+        for campos in tabelas:
+            for c in campos:
+                estilo = (c.largura, c.formato or 'General', c.destaque)
+                if formatos.setdefault(c.coluna, estilo) != estilo:
+                    raise Exception(f"Coluna '{c.coluna}' com formatos diferentes entre as tabelas")
+        return formatos
+
+
+# Compilado uma vez, na importação do módulo
+CABECALHO_NFE, LINHA_NFE = Esquema.compilar_nfe()
+LINHA_CTE = Esquema.compilar_pronto("linha_cte", CAMPOS_CTE, GRUPOS_CTE)
+# Saída normalizada da tabela NFe: campos do documento (uma linha por chave, com a Situação)
+# e campos do item, os dois com a chave de acesso primeiro para a junção
+_CHAVE_NFE = next(c for c in CAMPOS_NFE if c.coluna == "Chave de Acesso")
+CAMPOS_NOTA_NFE = (_CHAVE_NFE,) + CAMPOS_DERIVADOS + tuple(
+    c for c in CAMPOS_NFE if c is not _CHAVE_NFE and Esquema.do_cabecalho(c, GRUPOS_NFE)
+)
+CAMPOS_ITEM_NFE = (_CHAVE_NFE,) + tuple(c for c in CAMPOS_NFE if not Esquema.do_cabecalho(c, GRUPOS_NFE))
+FORMATOS_EXCEL = Esquema.formatos_excel(CAMPOS_NFE, CAMPOS_CTE, CAMPOS_DERIVADOS, CAMPOS_RATEIO, CAMPOS_AUDITORIA,
+                                        CAMPOS_RESUMO)
@@ -1,65 +1,347 @@
 # Arquivo: core/excel_writer.py (VERSÃO SIMPLES)
+import os
+import re
+import csv
+import math
 import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.formatting.rule import FormulaRule
 from openpyxl.styles import Font, PatternFill, Alignment
 from openpyxl.utils import get_column_letter
+from core.instrumentacao import medidor
 from core.logger import SistemaLog
+from core.esquema import FORMATOS_EXCEL
+from core.normalizacao import SaidaNormalizada
+import config
+
+try:
+    # Opcional: motor mais rápido para o modo streaming (formatos por coluna)
+    import xlsxwriter
+except ImportError:
+    xlsxwriter = None
+
+COR_HEADER = "00061A"
+COR_CINZA = "E5E5E5"
+CORES_STATUS = {"OK": "C6EFCE", "ERRO": "FFC7CE", "SO_NO": "FFEB9C"}
+# Texto contido na célula -> cor (a primeira regra que casar vale)
+REGRAS_STATUS = (("OK", "OK"), ("DIVERGÊNCIA", "ERRO"), ("ERRO", "ERRO"), ("CANCELADA", "ERRO"), ("SÓ NO", "SO_NO"))
+
+# Limite do Excel: 1.048.576 linhas por aba, contando o cabeçalho
+MAX_LINHAS_EXCEL = 1048576
 
 class ExcelReportWriter:
     @staticmethod
-    def gerar_relatorio(caminho_arquivo, df_concilia, df_nfe, df_cte):
+    def gerar_relatorio(caminho_arquivo, df_concilia, df_nfe, df_cte, modo=None,
+                        linhas_por_aba=None, divisao=None, instrumentacao=None, extras=None,
+                        titulo_resumo="RESUMO CONCILIAÇÃO", normalizada=None):
         """
         Gera o arquivo Excel final. (Adaptado para ignorar conciliação se for None)
+        modo: "streaming" (padrão: escrita linha a linha, estilos aplicados uma vez
+        por coluna, memória constante) ou "pandas" (to_excel + estilo célula a célula).
+        Tabelas acima de 'linhas_por_aba' são divididas em partes: novas abas no mesmo
+        arquivo (divisao="abas") ou pastas de trabalho separadas, gravadas em paralelo
+        (divisao="arquivos"). Havendo divisão, <base>_indice.csv lista onde ficou cada parte.
+        Retorna a lista de arquivos gerados (o principal primeiro).
+        instrumentacao: Instrumentacao opcional que recebe os tempos das subetapas ("excel/...").
+        extras: tabelas derivadas [(nome, df, campos)] gravadas em abas após NFe/CTe
+        (ex.: rateio de frete).
+        titulo_resumo: nome da aba de df_concilia (a primeira da planilha).
+        normalizada: abas "NFe Notas" e "NFe Itens" no lugar de "NFe - Detalhado"
+        (ver SaidaNormalizada; padrão: config.SAIDA_NORMALIZADA).
         """
+        modo = modo or config.MODO_EXCEL
+        divisao = divisao or config.EXCEL_DIVISAO
+        if divisao not in ("abas", "arquivos"):
+            raise Exception(f"Divisão de planilha inválida: {divisao}")
+        limite = min(int(linhas_por_aba or config.EXCEL_LINHAS_POR_ABA), MAX_LINHAS_EXCEL - 1)
+        if limite < 1:
+            raise Exception(f"Linhas por aba inválido: {linhas_por_aba}")
+
         try:
-            with pd.ExcelWriter(caminho_arquivo, engine='openpyxl') as writer:
-                has_data = False
-                
-                # 1. Aba Resumo (SÓ CRIA SE TIVER DADOS E NÃO FOR NONE)
-                if df_concilia is not None and not df_concilia.empty:
-                    # Ordena por Status para erros ficarem no topo
-                    if "Status Geral" in df_concilia.columns:
-                        df_concilia.sort_values(by="Status Geral", ascending=True, inplace=True)
-                    
-                    df_concilia.to_excel(writer, sheet_name="RESUMO CONCILIAÇÃO", index=False)
-                    has_data = True
-                
-                # 2. Aba NFe
-                if not df_nfe.empty: 
-                    df_nfe.to_excel(writer, sheet_name="NFe - Detalhado", index=False)
-                    has_data = True
-
-                # 3. Aba CTe
-                if not df_cte.empty: 
-                    df_cte.to_excel(writer, sheet_name="CTe - Detalhado", index=False)
-                    has_data = True
-                
-                # Fallback se tudo vazio
-                if not has_data:
-                    pd.DataFrame(["Sem dados XML encontrados"]).to_excel(writer, sheet_name="Aviso", index=False)
+            abas = []
+            
+            # 1. Aba Resumo (SÓ CRIA SE TIVER DADOS E NÃO FOR NONE)
+            if df_concilia is not None and not df_concilia.empty:
+                # Ordena por Status para erros ficarem no topo
+                if "Status Geral" in df_concilia.columns:
+                    df_concilia.sort_values(by="Status Geral", ascending=True, inplace=True)
+                abas.append((titulo_resumo, df_concilia))
+            
+            # 2. Aba NFe (ou notas + itens, na saída normalizada)
+            if not df_nfe.empty:
+                if SaidaNormalizada.ativa(normalizada):
+                    abas.extend((nome, df) for nome, df, _ in SaidaNormalizada.tabelas(df_nfe))
+                else:
+                    abas.append(("NFe - Detalhado", df_nfe))
 
-                # Aplica estilos em todas as abas criadas
-                for sheet in writer.sheets: 
-                    ExcelReportWriter._estilizar_planilha(writer.sheets[sheet])
+            # 3. Aba CTe
+            if not df_cte.empty: abas.append(("CTe - Detalhado", df_cte))
+
+            # 4. Tabelas derivadas (rateio de frete...)
+            for nome, df, _ in extras or ():
+                if df is not None and not df.empty: abas.append((nome, df))
             
-            return True
+            # Fallback se tudo vazio
+            if not abas:
+                abas.append(("Aviso", pd.DataFrame(["Sem dados XML encontrados"])))
+
+            arquivos, indice = ExcelReportWriter._dividir(caminho_arquivo, abas, limite, divisao)
+
+            if len(arquivos) == 1:
+                ExcelReportWriter._gravar_arquivo(caminho_arquivo, arquivos[0][1], modo, instrumentacao)
+            else:
+                # Cada pasta de trabalho é independente: um processo por arquivo
+                n_workers = min(len(arquivos), os.cpu_count() or 1)
+                with medidor(instrumentacao)(f"excel/{len(arquivos)} arquivos em paralelo"), \
+                        ProcessPoolExecutor(max_workers=n_workers) as executor:
+                    tarefas = [executor.submit(ExcelReportWriter._gravar_arquivo, caminho, partes, modo)
+                               for caminho, partes in arquivos]
+                    for tarefa in tarefas: tarefa.result()
+
+            gerados = [caminho for caminho, _ in arquivos]
+            if any(parte > 1 for _, parte, _, _, _, _ in indice):
+                gerados.append(ExcelReportWriter._gravar_indice(caminho_arquivo, indice))
+            return gerados
 
         except Exception as e:
             SistemaLog.registrar_erro("Erro ao gerar Excel formatado", e)
             raise e
 
+    @staticmethod
+    def _dividir(caminho_arquivo, abas, limite, divisao):
+        """
+        Reparte as abas em blocos de até 'limite' linhas.
+        Retorna ([(caminho, [(nome_aba, df)])], [(tabela, parte, caminho, aba, linha_ini, linha_fim)]).
+        """
+        base, ext = os.path.splitext(caminho_arquivo)
+        principal = []
+        arquivos = [(caminho_arquivo, principal)]
+        indice = []
+
+        for nome, df in abas:
+            n = len(df)
+            partes = max(1, math.ceil(n / limite))
+            for p in range(partes):
+                ini = p * limite
+                pedaco = df if partes == 1 else df.iloc[ini:ini + limite]
+                aba = nome if partes == 1 else f"{nome} ({p + 1})"
+
+                # A primeira parte fica sempre no arquivo escolhido pelo usuário
+                if divisao == "arquivos" and p > 0:
+                    sufixo = re.sub(r'\W+', '_', nome).strip('_')
+                    caminho = f"{base}_{sufixo}_parte{p + 1}{ext}"
+                    arquivos.append((caminho, [(aba, pedaco)]))
+                else:
+                    caminho = caminho_arquivo
+                    principal.append((aba, pedaco))
+                indice.append((nome, p + 1, caminho, aba, ini + 1, ini + len(pedaco)))
+
+        return arquivos, indice
+
+    @staticmethod
+    def _gravar_arquivo(caminho_arquivo, abas, modo, instrumentacao=None):
+        medir = medidor(instrumentacao)
+        if modo == "streaming":
+            with medir("excel/escrita streaming"):
+                ExcelReportWriter._gerar_streaming(caminho_arquivo, abas)
+        else:
+            with pd.ExcelWriter(caminho_arquivo, engine='openpyxl') as writer:
+                with medir("excel/to_excel"):
+                    for nome, df in abas:
+                        df.to_excel(writer, sheet_name=nome, index=False)
+
+                # Aplica estilos em todas as abas criadas
+                with medir("excel/_estilizar_planilha"):
+                    for sheet in writer.sheets: 
+                        ExcelReportWriter._estilizar_planilha(writer.sheets[sheet])
+                # O arquivo é gravado no fechamento do ExcelWriter (fica no total "excel")
+
+    @staticmethod
+    def _gravar_indice(caminho_arquivo, indice):
+        """Grava <base>_indice.csv com o destino de cada parte. Retorna o caminho."""
+        base, _ = os.path.splitext(caminho_arquivo)
+        caminho = f"{base}_indice.csv"
+        with open(caminho, 'w', encoding='utf-8-sig', newline='') as arquivo:
+            writer = csv.writer(arquivo, delimiter=config.CSV_SEPARADOR)
+            writer.writerow(["Tabela", "Parte", "Arquivo", "Aba", "Linha Inicial", "Linha Final"])
+            for tabela, parte, destino, aba, ini, fim in indice:
+                writer.writerow([tabela, parte, os.path.basename(destino), aba, ini, fim])
+        return caminho
+
+    @staticmethod
+    def _linhas(df):
+        """Percorre o DataFrame linha a linha, trocando NaN por célula vazia."""
+        for linha in df.itertuples(index=False, name=None):
+            yield [None if isinstance(v, float) and math.isnan(v) else v for v in linha]
+
+    @staticmethod
+    def _gerar_streaming(caminho_arquivo, abas):
+        if xlsxwriter is not None:
+            ExcelReportWriter._escrever_xlsxwriter(caminho_arquivo, abas)
+        else:
+            ExcelReportWriter._escrever_openpyxl(caminho_arquivo, abas)
+
+    @staticmethod
+    def _escrever_xlsxwriter(caminho_arquivo, abas):
+        """constant_memory: cada linha vai para o disco assim que é escrita."""
+        wb = xlsxwriter.Workbook(caminho_arquivo, {'constant_memory': True, 'strings_to_numbers': False,
+                                                   'strings_to_formulas': False, 'strings_to_urls': False})
+        try:
+            fmt_header = wb.add_format({'font_name': 'Calibri', 'bold': True, 'font_color': '#FFFFFF',
+                                        'bg_color': f'#{COR_HEADER}', 'align': 'center', 'valign': 'vcenter'})
+            fmt_cinza = wb.add_format({'bg_color': f'#{COR_CINZA}'})
+            fmt_status = {k: wb.add_format({'bg_color': f'#{v}'}) for k, v in CORES_STATUS.items()}
+            formatos = {}
+
+            for nome, df in abas:
+                ws = wb.add_worksheet(nome)
+                colunas = [str(c) for c in df.columns]
+                n = len(df)
+
+                # Estilos uma vez por coluna (largura, formato numérico, destaques)
+                for c, head in enumerate(colunas):
+                    width, target_fmt, destaque = ExcelReportWriter._estilo_coluna(head)
+                    fmt = None
+                    if target_fmt != 'General':
+                        fmt = formatos.get(target_fmt) or formatos.setdefault(target_fmt, wb.add_format({'num_format': target_fmt}))
+                    ws.set_column(c, c, width, fmt)
+                    if n and destaque == "cinza":
+                        ws.conditional_format(1, c, n, c, {'type': 'formula', 'criteria': 'TRUE', 'format': fmt_cinza})
+                    elif n and destaque == "status":
+                        ExcelReportWriter._regras_status_xlsxwriter(ws, c, n, fmt_status)
+
+                ws.freeze_panes(1, 0)
+                ws.autofilter(0, 0, n, len(colunas) - 1)
+                ws.write_row(0, 0, colunas, fmt_header)
+                for i, valores in enumerate(ExcelReportWriter._linhas(df), start=1):
+                    ws.write_row(i, 0, valores)
+        finally:
+            wb.close()
+
+    @staticmethod
+    def _regras_status_xlsxwriter(ws, c, n, fmt_status):
+        for texto, chave in REGRAS_STATUS:
+            ws.conditional_format(1, c, n, c, {'type': 'text', 'criteria': 'containing', 'value': texto,
+                                               'format': fmt_status[chave], 'stop_if_true': True})
+
+    @staticmethod
+    def _escrever_openpyxl(caminho_arquivo, abas):
+        """Alternativa sem xlsxwriter: openpyxl write-only (sem manter a planilha em memória)."""
+        wb = Workbook(write_only=True)
+        header_font = Font(name='Calibri', bold=True, color='FFFFFF')
+        fill_header = PatternFill(start_color=COR_HEADER, end_color=COR_HEADER, fill_type='solid')
+        fill_gray = PatternFill(start_color=COR_CINZA, end_color=COR_CINZA, fill_type='solid')
+        fills_status = {k: PatternFill(start_color=v, end_color=v, fill_type='solid') for k, v in CORES_STATUS.items()}
+        alinhamento = Alignment(horizontal='center', vertical='center')
+
+        for nome, df in abas:
+            ws = wb.create_sheet(nome)
+            colunas = [str(c) for c in df.columns]
+            n = len(df)
+            ultima = get_column_letter(max(len(colunas), 1))
+
+            formatos = []
+            for c, head in enumerate(colunas, start=1):
+                let = get_column_letter(c)
+                width, target_fmt, destaque = ExcelReportWriter._estilo_coluna(head)
+                ws.column_dimensions[let].width = width
+                formatos.append(None if target_fmt == 'General' else target_fmt)
+
+                faixa = f"{let}2:{let}{n + 1}"
+                if n and destaque == "cinza":
+                    ws.conditional_formatting.add(faixa, FormulaRule(formula=['TRUE'], fill=fill_gray))
+                elif n and destaque == "status":
+                    for texto, chave in REGRAS_STATUS:
+                        regra = FormulaRule(formula=[f'NOT(ISERROR(SEARCH("{texto}",{let}2)))'],
+                                            fill=fills_status[chave], stopIfTrue=True)
+                        ws.conditional_formatting.add(faixa, regra)
+
+            ws.freeze_panes = 'A2'
+            ws.auto_filter.ref = f"A1:{ultima}{n + 1}"
+
+            cabecalho = []
+            for head in colunas:
+                cell = WriteOnlyCell(ws, value=head)
+                cell.font = header_font
+                cell.fill = fill_header
+                cell.alignment = alinhamento
+                cabecalho.append(cell)
+            ws.append(cabecalho)
+
+            # Só as colunas com formato numérico precisam de célula estilizada
+            com_formato = [i for i, f in enumerate(formatos) if f]
+            for valores in ExcelReportWriter._linhas(df):
+                for i in com_formato:
+                    v = valores[i]
+                    if isinstance(v, (int, float)):
+                        cell = WriteOnlyCell(ws, value=v)
+                        cell.number_format = formatos[i]
+                        valores[i] = cell
+                ws.append(valores)
+
+        wb.save(caminho_arquivo)
+
+    @staticmethod
+    def _estilo_coluna(head):
+        """
+        Formatação da coluna: retorna (largura, formato, destaque), onde destaque é
+        None, "cinza" ou "status". As colunas NFe/CTe vêm do esquema; as demais
+        (conciliação, abas auxiliares) seguem as regras por palavra do cabeçalho.
+        """
+        estilo = FORMATOS_EXCEL.get(head)
+        if estilo is not None: return estilo
+
+        head = str(head).upper()
+        width = 15
+        target_fmt = 'General'
+        destaque = None
+        
+        # A. Moeda
+        palavras_moeda = [
+            'VALOR', 'BASE', 'CREDITO', 'TOTAL', 'SAP', 'DIFERENÇA', 
+            'FRETE', 'SEG', 'DESC', 'OUTR', 'PRECO', 'DESP'
+        ]
+        
+        if any(x in head for x in palavras_moeda):
+            width = 18
+            target_fmt = '#,##0.00_-'
+        
+        # B. Porcentagem
+        elif any(x in head for x in ['ALIQ', 'MVA', 'RED']): 
+            width = 12
+            target_fmt = '0.00%'
+        
+        # C. Larguras Específicas
+        elif 'CHAVE' in head: width = 47
+        elif 'STATUS' in head or 'CHECK' in head: width = 20
+        elif any(x in head for x in ['PRODUTO', 'DESTINATARIO', 'TOMADOR', 'FORNECEDOR', 'EMITENTE', 'NATUREZA', 'OBSERVAÇÕES']): 
+            width = 35
+        elif any(x in head for x in ['CNPJ', 'EMP.', 'FIL.', 'UF', 'NCM', 'CEST', 'ANP', 'NUMERO', 'SERIE', 'MODELO']): 
+            width = 12
+
+        # D. Destaques (Cores)
+        if "EMP. XML" in head or "FIL. XML" in head or "ORIGEM" in head:
+            destaque = "cinza"
+        if "STATUS" in head or "CHECK" in head:
+            destaque = "status"
+
+        return width, target_fmt, destaque
+
     @staticmethod
     def _estilizar_planilha(ws):
         """Aplica as cores e formatações padrão"""
         
         # --- Definição de Cores e Estilos ---
         header_font = Font(name='Calibri', bold=True, color='FFFFFF')
-        fill_header = PatternFill(start_color="00061A", end_color="00061A", fill_type='solid') # Azul Brasif
+        fill_header = PatternFill(start_color=COR_HEADER, end_color=COR_HEADER, fill_type='solid') # Azul Brasif
         
         # Cores para Status
-        fill_green = PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type='solid') # Verde
-        fill_red = PatternFill(start_color="FFC7CE", end_color="FFC7CE", fill_type='solid')   # Vermelho
-        fill_yellow = PatternFill(start_color="FFEB9C", end_color="FFEB9C", fill_type='solid') # Amarelo
-        fill_gray = PatternFill(start_color="E5E5E5", end_color="E5E5E5", fill_type='solid')   # Cinza
+        fill_green = PatternFill(start_color=CORES_STATUS["OK"], end_color=CORES_STATUS["OK"], fill_type='solid') # Verde
+        fill_red = PatternFill(start_color=CORES_STATUS["ERRO"], end_color=CORES_STATUS["ERRO"], fill_type='solid')   # Vermelho
+        fill_yellow = PatternFill(start_color=CORES_STATUS["SO_NO"], end_color=CORES_STATUS["SO_NO"], fill_type='solid') # Amarelo
+        fill_gray = PatternFill(start_color=COR_CINZA, end_color=COR_CINZA, fill_type='solid')   # Cinza
 
         # 1. Congelar Painéis e Filtros
         ws.freeze_panes = 'A2'
@@ -74,33 +356,7 @@ class ExcelReportWriter:
         # 3. Ajuste de Colunas e Formatação Numérica
         for col in ws.columns:
             col_let = get_column_letter(col[0].column)
-            head = str(col[0].value).upper()
-            
-            width = 15
-            target_fmt = 'General'
-            
-            # A. Moeda
-            palavras_moeda = [
-                'VALOR', 'BASE', 'CREDITO', 'TOTAL', 'SAP', 'DIFERENÇA', 
-                'FRETE', 'SEG', 'DESC', 'OUTR', 'PRECO', 'DESP'
-            ]
-            
-            if any(x in head for x in palavras_moeda):
-                width = 18
-                target_fmt = '#,##0.00_-'
-            
-            # B. Porcentagem
-            elif any(x in head for x in ['ALIQ', 'MVA', 'RED']): 
-                width = 12
-                target_fmt = '0.00%'
-            
-            # C. Larguras Específicas
-            elif 'CHAVE' in head: width = 47
-            elif 'STATUS' in head or 'CHECK' in head: width = 20
-            elif any(x in head for x in ['PRODUTO', 'DESTINATARIO', 'TOMADOR', 'FORNECEDOR', 'EMITENTE', 'NATUREZA', 'OBSERVAÇÕES']): 
-                width = 35
-            elif any(x in head for x in ['CNPJ', 'EMP.', 'FIL.', 'UF', 'NCM', 'CEST', 'ANP', 'NUMERO', 'SERIE', 'MODELO']): 
-                width = 12
+            width, target_fmt, destaque = ExcelReportWriter._estilo_coluna(col[0].value)
             
             # Aplica a largura
             ws.column_dimensions[col_let].width = width
@@ -112,12 +368,12 @@ class ExcelReportWriter:
                         cell.number_format = target_fmt
             
             # 4. Formatação Condicional (Cores)
-            if "EMP. XML" in head or "FIL. XML" in head or "ORIGEM" in head:
+            if destaque == "cinza":
                 for cell in col[1:]: cell.fill = fill_gray
 
-            if "STATUS" in head or "CHECK" in head:
+            if destaque == "status":
                 for cell in col[1:]:
                     val = str(cell.value).upper()
                     if "OK" in val: cell.fill = fill_green
-                    elif "DIVERGÊNCIA" in val or "ERRO" in val: cell.fill = fill_red
+                    elif "DIVERGÊNCIA" in val or "ERRO" in val or "CANCELADA" in val: cell.fill = fill_red
                     elif "SÓ NO" in val: cell.fill = fill_yellow
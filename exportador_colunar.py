@@ -0,0 +1,132 @@
+# Arquivo: core/exportador_colunar.py
+import os
+import pandas as pd
+
+from core.logger import SistemaLog
+from core.esquema import Esquema, CAMPOS_NFE, CAMPOS_CTE, CAMPOS_DERIVADOS
+from core.normalizacao import SaidaNormalizada
+
+try:
+    # Opcional: só é necessário para a exportação Parquet/Arrow
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+# Tipos lógicos das colunas (ver core.esquema)
+SCHEMA_NFE = Esquema.tipos(CAMPOS_NFE + CAMPOS_DERIVADOS)
+SCHEMA_CTE = Esquema.tipos(CAMPOS_CTE + CAMPOS_DERIVADOS)
+
+
+class ExportadorColunar:
+    """
+    Exporta as tabelas NFe/CTe em Parquet ou Arrow IPC com schema fixo:
+    números, datas e textos com dicionário, prontos para leitura rápida
+    e seletiva por coluna (BI, pandas, DuckDB...).
+    """
+
+    FORMATOS = {"parquet": ".parquet", "arrow": ".arrow"}
+
+    @staticmethod
+    def _tipo_arrow(tipo):
+        return {
+            "categoria": pa.dictionary(pa.int32(), pa.string()),
+            "chave": pa.dictionary(pa.int32(), pa.string()),
+            "texto": pa.string(),
+            "numero": pa.float64(),
+            "inteiro": pa.int32(),
+            "data": pa.date32(),
+            "hora": pa.time32('s'),
+        }[tipo]
+
+    @staticmethod
+    def _converter_coluna(serie, tipo):
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            # Coluna em categoria: converte cada valor distinto uma vez e repete pelos códigos
+            codigos = serie.cat.codes.to_numpy().astype("int32")
+            indices = pa.array(codigos, mask=codigos < 0)
+            valores = ExportadorColunar._converter_coluna(pd.Series(serie.cat.categories.to_numpy(dtype=object)), tipo)
+            if tipo in ("categoria", "chave"):
+                return pa.DictionaryArray.from_arrays(indices, valores.dictionary_decode())
+            return valores.take(indices)
+
+        if tipo in ("categoria", "chave", "texto"):
+            valores = serie.astype("string")
+            if tipo == "chave":
+                valores = valores.str.lstrip("'")
+            arr = pa.array(valores, type=pa.string(), from_pandas=True)
+            return arr if tipo == "texto" else arr.dictionary_encode()
+
+        if tipo == "numero":
+            return pa.array(pd.to_numeric(serie, errors="coerce"), type=pa.float64(), from_pandas=True)
+
+        if tipo == "inteiro":
+            return pa.array(pd.to_numeric(serie, errors="coerce").astype("Int32"), type=pa.int32(), from_pandas=True)
+
+        if tipo == "data":
+            datas = pd.to_datetime(serie, format="%d/%m/%Y", errors="coerce")
+            return pa.array(datas, type=pa.timestamp('ns'), from_pandas=True).cast(pa.date32())
+
+        if tipo == "hora":
+            segundos = pd.to_timedelta(serie.where(serie != ""), errors="coerce").dt.total_seconds()
+            return pa.array(segundos.astype("Int32"), type=pa.int32(), from_pandas=True).cast(pa.time32('s'))
+
+        raise ValueError(f"Tipo de coluna desconhecido: {tipo}")
+
+    @staticmethod
+    def montar_tabela(df, schema):
+        """Converte o DataFrame para uma pa.Table tipada (colunas extras são inferidas)."""
+        tipos = dict(schema)
+        campos = []
+        arrays = []
+        for col in df.columns:
+            tipo = tipos.get(col)
+            if tipo is None:
+                arr = pa.array(df[col], from_pandas=True)
+            else:
+                arr = ExportadorColunar._converter_coluna(df[col], tipo)
+            campos.append(pa.field(str(col), arr.type))
+            arrays.append(arr)
+        return pa.Table.from_arrays(arrays, schema=pa.schema(campos))
+
+    @staticmethod
+    def exportar(caminho_saida, df_nfe, df_cte, formato="parquet", extras=None, normalizada=None):
+        """
+        Grava <base>_NFe.<ext> e <base>_CTe.<ext> (apenas as tabelas com dados).
+        extras: tabelas derivadas [(nome, df, campos)], gravadas em <base>_<nome>.<ext>.
+        normalizada: <base>_NFe_Notas e <base>_NFe_Itens no lugar de <base>_NFe
+        (ver SaidaNormalizada; padrão: config.SAIDA_NORMALIZADA).
+        Retorna a lista de arquivos gerados.
+        """
+        if pa is None:
+            raise Exception("A exportação Parquet/Arrow requer o pacote 'pyarrow' (pip install pyarrow).")
+        if formato not in ExportadorColunar.FORMATOS:
+            raise Exception(f"Formato colunar inválido: {formato}")
+
+        base, _ = os.path.splitext(caminho_saida)
+        ext = ExportadorColunar.FORMATOS[formato]
+        gerados = []
+        try:
+            tabelas = [("NFe", df_nfe, SCHEMA_NFE), ("CTe", df_cte, SCHEMA_CTE)]
+            if SaidaNormalizada.ativa(normalizada) and df_nfe is not None and not df_nfe.empty:
+                tabelas[:1] = [(nome.replace(" ", "_"), df, Esquema.tipos(campos))
+                               for nome, df, campos in SaidaNormalizada.tabelas(df_nfe)]
+            tabelas += [(nome.replace(" ", "_"), df, Esquema.tipos(campos)) for nome, df, campos in extras or ()]
+            for nome, df, schema in tabelas:
+                if df is None or df.empty: continue
+                tabela = ExportadorColunar.montar_tabela(df, schema)
+                destino = f"{base}_{nome}{ext}"
+                if formato == "parquet":
+                    pq.write_table(tabela, destino, compression="zstd")
+                else:
+                    with pa.OSFile(destino, "wb") as sink:
+                        with pa.ipc.new_file(sink, tabela.schema,
+                                             options=pa.ipc.IpcWriteOptions(compression="zstd")) as writer:
+                            writer.write_table(tabela)
+                gerados.append(destino)
+            return gerados
+
+        except Exception as e:
+            SistemaLog.registrar_erro(f"Erro ao gerar arquivos {formato}", e)
+            raise e
@@ -0,0 +1,122 @@
+# Arquivo: core/exportador_csv.py
+import os
+import csv
+import gzip
+
+from core.logger import SistemaLog
+from core.normalizacao import SaidaNormalizada
+import config
+
+
+class EscritorCSV:
+    """
+    Saída CSV (ou CSV.GZ) gravada conforme os arquivos terminam de ser extraídos.
+    As linhas ficam num buffer limitado e vão para o disco a cada
+    'buffer_linhas', então a memória não cresce com o lote e uma falha no
+    meio do processamento preserva tudo o que já foi gravado.
+    Gera <base>_NFe.csv[.gz] e <base>_CTe.csv[.gz]; na saída normalizada, a tabela NFe
+    vira <base>_NFe_Notas e <base>_NFe_Itens (ver SaidaNormalizada).
+    """
+
+    EXTENSOES = {"csv": ".csv", "csv.gz": ".csv.gz"}
+
+    def __init__(self, caminho_saida, formato="csv", buffer_linhas=None, normalizada=None):
+        if formato not in EscritorCSV.EXTENSOES:
+            raise Exception(f"Formato CSV inválido: {formato}")
+        self.formato = formato
+        self.buffer_linhas = buffer_linhas or config.CSV_BUFFER_LINHAS
+        self.normalizada = SaidaNormalizada.ativa(normalizada)
+        self._chaves_notas = set()   # chaves já gravadas em NFe_Notas
+
+        base = caminho_saida
+        for ext in (".csv.gz", ".gz", ".csv"):
+            if base.lower().endswith(ext):
+                base = base[:-len(ext)]
+                break
+        self.base = base
+
+        self._tabelas = {}   # nome -> [arquivo, writer, colunas, buffer, caminho]
+        self.linhas_gravadas = 0
+
+    def _abrir(self, nome, colunas):
+        caminho = f"{self.base}_{nome}{EscritorCSV.EXTENSOES[self.formato]}"
+        if self.formato == "csv.gz":
+            arquivo = gzip.open(caminho, 'wt', encoding='utf-8', newline='', compresslevel=5)
+        else:
+            # BOM para o Excel reconhecer os acentos ao abrir o CSV
+            arquivo = open(caminho, 'w', encoding='utf-8-sig', newline='')
+        writer = csv.writer(arquivo, delimiter=config.CSV_SEPARADOR)
+        writer.writerow(colunas)
+        tabela = [arquivo, writer, colunas, [], caminho]
+        self._tabelas[nome] = tabela
+        return tabela
+
+    @staticmethod
+    def _valores(linha, colunas):
+        valores = []
+        for col in colunas:
+            v = linha.get(col)
+            # O apóstrofo da chave só existe para o Excel não arredondar o número
+            if col == "Chave de Acesso" and isinstance(v, str): v = v.lstrip("'")
+            valores.append(v)
+        return valores
+
+    def escrever(self, linhas_nfe, linhas_cte):
+        tabelas = [("NFe", linhas_nfe, None), ("CTe", linhas_cte, None)]
+        if self.normalizada and linhas_nfe:
+            tabelas[:1] = SaidaNormalizada.linhas(linhas_nfe, self._chaves_notas)
+        for nome, linhas, colunas in tabelas:
+            if not linhas: continue
+            nome = nome.replace(" ", "_")
+            tabela = self._tabelas.get(nome) or self._abrir(nome, colunas or list(linhas[0]))
+            buffer = tabela[3]
+            buffer.extend(EscritorCSV._valores(l, tabela[2]) for l in linhas)
+            if len(buffer) >= self.buffer_linhas:
+                self._descarregar(tabela)
+
+    def gravar_tabela(self, nome, df, campos):
+        """
+        Grava de uma vez uma tabela derivada (ex.: rateio de frete) em <base>_<nome>.csv[.gz].
+        campos: registros do esquema; as colunas do tipo "chave" saem sem o apóstrofo.
+        Retorna o caminho gerado.
+        """
+        nome = nome.replace(" ", "_")
+        chaves = [i for i, c in enumerate(campos) if c.tipo == "chave"]
+        tabela = self._abrir(nome, [c.coluna for c in campos])
+        try:
+            valores = df[[c.coluna for c in campos]].astype(object)
+            valores = valores.where(valores.notna(), None).values.tolist()
+            for linha in valores:
+                for i in chaves:
+                    if isinstance(linha[i], str): linha[i] = linha[i].lstrip("'")
+            tabela[1].writerows(valores)
+        except Exception as e:
+            SistemaLog.registrar_erro(f"Erro ao gravar CSV: {os.path.basename(tabela[4])}", e)
+            raise e
+        finally:
+            tabela[0].close()
+            del self._tabelas[nome]
+        return tabela[4]
+
+    def _descarregar(self, tabela):
+        arquivo, writer, _, buffer, _ = tabela
+        if not buffer: return
+        writer.writerows(buffer)
+        arquivo.flush()
+        self.linhas_gravadas += len(buffer)
+        buffer.clear()
+
+    def fechar(self):
+        """Grava o que restou no buffer e fecha os arquivos. Retorna os caminhos gerados."""
+        gerados = []
+        for tabela in list(self._tabelas.values()):
+            try:
+                self._descarregar(tabela)
+            except Exception as e:
+                SistemaLog.registrar_erro(f"Erro ao gravar CSV: {os.path.basename(tabela[4])}", e)
+                raise e
+            finally:
+                tabela[0].close()
+            gerados.append(tabela[4])
+        self._tabelas = {}
+        return gerados
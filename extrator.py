@@ -0,0 +1,262 @@
+# Arquivo: core/extrator.py
+import xml.etree.ElementTree as ET
+
+from core.xml_parser import XMLParser
+from core.identificacao import IdentificadorDocumento
+from core.esquema import GRUPOS_NFE, CABECALHO_NFE, LINHA_NFE, LINHA_CTE
+
+
+def _filhos(elemento, pre, grupos=()):
+    """
+    Lê os filhos diretos de um nó numa única passada.
+    Retorna {nome_local: texto} (primeira ocorrência, igual ao find) e,
+    para os nomes em 'grupos', guarda o próprio elemento em vez do texto.
+    """
+    dados = {}
+    if elemento is None: return dados
+    n = len(pre)
+    for filho in elemento:
+        tag = filho.tag
+        if tag[:n] != pre: continue
+        nome = tag[n:]
+        if nome in dados: continue
+        if nome in grupos:
+            dados[nome] = filho
+        else:
+            txt = filho.text
+            dados[nome] = txt.strip() if txt else ""
+    return dados
+
+
+def _ultimo_filho(elemento):
+    if elemento is None or not len(elemento): return None
+    return elemento[-1]
+
+
+class _DocumentoNFe:
+    """
+    Acumula os grupos de um infNFe conforme seus filhos diretos são consumidos.
+    Cada grupo (ide, emit, dest, det, total, infAdic) é lido uma única vez; as linhas
+    saem das funções compiladas do esquema (core.esquema).
+    """
+
+    def __init__(self, inf, pre):
+        self.pre = pre
+        self.grupos = {g: {} for g, (nivel, _) in GRUPOS_NFE.items() if nivel == "cabecalho"}
+        self.grupos["inf"] = dict(inf.attrib)
+        self.itens = []
+        self._vistos = set()
+
+    def consumir(self, grupo):
+        pre = self.pre
+        tag = grupo.tag
+        if tag[:len(pre)] != pre: return
+        nome = tag[len(pre):]
+
+        if nome == 'det':
+            self.itens.append(ExtratorFiscal._extrair_item(grupo, pre))
+            return
+
+        # Cabeçalho: vale a primeira ocorrência de cada grupo (igual ao find)
+        if nome in self._vistos: return
+        self._vistos.add(nome)
+
+        grupos = self.grupos
+        if nome == 'ide':
+            grupos['ide'] = _filhos(grupo, pre)
+        elif nome == 'emit':
+            grupos['emit'] = _filhos(grupo, pre, ('enderEmit',))
+            grupos['enderEmit'] = _filhos(grupos['emit'].get('enderEmit'), pre)
+        elif nome == 'dest':
+            grupos['dest'] = _filhos(grupo, pre, ('enderDest',))
+            grupos['enderDest'] = _filhos(grupos['dest'].get('enderDest'), pre)
+        elif nome == 'total':
+            grupos['ICMSTot'] = _filhos(_filhos(grupo, pre, ('ICMSTot',)).get('ICMSTot'), pre)
+        elif nome == 'infAdic':
+            grupos['infAdic'] = _filhos(grupo, pre)
+
+    def linhas(self):
+        cab = CABECALHO_NFE(**self.grupos)
+        return [LINHA_NFE(cab, *it) for it in self.itens]
+
+
+class ExtratorFiscal:
+    """
+    Motor de extração em passagem única: percorre cada infNFe uma vez,
+    preenchendo cabeçalho e itens sem buscas './/' repetidas.
+    Gera exatamente as mesmas colunas do fluxo baseado no XMLParser.
+    """
+
+    # Incrementar sempre que a extração mudar: invalida o cache de extração
+    VERSAO = "4"
+
+    @staticmethod
+    def extrair_documento(root: ET.Element, ns: dict):
+        """Retorna (linhas_nfe, linhas_cte) de um XML já carregado."""
+        local_nfe = []
+        local_cte = []
+        namespace, _, nome = root.tag[1:].rpartition('}') if root.tag[:1] == '{' else ("", "", root.tag)
+        tipo = IdentificadorDocumento.tipo_raiz(nome, namespace)
+
+        # Eventos (cancelamento, CC-e...) e outros documentos não geram linhas
+        if tipo == "NFe":
+            for inf in root.iter(f"{{{ns['nfe']}}}infNFe"):
+                local_nfe.extend(ExtratorFiscal.linhas_nfe(inf, ns))
+        elif tipo == "CTe":
+            local_cte.append(ExtratorFiscal.linha_cte(root, ns))
+
+        return local_nfe, local_cte
+
+    @staticmethod
+    def iterar_arquivo(origem, ns: dict):
+        """
+        Modo streaming (iterparse): gera ('NFe', linha) e ('CTe', linha) durante
+        a leitura, removendo da árvore cada grupo já consumido.
+        A memória fica limitada ao documento em andamento, mesmo em arquivos
+        com milhares de itens ou vários nfeProc/cteProc empacotados.
+        """
+        pre_nfe = f"{{{ns['nfe']}}}"
+        tag_inf = f"{pre_nfe}infNFe"
+        # Documentos CTe: CTe e CTeOS (os mesmos que extrair_documento leva ao linha_cte)
+        tags_cte = (f"{{{ns['cte']}}}CTe", f"{{{ns['cte']}}}CTeOS")
+
+        pilha = []
+        inf = None
+        doc = None
+
+        for evento, elem in ET.iterparse(origem, events=('start', 'end')):
+            if evento == 'start':
+                pilha.append(elem)
+                if elem.tag == tag_inf and inf is None:
+                    inf = elem
+                    doc = _DocumentoNFe(elem, pre_nfe)
+                continue
+
+            pilha.pop()
+            pai = pilha[-1] if pilha else None
+
+            if inf is not None and pai is inf:
+                # Grupo do infNFe concluído (ide, emit, det...): consome e descarta
+                doc.consumir(elem)
+                inf.remove(elem)
+                continue
+
+            if elem is inf:
+                for linha in doc.linhas():
+                    yield "NFe", linha
+                inf = doc = None
+                elem.clear()
+            elif elem.tag in tags_cte:
+                yield "CTe", ExtratorFiscal.linha_cte(elem, ns)
+                elem.clear()
+
+            # Documento de primeiro nível concluído (lotes com vários documentos)
+            if pai is not None and len(pilha) == 1:
+                pai.remove(elem)
+
+    @staticmethod
+    def linhas_nfe(inf: ET.Element, ns: dict) -> list:
+        doc = _DocumentoNFe(inf, f"{{{ns['nfe']}}}")
+        for grupo in inf:
+            doc.consumir(grupo)
+        return doc.linhas()
+
+    @staticmethod
+    def _extrair_item(det, pre):
+        grupos = _filhos(det, pre, ('prod', 'imposto', 'impostoDevol'))
+        prod = _filhos(grupos.get('prod'), pre, ('comb',))
+        comb = _filhos(prod.get('comb'), pre)
+        imp = _filhos(grupos.get('imposto'), pre, ('ICMS', 'IPI', 'II', 'PIS', 'COFINS', 'CBS', 'IBS'))
+
+        # --- ICMS (primeiro subgrupo ICMSxx) e Origem (primeiro 'orig' preenchido) ---
+        trib = None
+        origem = ""
+        icms = imp.get('ICMS')
+        if icms is not None:
+            for child in icms:
+                campos = _filhos(child, pre)
+                if not origem:
+                    origem = campos.get('orig', "")
+                if trib is None and 'ICMS' in child.tag:
+                    trib = campos
+                if trib is not None and origem: break
+        trib = trib or {}
+        trib['orig'] = origem
+
+        # --- PIS / COFINS (prevalece o último subgrupo, como no extrair_pis_cofins) ---
+        pis = _filhos(_ultimo_filho(imp.get('PIS')), pre)
+        cof = _filhos(_ultimo_filho(imp.get('COFINS')), pre)
+
+        # --- IPI, IPI devolvido e Imposto de Importação ---
+        ipi = _filhos(_filhos(imp.get('IPI'), pre, ('IPITrib',)).get('IPITrib'), pre)
+        devol = _filhos(_filhos(grupos.get('impostoDevol'), pre, ('IPI',)).get('IPI'), pre)
+        ii = _filhos(imp.get('II'), pre)
+
+        # --- Reforma Tributária (CBS/IBS) ---
+        # CBS: primeiro subgrupo. IBS: para no subgrupo com vBC/vIBS (senão fica o último).
+        # Sem CBS, o ClassTrib vem do primeiro subgrupo do IBS.
+        cbs = {}
+        tem_class = False
+        grupo_cbs = imp.get('CBS')
+        if grupo_cbs is not None:
+            for child in grupo_cbs:
+                cbs = _filhos(child, pre)
+                tem_class = True
+                break
+
+        ibs = {}
+        grupo_ibs = imp.get('IBS')
+        if grupo_ibs is not None:
+            for child in grupo_ibs:
+                ibs = _filhos(child, pre)
+                if not tem_class:
+                    cbs['cClass'] = ibs.get('cClass', "")
+                    tem_class = True
+                if "vBC" in child.tag or "vIBS" in child.tag: break
+
+        # Mesma ordem dos grupos de item em core.esquema.GRUPOS_NFE
+        return det.attrib, prod, comb, trib, pis, cof, ipi, cbs, ibs, ii, devol
+
+    @staticmethod
+    def linha_cte(root: ET.Element, ns: dict) -> dict:
+        tipo = "CTe"
+        chave = XMLParser.obter_chave(root, ns, "CTe")
+
+        # --- [CTe] Dados Básicos ---
+        n_ct = XMLParser.pegar_texto(root, './/cte:ide/cte:nCT', ns)
+        serie = XMLParser.pegar_texto(root, './/cte:ide/cte:serie', ns)
+        cfop = XMLParser.pegar_texto(root, './/cte:ide/cte:CFOP', ns)
+
+        # Data Emissão (Usa a nova função)
+        data_emi, hora_emi = XMLParser.obter_data_hora(root, ns, "CTe")
+
+        val_total = XMLParser.obter_valor_total_xml(root, ns, tipo)
+        dest_nome, dest_doc = XMLParser.obter_pagador_cte(root, ns)
+        emit = XMLParser.obter_emitente(root, ns, tipo)
+
+        # --- [CTe] Novos Extratores (Logística e Atores) ---
+        v_carga, peso, unit_med = XMLParser.obter_dados_carga_cte(root, ns)
+        placa, rntrc = XMLParser.obter_modal_rodoviario(root, ns)
+        chaves_nfe = XMLParser.obter_chaves_nfe_vinculadas(root, ns)
+        rota_dados = XMLParser.obter_rota_e_obs(root, ns)
+        atores = XMLParser.obter_atores_cte(root, ns)
+
+        # --- [CTe] ICMS ---
+        base_icms = 0.0; aliq_icms = 0.0; val_icms = 0.0
+        imp = root.find('.//cte:imp/cte:ICMS', ns)
+        if imp is not None:
+            for child in imp:
+                if 'ICMS' in child.tag:
+                    base_icms = XMLParser.pegar_float(child, 'cte:vBC', ns)
+                    aliq_icms = XMLParser.pegar_float(child, 'cte:pICMS', ns) / 100.0
+                    val_icms = XMLParser.pegar_float(child, 'cte:vICMS', ns)
+                    if val_icms > 0: break # Pega o primeiro que tiver valor
+
+        cte = {
+            "chave": f"'{chave}", "data": data_emi, "nCT": n_ct, "serie": serie, "CFOP": cfop,
+            "vTPrest": val_total, "vCarga": v_carga, "qCarga": peso, "unidade": unit_med,
+            "tomador": dest_nome, "doc_tomador": dest_doc, "placa": placa, "RNTRC": rntrc,
+            "vBC": base_icms, "pICMS": aliq_icms, "vICMS": val_icms, "chaves_nfe": chaves_nfe,
+        }
+        # Colunas e ordem: core.esquema.CAMPOS_CTE
+        return LINHA_CTE(cte, emit, rota_dados, atores)
@@ -0,0 +1,204 @@
+# Arquivo: core/fontes.py
+import os
+import time
+import zipfile
+import hashlib
+import fnmatch
+import threading
+from collections import namedtuple, deque
+
+from core.logger import SistemaLog
+
+_locais = threading.local()
+
+
+def _abrir_zip(caminho):
+    """
+    ZipFile reaproveitado por thread/processo: ler o diretório central de um
+    ZIP com dezenas de milhares de XMLs a cada membro seria proibitivo.
+    """
+    zips = getattr(_locais, 'zips', None)
+    if zips is None:
+        zips = _locais.zips = {}
+
+    st = os.stat(caminho)
+    assinatura = (st.st_size, st.st_mtime_ns)
+    atual = zips.get(caminho)
+    if atual is None or atual[0] != assinatura:
+        if atual is not None: atual[1].close()
+        atual = zips[caminho] = (assinatura, zipfile.ZipFile(caminho))
+    return atual[1]
+
+
+class FonteXML(namedtuple('FonteXML', ['caminho', 'membro'])):
+    """
+    Origem de um XML: arquivo em disco (membro=None) ou membro de um .zip,
+    lido direto do pacote, sem extração para arquivo temporário.
+    """
+    __slots__ = ()
+
+    def __new__(cls, caminho, membro=None):
+        return super().__new__(cls, caminho, membro)
+
+    @property
+    def id(self):
+        """Identificador único (chave do cache)."""
+        return self.caminho if self.membro is None else f"{self.caminho}::{self.membro}"
+
+    @property
+    def nome(self):
+        """Nome curto para logs e relatórios."""
+        base = os.path.basename(self.caminho)
+        return base if self.membro is None else f"{base}/{self.membro}"
+
+    def abrir(self):
+        """Abre o conteúdo em modo binário (arquivo ou stream do ZIP)."""
+        if self.membro is None:
+            return open(self.caminho, 'rb')
+        return _abrir_zip(self.caminho).open(self.membro)
+
+    def ler(self, limite_bytes=None):
+        """Conteúdo inteiro em bytes, ou None se passar de 'limite_bytes' (fica para o streaming)."""
+        if limite_bytes is not None and self.tamanho() > limite_bytes: return None
+        with self.abrir() as f:
+            return f.read()
+
+    def ler_inicio(self, n_bytes):
+        with self.abrir() as f:
+            return f.read(n_bytes)
+
+    def identidade(self):
+        """Retorna (id, tamanho, mtime_ns)."""
+        if self.membro is None:
+            st = os.stat(self.caminho)
+            return self.id, st.st_size, st.st_mtime_ns
+        info = _abrir_zip(self.caminho).getinfo(self.membro)
+        mtime = int(time.mktime(info.date_time + (0, 0, -1)) * 1_000_000_000)
+        return self.id, info.file_size, mtime
+
+    def tamanho(self):
+        return self.identidade()[1]
+
+    def mtime(self):
+        return self.identidade()[2]
+
+    def hash_conteudo(self, conteudo=None):
+        """
+        Hash do conteúdo, igual para arquivo solto e membro de ZIP (conteudo: bytes já
+        lidos, para não ler de novo). O CRC32 do ZIP não serve: colisões são possíveis
+        e o cache entregaria as linhas de outro documento.
+        """
+        if conteudo is not None: return hashlib.blake2b(conteudo, digest_size=16).hexdigest()
+        h = hashlib.blake2b(digest_size=16)
+        with self.abrir() as f:
+            for bloco in iter(lambda: f.read(1024 * 1024), b''):
+                h.update(bloco)
+        return h.hexdigest()
+
+
+def _casa(padroes, nome, relativo):
+    """Compara nome e caminho relativo com padrões glob (sem diferenciar maiúsculas)."""
+    nome = nome.lower()
+    relativo = relativo.lower()
+    for p in padroes:
+        p = p.lower()
+        if fnmatch.fnmatchcase(nome, p) or fnmatch.fnmatchcase(relativo, p):
+            return True
+    return False
+
+
+class VarredorFontes:
+    """
+    Localiza os XMLs de entrada: arquivos .xml soltos e membros de arquivos .zip.
+    A varredura é preguiçosa (os.scandir): cada fonte é entregue assim que
+    encontrada, permitindo despachar trabalho antes do fim da listagem.
+    """
+
+    @staticmethod
+    def eh_zip(caminho):
+        return os.path.isfile(caminho) and caminho.lower().endswith('.zip')
+
+    @staticmethod
+    def membros_zip(caminho, excluir=()):
+        with zipfile.ZipFile(caminho) as zf:
+            return [
+                FonteXML(caminho, info.filename) for info in zf.infolist()
+                if not info.is_dir() and info.filename.lower().endswith('.xml')
+                and not _casa(excluir, os.path.basename(info.filename), info.filename)
+            ]
+
+    @staticmethod
+    def varrer(entrada, recursivo=True, incluir=None, excluir=None):
+        """
+        Gerador de FonteXML a partir de uma pasta (com .xml e/ou .zip, descendo
+        em subpastas se 'recursivo'), de um único arquivo .zip ou de um único .xml.
+        incluir/excluir: padrões glob (ex.: "*.xml", "*canc*", "backup/*"),
+        testados contra o nome e o caminho relativo à entrada.
+        """
+        incluir = incluir or ("*.xml", "*.zip")
+        excluir = excluir or ()
+
+        if VarredorFontes.eh_zip(entrada):
+            yield from VarredorFontes.membros_zip(entrada, excluir)
+            return
+        if os.path.isfile(entrada):
+            # Arquivo informado diretamente: os padrões não se aplicam
+            if entrada.lower().endswith('.xml'): yield FonteXML(entrada)
+            return
+
+        pilha = [(entrada, "")]
+        while pilha:
+            pasta, prefixo = pilha.pop()
+            try:
+                it = os.scandir(pasta)
+            except OSError as e:
+                SistemaLog.registrar_erro(f"Pasta ilegível ignorada: {pasta}", e)
+                continue
+
+            subpastas = []
+            with it:
+                for entry in it:
+                    relativo = prefixo + entry.name
+                    if _casa(excluir, entry.name, relativo): continue
+
+                    try:
+                        eh_pasta = entry.is_dir(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    if eh_pasta:
+                        if recursivo: subpastas.append((entry.path, relativo + "/"))
+                        continue
+
+                    if not _casa(incluir, entry.name, relativo): continue
+
+                    if entry.name.lower().endswith('.zip'):
+                        try:
+                            yield from VarredorFontes.membros_zip(entry.path, excluir)
+                        except Exception as e:
+                            SistemaLog.registrar_erro(f"ZIP ilegível ignorado: {relativo}", e)
+                    else:
+                        yield FonteXML(entry.path)
+
+            # Subpastas entram na pilha na ordem em que foram encontradas (LIFO)
+            pilha.extend(reversed(subpastas))
+
+    @staticmethod
+    def antecipar(itens, funcao, executor, janela):
+        """
+        Leitura antecipada: aplica funcao(item) no executor com até 'janela' itens à
+        frente do consumidor e gera (item, resultado) na ordem original. Com threads de
+        I/O, a latência de cada arquivo (disco de rede) se sobrepõe à dos seguintes.
+        """
+        pendentes = deque()
+        try:
+            for item in itens:
+                pendentes.append((item, executor.submit(funcao, item)))
+                if len(pendentes) >= janela:
+                    item, futuro = pendentes.popleft()
+                    yield item, futuro.result()
+            while pendentes:
+                item, futuro = pendentes.popleft()
+                yield item, futuro.result()
+        finally:
+            # Consumidor interrompido (cancelamento/erro): descarta o que ainda não começou
+            for _, futuro in pendentes: futuro.cancel()
@@ -0,0 +1,54 @@
+# Arquivo: core/identificacao.py
+import re
+
+# Primeira tag de abertura (depois da declaração XML, comentários e DOCTYPE)
+_RE_COMENTARIO = re.compile(rb'<!--.*?-->', re.S)
+_RE_RAIZ = re.compile(rb'<(?![?!])(?:[\w.\-]+:)?([\w.\-]+)([^>]*)>')
+_RE_XMLNS = re.compile(rb'\bxmlns\s*=\s*["\']([^"\']+)["\']')
+_RE_VERSAO = re.compile(rb'\bversao\s*=\s*["\']([^"\']+)["\']')
+_RE_VERSAO_INF = re.compile(rb'<(?:\w+:)?inf(?:NFe|Cte|CTe)\b[^>]*?\bversao\s*=\s*["\']([^"\']+)["\']')
+
+# Raízes conhecidas (nome local, minúsculo) -> extrator
+_RAIZES = {
+    "nfeproc": "NFe", "nfe": "NFe", "envinfe": "NFe",
+    "cteproc": "CTe", "cte": "CTe", "cteosproc": "CTe", "cteos": "CTe", "envicte": "CTe",
+}
+
+
+class IdentificadorDocumento:
+    """
+    Identifica o tipo do documento pela tag raiz, sem montar a árvore:
+    "NFe" e "CTe" vão para o extrator; "evento" (procEventoNFe, cancelamento,
+    CC-e...) e "outro" (NFSe, resumos, retornos da SEFAZ...) são ignorados.
+    """
+
+    @staticmethod
+    def tipo_raiz(nome, namespace=""):
+        """Tipo a partir do nome local (e do namespace) da tag raiz."""
+        nome = nome.lower()
+        tipo = _RAIZES.get(nome)
+        if tipo: return tipo
+        if "evento" in nome: return "evento"
+        if nome.startswith(("res", "ret", "cons")): return "outro"
+        # Invólucros não listados: nome ou namespace de NFe/CTe (regra antiga)
+        if "nfe" in nome or namespace.endswith("/nfe"): return "NFe"
+        if "cte" in nome or namespace.endswith("/cte"): return "CTe"
+        return "outro"
+
+    @staticmethod
+    def identificar(inicio: bytes):
+        """
+        Retorna (tipo, raiz, versao) a partir dos primeiros bytes do arquivo.
+        tipo None: a raiz não aparece no trecho lido (decide o extrator após o parse).
+        """
+        if b'<!--' in inicio:
+            inicio = _RE_COMENTARIO.sub(b'', inicio)
+        m = _RE_RAIZ.search(inicio)
+        if not m: return None, "", ""
+
+        raiz = m.group(1).decode('ascii', 'replace')
+        ns = _RE_XMLNS.search(m.group(2))
+        ns = ns.group(1).decode('ascii', 'replace') if ns else ""
+        versao = _RE_VERSAO.search(m.group(2)) or _RE_VERSAO_INF.search(inicio, m.end())
+        versao = versao.group(1).decode('ascii', 'replace') if versao else ""
+        return IdentificadorDocumento.tipo_raiz(raiz, ns), raiz, versao
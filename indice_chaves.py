@@ -0,0 +1,97 @@
+# Arquivo: core/indice_chaves.py
+import re
+
+from core.identificacao import IdentificadorDocumento
+from core.logger import SistemaLog
+
+# Id do infNFe/infCte (o mesmo que o XMLParser.obter_chave usa), lido direto dos bytes
+_RE_ID = re.compile(rb'<(?:\w+:)?inf(NFe|Cte)\b[^>]*?\bId\s*=\s*["\'](?:NFe|CTe)?(\d{44})["\']')
+_RE_PROC = re.compile(rb'<(?:\w+:)?(?:nfeProc|cteProc)\b')
+
+BYTES_LEITURA = 8192
+
+# Raízes de arquivos com um documento só; lotes (enviNFe...) e outros invólucros
+# podem trazer várias notas e não entram no controle de duplicados por arquivo
+_RAIZES_DOCUMENTO = ("nfeproc", "nfe", "cteproc", "cte", "cteosproc", "cteos")
+
+
+class IndiceChaves:
+    """
+    Índice de chaves de acesso do lote, montado com uma leitura barata do
+    início de cada arquivo (sem parse). Permite descartar duplicatas
+    (NFe solta x nfeProc, cópias com outro nome) antes da extração completa.
+    Só arquivos com um único documento são comparados: um lote com várias notas
+    é sempre extraído inteiro (descartá-lo pela primeira chave perderia as demais).
+
+    Políticas:
+    - "proc": prefere o arquivo com protocolo (nfeProc/cteProc); empate -> mais recente
+    - "recente": prefere o arquivo modificado por último
+    - "nenhuma": mantém todos
+    """
+
+    POLITICAS = ("proc", "recente", "nenhuma")
+
+    @staticmethod
+    def ler_chave(fonte, inicio=None):
+        """
+        Retorna (tipo, chave, tem_protocolo, mtime) ou None se não identificar ou se o
+        arquivo puder ter mais de um documento (raiz de lote ou segundo Id no trecho lido).
+        inicio: primeiros bytes do arquivo, se já lidos (senão lê BYTES_LEITURA).
+        """
+        try:
+            if inicio is None: inicio = fonte.ler_inicio(BYTES_LEITURA)
+            raiz = IdentificadorDocumento.identificar(inicio)[1]
+            if raiz.lower() not in _RAIZES_DOCUMENTO: return None
+            m = _RE_ID.search(inicio)
+            if not m or _RE_ID.search(inicio, m.end()): return None
+            tipo = "NFe" if m.group(1) == b"NFe" else "CTe"
+            tem_proc = _RE_PROC.search(inicio, 0, m.start()) is not None
+            return tipo, m.group(2).decode('ascii'), tem_proc, fonte.mtime()
+        except Exception as e:
+            SistemaLog.registrar_erro(f"Falha na pré-leitura da chave: {fonte.nome}", e)
+            return None
+
+    def __init__(self, politica="proc"):
+        if politica not in IndiceChaves.POLITICAS:
+            raise Exception(f"Política de duplicados inválida: {politica}")
+        self.politica = politica
+        self._melhor = {}     # (tipo, chave) -> (fonte, tem_proc, mtime)
+        self._descartes = {}  # (tipo, chave) -> [fontes descartadas]
+
+    def _criterio(self, candidato):
+        if self.politica == "proc":
+            return candidato[1], candidato[2]
+        return candidato[2]
+
+    def avaliar(self, fonte, info=None):
+        """
+        Registra uma fonte conforme ela é encontrada.
+        info: resultado de ler_chave já obtido (ex.: na leitura antecipada); None lê
+        agora e False indica arquivo sem chave identificável.
+        Retorna (manter, substituida): 'substituida' é a fonte já registrada
+        que perdeu para esta (seus resultados devem ser descartados).
+        """
+        if self.politica == "nenhuma": return True, None
+        if info is None: info = IndiceChaves.ler_chave(fonte)
+        if not info: return True, None
+
+        tipo, chave, tem_proc, mtime = info
+        k = (tipo, chave)
+        candidato = (fonte, tem_proc, mtime)
+        atual = self._melhor.get(k)
+        if atual is None:
+            self._melhor[k] = candidato
+            return True, None
+
+        if self._criterio(candidato) > self._criterio(atual):
+            self._melhor[k] = candidato
+            self._descartes.setdefault(k, []).append(atual[0])
+            return True, atual[0]
+
+        self._descartes.setdefault(k, []).append(fonte)
+        return False, None
+
+    @property
+    def duplicados(self):
+        """Lista de (tipo, chave, fonte_mantida, [fontes_descartadas])."""
+        return [(k[0], k[1], self._melhor[k][0], perdedores) for k, perdedores in self._descartes.items()]
@@ -0,0 +1,130 @@
+# Arquivo: core/indice_eventos.py
+import os
+import re
+import csv
+
+from core.logger import SistemaLog
+import config
+
+# Campos do evento lidos direto dos bytes (procEventoNFe/procEventoCTe são pequenos)
+_RE_CHAVE = re.compile(rb'<(?:\w+:)?ch(NFe|CTe)>\s*(\d{44})\s*<')
+_RE_TP_EVENTO = re.compile(rb'<(?:\w+:)?tpEvento>\s*(\d+)\s*<')
+_RE_DH_EVENTO = re.compile(rb'<(?:\w+:)?dhEvento>\s*([^<\s]+)\s*<')
+_RE_RET_EVENTO = re.compile(rb'<(?:\w+:)?retEvento(?:CTe)?\b')
+_RE_CSTAT = re.compile(rb'<(?:\w+:)?cStat>\s*(\d+)\s*<')
+_RE_PROTOCOLO = re.compile(rb'<(?:\w+:)?nProt>\s*(\d+)\s*<')
+
+EVENTOS_CANCELAMENTO = {"110111": "Cancelamento", "110112": "Cancelamento por substituição"}
+# Evento registrado (vinculado ou não à NF-e) / registrado com alerta
+CSTAT_HOMOLOGADO = {"135", "136", "155"}
+
+COLUNA_SITUACAO = "Situação"
+CANCELADA = "CANCELADA"
+CANCELADA_SEM_PROTOCOLO = "CANCELADA (SEM PROTOCOLO)"
+
+
+class IndiceEventos:
+    """
+    Índice em memória dos eventos de cancelamento (procEventoNFe/procEventoCTe)
+    encontrados na mesma varredura das notas, por chave de acesso.
+    Ao final, a situação entra nas tabelas por junção de hash com a
+    'Chave de Acesso' (coluna "Situação" ou exclusão das linhas).
+
+    Modos: "marcar" (coluna Situação), "excluir" (remove as canceladas),
+    "nenhuma" (não indexa os eventos).
+    """
+
+    MODOS = ("marcar", "excluir", "nenhuma")
+
+    @staticmethod
+    def ler_evento(conteudo: bytes):
+        """
+        Retorna (tipo_doc, chave, tp_evento, dh_evento, homologado, protocolo) ou None.
+        homologado: True (cStat aceito no retEvento), False (rejeitado) ou None (sem retorno).
+        """
+        m_chave = _RE_CHAVE.search(conteudo)
+        m_tp = _RE_TP_EVENTO.search(conteudo)
+        if not m_chave or not m_tp: return None
+
+        dh = _RE_DH_EVENTO.search(conteudo)
+        homologado = None
+        protocolo = ""
+        ret = _RE_RET_EVENTO.search(conteudo)
+        if ret:
+            cstat = _RE_CSTAT.search(conteudo, ret.end())
+            homologado = cstat is not None and cstat.group(1).decode('ascii') in CSTAT_HOMOLOGADO
+            prot = _RE_PROTOCOLO.search(conteudo, ret.end())
+            if prot: protocolo = prot.group(1).decode('ascii')
+
+        return (
+            m_chave.group(1).decode('ascii'), m_chave.group(2).decode('ascii'), m_tp.group(1).decode('ascii'),
+            dh.group(1).decode('ascii', 'replace') if dh else "", homologado, protocolo,
+        )
+
+    def __init__(self, modo="marcar"):
+        if modo not in IndiceEventos.MODOS:
+            raise Exception(f"Tratamento de notas canceladas inválido: {modo}")
+        self.modo = modo
+        self.eventos = 0
+        self.rejeitados = 0
+        self._cancelamentos = {}   # chave -> (tipo_doc, descricao, dh_evento, protocolo, arquivo)
+
+    @property
+    def ativo(self):
+        return self.modo != "nenhuma"
+
+    def registrar(self, fonte, evento):
+        """Inclui um evento lido por ler_evento (os que não são cancelamento só são contados)."""
+        if evento is None: return
+        tipo_doc, chave, tp_evento, dh_evento, homologado, protocolo = evento
+        self.eventos += 1
+        descricao = EVENTOS_CANCELAMENTO.get(tp_evento)
+        if descricao is None: return
+        if homologado is False:
+            self.rejeitados += 1
+            return
+        # Evento com protocolo prevalece sobre cópia sem retorno da SEFAZ
+        atual = self._cancelamentos.get(chave)
+        if atual is None or (not atual[3] and protocolo):
+            self._cancelamentos[chave] = (tipo_doc, descricao, dh_evento, protocolo, fonte.nome)
+
+    @property
+    def canceladas(self):
+        return len(self._cancelamentos)
+
+    def situacoes(self):
+        """{chave: situação} das notas com cancelamento."""
+        return {chave: CANCELADA if c[3] else CANCELADA_SEM_PROTOCOLO for chave, c in self._cancelamentos.items()}
+
+    def aplicar(self, df, coluna_chave="Chave de Acesso"):
+        """
+        Junção por hash com a chave de acesso. Retorna (df, linhas_afetadas):
+        "marcar" insere a coluna Situação logo após a chave; "excluir" remove as linhas.
+        """
+        if not self.ativo or df is None or df.empty or coluna_chave not in df.columns:
+            return df, 0
+        chaves = df[coluna_chave].astype("string").str.lstrip("'")
+        situacao = chaves.map(self.situacoes())
+        afetadas = int(situacao.notna().sum())
+
+        if self.modo == "excluir":
+            if afetadas: df = df[situacao.isna().to_numpy()].reset_index(drop=True)
+            return df, afetadas
+
+        df = df.copy()
+        df.insert(df.columns.get_loc(coluna_chave) + 1, COLUNA_SITUACAO, situacao.fillna("").to_numpy(dtype=object))
+        return df, afetadas
+
+    def gravar(self, caminho):
+        """Grava os cancelamentos indexados em CSV (usado quando a saída é CSV em fluxo)."""
+        try:
+            with open(caminho, 'w', encoding='utf-8-sig', newline='') as arquivo:
+                writer = csv.writer(arquivo, delimiter=config.CSV_SEPARADOR)
+                writer.writerow(["Tipo", "Chave de Acesso", COLUNA_SITUACAO, "Evento", "Data Evento", "Protocolo", "Arquivo"])
+                for chave, (tipo_doc, descricao, dh, protocolo, nome) in sorted(self._cancelamentos.items()):
+                    situacao = CANCELADA if protocolo else CANCELADA_SEM_PROTOCOLO
+                    writer.writerow([tipo_doc, chave, situacao, descricao, dh, protocolo, nome])
+            return caminho
+        except Exception as e:
+            SistemaLog.registrar_erro(f"Falha ao gravar o índice de eventos: {os.path.basename(caminho)}", e)
+            return None
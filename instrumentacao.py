@@ -0,0 +1,224 @@
+# Arquivo: core/instrumentacao.py
+import io
+import sys
+import json
+import time
+import heapq
+import pstats
+import cProfile
+import threading
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+from core.logger import SistemaLog
+
+# cProfile só admite um perfilador ativo por processo: no backend de threads
+# as tarefas perfiladas passam uma de cada vez (o perfil é para diagnóstico)
+_TRAVA_PERFIL = threading.Lock()
+
+
+def medidor(instrumentacao):
+    """Retorna instrumentacao.etapa, ou um contexto vazio se não houver instrumentação."""
+    if instrumentacao is None: return lambda nome: nullcontext()
+    return instrumentacao.etapa
+
+
+def pico_memoria_mb():
+    """Pico de memória residente (RSS) deste processo e dos processos filhos já encerrados."""
+    try:
+        import resource
+        escala = 1024 * 1024 if sys.platform == "darwin" else 1024   # macOS em bytes, Linux em KB
+        proprio = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / escala
+        filhos = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / escala
+        return round(proprio, 1), round(filhos, 1)
+    except ImportError:
+        pass
+    try:
+        # Windows: sem 'resource'; usa o psutil se estiver instalado
+        import psutil
+        info = psutil.Process().memory_info()
+        return round(getattr(info, "peak_wset", info.rss) / (1024 * 1024), 1), None
+    except ImportError:
+        return None, None
+
+
+class Cronometro:
+    """Medição dentro de uma tarefa de worker: cada marcar() fecha uma etapa."""
+
+    def __init__(self):
+        self.etapas = {}
+        self._inicio = self._t = time.perf_counter()
+        self._c = time.thread_time()
+
+    def marcar(self, etapa):
+        agora, cpu = time.perf_counter(), time.thread_time()
+        self.etapas[etapa] = (agora - self._t, cpu - self._c)
+        self._t, self._c = agora, cpu
+
+    def medidas(self, fonte, tamanho=None):
+        """Resumo serializável (vai do processo worker para o principal)."""
+        if tamanho is None:
+            try: tamanho = fonte.tamanho()
+            except Exception: tamanho = None
+        return {"etapas": self.etapas, "segundos": time.perf_counter() - self._inicio, "tamanho": tamanho}
+
+
+class PerfilWorkers:
+    """Gancho opcional de cProfile para as tarefas dos workers, acumulado num único perfil."""
+
+    class _Coletado:
+        # pstats.Stats.add aceita qualquer objeto com create_stats() e .stats
+        def __init__(self, stats): self.stats = stats
+        def create_stats(self): pass
+
+    def __init__(self):
+        self.stats = None
+        self.tarefas = 0
+
+    @staticmethod
+    def executar(funcao, *args):
+        """Roda funcao(*args) sob cProfile. Retorna (retorno, estatísticas serializáveis)."""
+        with _TRAVA_PERFIL:
+            perfil = cProfile.Profile()
+            perfil.enable()
+            try:
+                retorno = funcao(*args)
+            finally:
+                perfil.disable()
+        perfil.create_stats()
+        return retorno, perfil.stats
+
+    def acumular(self, stats):
+        if not stats: return
+        coletado = PerfilWorkers._Coletado(stats)
+        if self.stats is None: self.stats = pstats.Stats(coletado)
+        else: self.stats.add(coletado)
+        self.tarefas += 1
+
+    def gravar(self, caminho):
+        if self.stats is None: return None
+        self.stats.dump_stats(caminho)
+        return caminho
+
+    def resumo(self, n=15):
+        if self.stats is None: return ""
+        saida = io.StringIO()
+        self.stats.stream = saida
+        self.stats.sort_stats("cumulative").print_stats(n)
+        return saida.getvalue()
+
+
+class Instrumentacao:
+    """
+    Tempos por etapa (parede e CPU), arquivos mais lentos e pico de memória de uma execução.
+    Etapas medidas na thread principal usam etapa(); as dos workers chegam prontas
+    por registrar_tarefa() e são somadas (a soma pode passar do tempo total em paralelo).
+    Etapas com "/" no nome são subetapas da anterior (ex.: "excel/to_excel").
+    """
+
+    def __init__(self, n_lentos=10):
+        self.n_lentos = n_lentos
+        self.etapas = {}    # nome -> [parede, cpu, chamadas]
+        self._lentos = []   # heap (segundos, nome, tamanho)
+        self.info = {}
+        self.data_inicio = datetime.now()
+        self._t0 = time.perf_counter()
+        self._c0 = time.process_time()
+        self._fim = None
+
+    def somar(self, nome, parede, cpu, chamadas=1):
+        etapa = self.etapas.get(nome)
+        if etapa is None:
+            self.etapas[nome] = [parede, cpu, chamadas]
+        else:
+            etapa[0] += parede
+            etapa[1] += cpu
+            etapa[2] += chamadas
+
+    @contextmanager
+    def etapa(self, nome):
+        # Registra na entrada: a etapa aparece antes das suas subetapas
+        self.etapas.setdefault(nome, [0.0, 0.0, 0])
+        t, c = time.perf_counter(), time.thread_time()
+        try:
+            yield
+        finally:
+            self.somar(nome, time.perf_counter() - t, time.thread_time() - c)
+
+    def cronometrar_iterador(self, nome, iteravel):
+        """Repassa os itens medindo só o tempo gasto para produzi-los (ex.: listagem de pastas)."""
+        it = iter(iteravel)
+        while True:
+            t, c = time.perf_counter(), time.thread_time()
+            try:
+                item = next(it)
+            except StopIteration:
+                self.somar(nome, time.perf_counter() - t, time.thread_time() - c, 0)
+                return
+            self.somar(nome, time.perf_counter() - t, time.thread_time() - c)
+            yield item
+
+    def registrar_tarefa(self, nome_arquivo, medidas):
+        if not medidas: return
+        for etapa, (parede, cpu) in medidas["etapas"].items():
+            self.somar(f"worker/{etapa}", parede, cpu)
+        item = (medidas["segundos"], nome_arquivo, medidas.get("tamanho") or 0)
+        if len(self._lentos) < self.n_lentos:
+            heapq.heappush(self._lentos, item)
+        elif item > self._lentos[0]:
+            heapq.heapreplace(self._lentos, item)
+
+    def finalizar(self):
+        if self._fim is None:
+            self._fim = (time.perf_counter() - self._t0, time.process_time() - self._c0)
+        return self._fim
+
+    @property
+    def mais_lentos(self):
+        return sorted(self._lentos, reverse=True)
+
+    def relatorio(self):
+        parede, cpu = self.finalizar()
+        pico, pico_filhos = pico_memoria_mb()
+        return {
+            "inicio": self.data_inicio.isoformat(timespec="seconds"),
+            "total": {"parede_s": round(parede, 4), "cpu_s": round(cpu, 4)},
+            "etapas": {nome: {"parede_s": round(p, 4), "cpu_s": round(c, 4), "chamadas": n}
+                       for nome, (p, c, n) in self.etapas.items()},
+            "arquivos_mais_lentos": [{"arquivo": nome, "segundos": round(s, 4), "bytes": tam}
+                                     for s, nome, tam in self.mais_lentos],
+            "pico_memoria_mb": pico,
+            "pico_memoria_filhos_mb": pico_filhos,
+            **self.info,
+        }
+
+    def resumo(self):
+        """Linhas de texto para o callback de log."""
+        parede, cpu = self.finalizar()
+        linhas = [f"--- Desempenho: {parede:.2f}s total ({cpu:.2f}s de CPU no processo principal) ---"]
+        for nome, (p, c, n) in self.etapas.items():
+            recuo = "    " if "/" in nome and not nome.startswith("worker/") else "  "
+            linhas.append(f"{recuo}{nome:<34} {p:>9.3f}s parede {c:>9.3f}s CPU  ({n}x)")
+        if any(nome.startswith("worker/") for nome in self.etapas):
+            linhas.append("  (etapas 'worker/' somam o tempo de todos os workers)")
+
+        pico, pico_filhos = pico_memoria_mb()
+        if pico is not None:
+            extra = f" | processos filhos: {pico_filhos:.1f} MB" if pico_filhos else ""
+            linhas.append(f"  Pico de memória (RSS): {pico:.1f} MB{extra}")
+
+        if self._lentos:
+            linhas.append(f"--- {len(self._lentos)} arquivos mais lentos ---")
+            for s, nome, tam in self.mais_lentos:
+                tam_txt = f" ({tam / 1024:.0f} KB)" if tam else ""
+                linhas.append(f"  {s:>8.3f}s  {nome}{tam_txt}")
+        return linhas
+
+    def gravar(self, caminho):
+        try:
+            with open(caminho, "w", encoding="utf-8") as f:
+                json.dump(self.relatorio(), f, ensure_ascii=False, indent=2)
+            return caminho
+        except Exception as e:
+            SistemaLog.registrar_erro(f"Falha ao gravar relatório de execução: {caminho}", e)
+            return None
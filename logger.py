@@ -1,6 +1,7 @@
 # Arquivo: core/logger.py
 import logging
 import os
+import sys
 import traceback
 from datetime import datetime
 
@@ -37,4 +38,5 @@ class SistemaLog:
             texto_erro += f"\n   |__ Rastro:\n{traceback.format_exc()}"
         
         logging.error(texto_erro)
-        print(f"❌ [LOG GRAVADO]: {mensagem}") # Aviso visual no console
\ No newline at end of file
+        # stderr: não mistura o aviso com a saída da linha de comando
+        print(f"❌ [LOG GRAVADO]: {mensagem}", file=sys.stderr) # Aviso visual no console
\ No newline at end of file
@@ -0,0 +1,138 @@
+# Arquivo: main_cli.py
+# Execução em lote sem interface gráfica (servidores, cron, agendador de tarefas).
+# Não importa tkinter: só o core.
+#
+# Saída padrão: uma linha JSON por evento ("inicio", "progresso", "fim"), com
+# arquivos/s e linhas/s. As mensagens de log vão para a saída de erro.
+# Código de saída: 0 sucesso, 1 falha no processamento, 2 argumentos inválidos, 130 interrompido.
+#
+# Exemplo:
+#   python main_cli.py /dados/xml/2024-01 /dados/xml/2024-02.zip -o /saida/jan_fev.parquet -w 8 -b processos
+import sys
+import json
+import time
+import argparse
+import multiprocessing
+
+from core.processador import ProcessadorFiscal
+import config
+
+FORMATOS = ("xlsx", "parquet", "arrow", "csv", "csv.gz")
+
+
+def _argumentos(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="main_cli.py",
+        description="Leitor XML (NFe/CTe) em linha de comando: extrai as pastas/ZIPs/XMLs informados para Excel, Parquet, Arrow ou CSV."
+    )
+    parser.add_argument("entradas", nargs="+", help="Pastas, arquivos .zip ou arquivos .xml")
+    parser.add_argument("-o", "--saida", required=True, help="Arquivo de saída")
+    parser.add_argument("-f", "--formato", choices=FORMATOS,
+                        help="Formato de saída (padrão: deduzido da extensão de --saida)")
+    parser.add_argument("-w", "--workers", type=int, help="Quantidade de workers (padrão: núcleos da máquina)")
+    parser.add_argument("-b", "--backend", choices=("threads", "processos"),
+                        help=f"Backend de execução (padrão: {config.BACKEND_EXECUCAO})")
+    parser.add_argument("--duplicados", choices=("proc", "recente", "nenhuma"),
+                        help=f"Política para chaves repetidas (padrão: {config.POLITICA_DUPLICADOS})")
+    parser.add_argument("--canceladas", choices=("marcar", "excluir", "nenhuma"),
+                        help=f"Notas com evento de cancelamento (padrão: {config.NOTAS_CANCELADAS})")
+    parser.add_argument("--rateio-frete", choices=("valor", "igual", "nenhum"),
+                        help=f"Base do rateio do frete CTe -> NFe (padrão: {config.RATEIO_FRETE})")
+    parser.add_argument("--sem-auditoria", action="store_true", help="Não gera a aba de auditoria de impostos")
+    parser.add_argument("--normalizada", action="store_true",
+                        help="Tabela NFe em duas: notas (cabeçalho, uma linha por chave) e itens com a chave")
+    parser.add_argument("--cache", action="store_true",
+                        help=f"Usa o cache de extração em {config.PASTA_CACHE} (arquivos inalterados não são relidos)")
+    parser.add_argument("--relatorio-execucao", nargs="?", const=True, metavar="ARQUIVO",
+                        help="Grava tempos por etapa e pico de memória em JSON (padrão: <saida>_execucao.json)")
+    parser.add_argument("--nao-recursivo", action="store_true", help="Não desce em subpastas")
+    parser.add_argument("--incluir", action="append", metavar="PADRAO", help="Padrão glob a incluir (repetível)")
+    parser.add_argument("--excluir", action="append", metavar="PADRAO", help="Padrão glob a excluir (repetível)")
+    parser.add_argument("-q", "--silencioso", action="store_true", help="Não mostra as mensagens de log")
+
+    args = parser.parse_args(argv)
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers deve ser maior que zero")
+    return args
+
+
+class _Relatorio:
+    """Escreve os eventos em JSON (uma linha cada) e calcula a vazão."""
+
+    def __init__(self, saida=sys.stdout):
+        self.saida = saida
+        self.inicio = time.perf_counter()
+        self.ultimas = {"arquivos": 0, "encontrados": 0, "linhas": 0, "varredura_concluida": False}
+
+    def evento(self, tipo, **dados):
+        registro = {"evento": tipo, "segundos": round(time.perf_counter() - self.inicio, 3)}
+        registro.update(dados)
+        self.saida.write(json.dumps(registro, ensure_ascii=False) + "\n")
+        self.saida.flush()
+
+    def _vazao(self):
+        decorrido = max(time.perf_counter() - self.inicio, 1e-9)
+        m = self.ultimas
+        return {
+            "arquivos": m["arquivos"], "encontrados": m["encontrados"], "linhas": m["linhas"],
+            "arquivos_s": round(m["arquivos"] / decorrido, 2),
+            "linhas_s": round(m["linhas"] / decorrido, 2),
+        }
+
+    def metricas(self, dados):
+        self.ultimas = dados
+        pct = None
+        if dados["varredura_concluida"] and dados["encontrados"]:
+            pct = int(dados["arquivos"] / dados["encontrados"] * 100)
+        self.evento("progresso", percentual=pct, **self._vazao())
+
+    def fim(self, status, **dados):
+        self.evento("fim", status=status, **self._vazao(), **dados)
+
+
+def main(argv=None):
+    args = _argumentos(argv)
+    relatorio = _Relatorio()
+
+    def log(msg):
+        if not args.silencioso: print(msg, file=sys.stderr, flush=True)
+
+    relatorio.evento("inicio", entradas=args.entradas, saida=args.saida, formato=args.formato,
+                     backend=args.backend or config.BACKEND_EXECUCAO, workers=args.workers)
+    try:
+        resultado = ProcessadorFiscal.executar(
+            args.entradas if len(args.entradas) > 1 else args.entradas[0],
+            args.saida,
+            callback_log=log,
+            callback_progresso=lambda valor, texto: None,  # o progresso sai pelas métricas
+            backend=args.backend,
+            max_workers=args.workers,
+            usar_cache=True if args.cache else None,
+            politica_duplicados=args.duplicados,
+            canceladas=args.canceladas,
+            rateio_frete=args.rateio_frete,
+            auditoria=False if args.sem_auditoria else None,
+            normalizada=True if args.normalizada else None,
+            relatorio_execucao=args.relatorio_execucao,
+            recursivo=False if args.nao_recursivo else None,
+            incluir=tuple(args.incluir) if args.incluir else None,
+            excluir=tuple(args.excluir) if args.excluir else None,
+            formato=args.formato,
+            callback_metricas=relatorio.metricas,
+        )
+    except KeyboardInterrupt:
+        relatorio.fim("interrompido")
+        return 130
+    except Exception as e:
+        log(f"ERRO: {e}")
+        relatorio.fim("erro", mensagem=str(e))
+        return 1
+
+    relatorio.fim("ok", resultado=resultado)
+    return 0
+
+
+if __name__ == "__main__":
+    # Necessário para o backend de processos no executável (PyInstaller/Windows)
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -1,8 +1,12 @@
 # Arquivo: main.py
+import multiprocessing
 import tkinter as tk
 from interface.ui_main import FiscalApp
 
 if __name__ == "__main__":
+    # Necessário para o backend de processos no executável (PyInstaller/Windows)
+    multiprocessing.freeze_support()
+
     # Cria a janela raiz
     root = tk.Tk()
     
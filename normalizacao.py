@@ -0,0 +1,48 @@
+# Arquivo: core/normalizacao.py
+from core.esquema import CAMPOS_NOTA_NFE, CAMPOS_ITEM_NFE
+import config
+
+CHAVE = "Chave de Acesso"
+NOME_NOTAS = "NFe Notas"
+NOME_ITENS = "NFe Itens"
+
+
+class SaidaNormalizada:
+    """
+    Saída normalizada da tabela NFe. Em vez de repetir em cada item os campos do
+    documento (emitente, destinatário, Valor Total Nota, Dados Complementares, que
+    pode ter kB...), grava duas tabelas:
+    - "NFe Notas": uma linha por chave de acesso, com os campos do cabeçalho;
+    - "NFe Itens": a chave de acesso e os campos do item, para a junção com as notas.
+    As colunas de cada uma vêm do nível do grupo de origem no esquema
+    (CAMPOS_NOTA_NFE / CAMPOS_ITEM_NFE). Com duplicados mantidos, vale o cabeçalho
+    do primeiro documento de cada chave.
+    """
+
+    @staticmethod
+    def ativa(normalizada=None):
+        return config.SAIDA_NORMALIZADA if normalizada is None else normalizada
+
+    @staticmethod
+    def tabelas(df_nfe):
+        """[(nome, df, campos)] das notas e dos itens a partir da tabela NFe detalhada."""
+        colunas = lambda campos: [c.coluna for c in campos if c.coluna in df_nfe.columns]
+        primeiras = ~df_nfe[CHAVE].duplicated().to_numpy()
+        notas = df_nfe.loc[primeiras, colunas(CAMPOS_NOTA_NFE)].reset_index(drop=True)
+        itens = df_nfe.loc[:, colunas(CAMPOS_ITEM_NFE)]
+        return [(NOME_NOTAS, notas, CAMPOS_NOTA_NFE), (NOME_ITENS, itens, CAMPOS_ITEM_NFE)]
+
+    @staticmethod
+    def linhas(linhas_nfe, chaves_gravadas):
+        """
+        [(nome, linhas, colunas)] para a gravação em fluxo: as notas são a primeira linha
+        de cada chave ainda não gravada (chaves_gravadas: set atualizado aqui).
+        """
+        primeiras = {}
+        for l in linhas_nfe:
+            chave = l.get(CHAVE)
+            if chave not in chaves_gravadas: primeiras.setdefault(chave, l)
+        chaves_gravadas.update(primeiras)
+        colunas = lambda campos: [c.coluna for c in campos if c.coluna in linhas_nfe[0]]
+        return [(NOME_NOTAS, list(primeiras.values()), colunas(CAMPOS_NOTA_NFE)),
+                (NOME_ITENS, linhas_nfe, colunas(CAMPOS_ITEM_NFE))]
@@ -1,240 +1,694 @@
 # Arquivo: core/processador.py (VERSÃO FINAL - COM CAMINHO PERSONALIZADO)
 import os
-import xml.etree.ElementTree as ET
-import pandas as pd
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import time
+from collections import deque, Counter
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
 
 # Importações do Core (Sem SAP/Conciliador)
+from core.extrator import ExtratorFiscal
 from core.xml_parser import XMLParser
+from core.cache_extracao import CacheExtracao
+from core.indice_chaves import IndiceChaves, BYTES_LEITURA
+from core.identificacao import IdentificadorDocumento
+from core.indice_eventos import IndiceEventos
+from core.rateio_frete import RateioFrete, COLUNAS_NFE as COLUNAS_RATEIO_NFE, NOME_TABELA as TABELA_RATEIO, NFE_AUSENTE
+from core.auditoria import AuditoriaFiscal, COLUNAS_NFE as COLUNAS_AUDITORIA_NFE, NOME_TABELA as TABELA_AUDITORIA
+from core.resumo import ResumoFiscal, COLUNAS_NFE as COLUNAS_RESUMO_NFE, NOME_TABELA as TABELA_RESUMO
+from core.esquema import CAMPOS_NFE, CAMPOS_CTE, CAMPOS_RATEIO, CAMPOS_AUDITORIA, CAMPOS_RESUMO
+from core.acumulador import TabelaColunar
+from core.fontes import FonteXML, VarredorFontes
 from core.excel_writer import ExcelReportWriter
+from core.exportador_colunar import ExportadorColunar
+from core.exportador_csv import EscritorCSV
+from core.instrumentacao import Instrumentacao, Cronometro, PerfilWorkers
 from core.logger import SistemaLog
 from core.validators import Validador
 import config
 
+class ProcessamentoCancelado(Exception):
+    """Interrupção pedida pelo usuário (não é erro de processamento)."""
+
 class ProcessadorFiscal:
     
     @staticmethod
     def _processar_um_xml(caminho_arquivo, ns):
         """
         Versão Simples: Apenas extração de dados XML.
+        A leitura das tags fica a cargo do ExtratorFiscal (passagem única).
+        """
+        _, local_nfe, local_cte = ProcessadorFiscal._tarefa_arquivo(caminho_arquivo, ns)
+        return local_nfe, local_cte
+
+    @staticmethod
+    def _tarefa_arquivo(fonte, ns, crono=None, conteudo=None):
         """
+        Unidade de trabalho dos workers: retorna (ok, linhas_nfe, linhas_cte).
+        Aceita um caminho ou FonteXML (arquivo em disco ou membro de ZIP).
+        ok=False indica falha de leitura (o resultado não vai para o cache).
+        crono: Cronometro opcional que recebe o tempo de cada etapa.
+        conteudo: bytes já lidos pela leitura antecipada (None: o worker lê o arquivo).
+        """
+        if isinstance(fonte, str): fonte = FonteXML(fonte)
         try:
-            tree = ET.parse(caminho_arquivo)
-            root = tree.getroot()
-            tag = root.tag.lower()
-            
-            local_nfe = []
-            local_cte = []
+            if conteudo is not None:
+                root = XMLParser.carregar_bytes(conteudo)
+                if crono: crono.marcar(f"parse ({XMLParser.backend()}, bytes antecipados)")
+                resultado = ExtratorFiscal.extrair_documento(root, ns)
+                if crono: crono.marcar("extração (ExtratorFiscal)")
+                return (True,) + resultado
 
-            if 'nfe' in tag:
-                tipo = "NFe"
-                chave = XMLParser.obter_chave(root, ns, "NFe")
-                
-                # --- [NFe] Cabeçalho ---
-                n_nf = XMLParser.pegar_texto(root, './/nfe:ide/nfe:nNF', ns)
-                serie = XMLParser.pegar_texto(root, './/nfe:ide/nfe:serie', ns)
-                modelo = XMLParser.pegar_texto(root, './/nfe:ide/nfe:mod', ns)
-                nat_op = XMLParser.pegar_texto(root, './/nfe:ide/nfe:natOp', ns)
-                tp = XMLParser.pegar_texto(root, './/nfe:ide/nfe:tpNF', ns)
-                mov = "ENTRADA" if tp == '0' else "SAÍDA" if tp == '1' else tp
-                
-                # Data e Hora
-                data_emi, hora_emi = XMLParser.obter_data_hora(root, ns, "NFe") 
-                
-                # --- [NFe] Emitente e Destinatário ---
-                emit = XMLParser.obter_emitente(root, ns, tipo)
-                dest_nome = XMLParser.pegar_texto(root, './/nfe:dest/nfe:xNome', ns)
-                dest_doc = XMLParser.pegar_texto(root, './/nfe:dest/nfe:CNPJ', ns) or XMLParser.pegar_texto(root, './/nfe:dest/nfe:CPF', ns)
-                
-                uf_dest = XMLParser.obter_uf_destinatario(root, ns)
-                inf_cpl = XMLParser.obter_inf_complementar(root, ns)
-                simples = XMLParser.verificar_simples(root, ns)
-                val_xml_total = XMLParser.obter_valor_total_xml(root, ns, tipo)
-
-                # --- [NFe] Itens ---
-                for det in root.findall('.//nfe:det', ns):
-                    prod = det.find('nfe:prod', ns)
-                    trib = XMLParser.extrair_tributos(det, ns)
-                    piscof = XMLParser.extrair_pis_cofins(det, ns)
-                    ipi_data = XMLParser.extrair_ipi(det, ns)
-                    ref = XMLParser.extrair_reforma(det, ns)
-
-                    local_nfe.append({
-                        # REMOVIDO: Empresa e Filial
-                        "Tipo": tipo,
-                        "Mov": mov,
-                        "Data Emissão": data_emi,
-                        "Hora Emissão": hora_emi,
-                        "Modelo": modelo,
-                        "Numero NF": n_nf, 
-                        "Serie": serie,
-                        "Natureza Op.": nat_op,
-                        "Fornecedor/Emitente": emit["Nome"],
-                        "CNPJ": emit["CNPJ"],
-                        "UF Emit.": emit["UF"],
-                        "Destinatario/Tomador": dest_nome,
-                        "CNPJ/CPF": dest_doc,
-                        "UF Destinatario": uf_dest,
-                        "Item": det.get('nItem'),
-                        "Pedido Compra (xPed)": XMLParser.pegar_texto(prod, 'nfe:xPed', ns),
-                        "Item Pedido": XMLParser.pegar_texto(prod, 'nfe:nItemPed', ns),
-                        "EAN/GTIN": XMLParser.pegar_texto(prod, 'nfe:cEAN', ns),
-                        "Cod": XMLParser.pegar_texto(prod, 'nfe:cProd', ns),
-                        "Produto": XMLParser.pegar_texto(prod, 'nfe:xProd', ns),
-                        "NCM": XMLParser.pegar_texto(prod, 'nfe:NCM', ns),
-                        "CFOP": XMLParser.pegar_texto(prod, 'nfe:CFOP', ns),
-                        "Cod. ANP": XMLParser.pegar_texto(prod, 'nfe:comb/nfe:cProdANP', ns),
-                        "Unid.": XMLParser.pegar_texto(prod, 'nfe:uCom', ns),
-                        "Qtde": XMLParser.pegar_float(prod, 'nfe:qCom', ns),
-                        "Valor Unit.": XMLParser.pegar_float(prod, 'nfe:vUnCom', ns),
-                        "Valor Desconto": XMLParser.pegar_float(prod, 'nfe:vDesc', ns),
-                        "Valor Frete": XMLParser.pegar_float(prod, 'nfe:vFrete', ns),
-                        "Valor Seguro": XMLParser.pegar_float(prod, 'nfe:vSeg', ns),
-                        "Outras Desp.": XMLParser.pegar_float(prod, 'nfe:vOutro', ns),
-                        "Valor Total": XMLParser.pegar_float(prod, 'nfe:vProd', ns),
-                        "Valor Total Nota": val_xml_total,
-                        # Impostos
-                        "Origem": XMLParser.extrair_origem(det, ns),
-                        "CST": trib.get("CST", ""),
-                        "Simples Nac.": simples,
-                        "Credito Simples Nacional": trib.get("CRED", 0.0),
-                        "Base Cálc. ICMS": trib.get("BASE", 0.0), "ALIQ. ICMS": trib.get("ALIQ", 0.0), "Valor ICMS": trib.get("VAL", 0.0),
-                        "CEST": XMLParser.pegar_texto(prod, 'nfe:CEST', ns),
-                        "MVA": trib.get("MVA", 0.0), "Base ST": trib.get("BASE_ST", 0.0), "Aliq. ICMS ST": trib.get("ALIQ_ST", 0.0), 
-                        "Red. ST": trib.get("RED_ST", 0.0), "Valor ICMS ST": trib.get("VAL_ST", 0.0),
-                        "Base Pis": piscof.get("PIS_BC", 0.0), "CST Pis": piscof.get("PIS_CST", ""), "Aliquota Pis": piscof.get("PIS_ALIQ", 0.0), "Valor Pis": piscof.get("PIS_VAL", 0.0),
-                        "Base Cofins": piscof.get("COF_BC", 0.0), "CST Cofins": piscof.get("COF_CST", ""), "Aliquota Cofins": piscof.get("COF_ALIQ", 0.0), "Valor Cofins": piscof.get("COF_VAL", 0.0),
-                        "Base IPI": ipi_data.get("IPI_BC", 0.0), "CST IPI": ipi_data.get("IPI_CST", ""), "Aliquota IPI": ipi_data.get("IPI_ALIQ", 0.0), "Valor IPI": ipi_data.get("IPI_VAL", 0.0),
-                        "CST Reforma": ref.get("CST", ""), "ClassTrib": ref.get("CLASS", ""), "Base CBS": ref.get("BC_CBS", 0.0), "Aliq. CBS": ref.get("ALIQ_CBS", 0.0), "Valor CBS": ref.get("V_CBS", 0.0), "Base IBS": ref.get("BC_IBS", 0.0), "Aliq. IBS": ref.get("ALIQ_IBS", 0.0), "Valor IBS": ref.get("V_IBS", 0.0),
-                        "Dados Complementares": inf_cpl, "Chave de Acesso": f"'{chave}"
-                    })
-
-            elif 'cte' in tag:
-                tipo = "CTe"
-                chave = XMLParser.obter_chave(root, ns, "CTe")
-                
-                # --- [CTe] Dados Básicos ---
-                n_ct = XMLParser.pegar_texto(root, './/cte:ide/cte:nCT', ns)
-                serie = XMLParser.pegar_texto(root, './/cte:ide/cte:serie', ns)
-                cfop = XMLParser.pegar_texto(root, './/cte:ide/cte:CFOP', ns)
-                
-                # Data Emissão (Usa a nova função)
-                data_emi, hora_emi = XMLParser.obter_data_hora(root, ns, "CTe")
-                
-                val_total = XMLParser.obter_valor_total_xml(root, ns, tipo)
-                dest_nome, dest_doc = XMLParser.obter_pagador_cte(root, ns)
-                emit = XMLParser.obter_emitente(root, ns, tipo)
-                
-                # --- [CTe] Novos Extratores (Logística e Atores) ---
-                v_carga, peso, unit_med = XMLParser.obter_dados_carga_cte(root, ns)
-                placa, rntrc = XMLParser.obter_modal_rodoviario(root, ns)
-                chaves_nfe = XMLParser.obter_chaves_nfe_vinculadas(root, ns)
-                rota_dados = XMLParser.obter_rota_e_obs(root, ns)
-                atores = XMLParser.obter_atores_cte(root, ns)
-
-                # --- [CTe] ICMS ---
-                base_icms = 0.0; aliq_icms = 0.0; val_icms = 0.0
-                imp = root.find('.//cte:imp/cte:ICMS', ns)
-                if imp:
-                    for child in imp:
-                        if 'ICMS' in child.tag:
-                            base_icms = XMLParser.pegar_float(child, 'cte:vBC', ns)
-                            aliq_icms = XMLParser.pegar_float(child, 'cte:pICMS', ns) / 100.0
-                            val_icms = XMLParser.pegar_float(child, 'cte:vICMS', ns)
-                            if val_icms > 0: break # Pega o primeiro que tiver valor
-
-                local_cte.append({
-                    # REMOVIDO: Empresa e Filial
-                    "Chave de Acesso": f"'{chave}",
-                    "Data Emissão": data_emi,
-                    "Numero CTe": n_ct,
-                    "Serie": serie,
-                    "CFOP": cfop,
-                    
-                    # Financeiro
-                    "Valor Total Frete": val_total,
-                    "Valor da Carga": v_carga,
-                    "Peso/Qtde": peso,
-                    "Unid. Medida": unit_med,
-                    
-                    # Atores Envolvidos
-                    "Tomador (Pagador)": dest_nome,
-                    "CNPJ Tomador": dest_doc,
-                    "Emitente (Transportadora)": emit["Nome"],
-                    "CNPJ Emitente": emit["CNPJ"],
-                    "UF Emit.": emit["UF"],
-                    
-                    # Logística Detalhada
-                    "Placa Veículo": placa,
-                    "RNTRC": rntrc,
-                    "Remetente (Origem)": atores["Remetente_Nome"],
-                    "Origem (Mun. Ini)": rota_dados["Inicio"],
-                    "UF Origem": rota_dados["UF_Inicio"],
-                    "Destinatário (Destino)": atores["Destinatario_Nome"],
-                    "Destino (Mun. Fim)": rota_dados["Fim"],
-                    "UF Destino": rota_dados["UF_Fim"],
-                    "Observações": rota_dados["Obs"],
-                    
-                    # Tributos
-                    "Base Cálc. ICMS": base_icms, 
-                    "ALIQ. ICMS": aliq_icms, 
-                    "Valor ICMS": val_icms,
-                    "NFes Vinculadas": chaves_nfe
-                })
-
-            return local_nfe, local_cte
+            with fonte.abrir() as arquivo:
+                # Arquivos grandes (muitos itens ou lotes de documentos) vão para o streaming
+                if fonte.tamanho() > config.LIMITE_STREAMING_MB * 1024 * 1024:
+                    resultado = ProcessadorFiscal._processar_streaming(arquivo, ns)
+                    if crono: crono.marcar("streaming (iterparse + extração)")
+                    return (True,) + resultado
+
+                root = XMLParser.carregar(arquivo)
+                if crono: crono.marcar(f"parse ({XMLParser.backend()})")
+                resultado = ExtratorFiscal.extrair_documento(root, ns)
+                if crono: crono.marcar("extração (ExtratorFiscal)")
+                return (True,) + resultado
+
+        except Exception as e:
+            SistemaLog.registrar_erro(f"Falha ao processar arquivo: {fonte.nome}", e)
+            if crono: crono.marcar("falhas")
+            return False, [], []
+
+    @staticmethod
+    def _tarefa_medida(fonte, ns, perfilar=False, conteudo=None, cachear=False):
+        """
+        _tarefa_arquivo com medição por etapa (e cProfile opcional), para o backend
+        de threads. Retorna (ok, linhas_nfe, linhas_cte, medidas, perfil, dados_cache);
+        dados_cache (se 'cachear') são as linhas já serializadas para o cache.
+        """
+        if perfilar:
+            # A medição fica dentro do perfil: a espera pela vez de perfilar não conta
+            (ok, nfe, cte, medidas, _, dados), perfil = PerfilWorkers.executar(
+                ProcessadorFiscal._tarefa_medida, fonte, ns, False, conteudo, cachear)
+            return ok, nfe, cte, medidas, perfil, dados
+
+        crono = Cronometro()
+        ok, nfe, cte = ProcessadorFiscal._tarefa_arquivo(fonte, ns, crono, conteudo)
+        dados = None
+        if cachear and ok:
+            dados = CacheExtracao.serializar(nfe, cte)
+            crono.marcar("cache (serialização)")
+        tamanho = len(conteudo) if conteudo is not None else None
+        return ok, nfe, cte, crono.medidas(fonte, tamanho), None, dados
+
+    @staticmethod
+    def _ler_antecipado(fonte, com_hash=False):
+        """
+        Etapa de I/O do pipeline (threads de leitura): retorna (conteudo, hash, parede, cpu).
+        Arquivos acima do limite de streaming e falhas de leitura voltam como None:
+        o worker abre o arquivo ele mesmo (e registra o erro, se houver).
+        com_hash: calcula o hash do conteúdo para o cache sobre os bytes já lidos
+        (arquivos grandes, que não são lidos aqui, ficam sem hash).
+        """
+        t, c = time.perf_counter(), time.thread_time()
+        hash_conteudo = None
+        try:
+            conteudo = fonte.ler(config.LIMITE_STREAMING_MB * 1024 * 1024)
+            if com_hash and conteudo is not None:
+                hash_conteudo = fonte.hash_conteudo(conteudo)
+        except Exception:
+            conteudo = None
+        return conteudo, hash_conteudo, time.perf_counter() - t, time.thread_time() - c
+
+    @staticmethod
+    def _pre_ler(fonte, com_chave, com_eventos=False):
+        """
+        Leitura barata do início do arquivo (sem parse): identifica o documento pela
+        tag raiz e, se 'com_chave', lê a chave de acesso para o controle de duplicados.
+        Eventos (se 'com_eventos') são lidos inteiros aqui mesmo: são pequenos e não
+        passam pelo extrator.
+        Retorna ((tipo, raiz, versao), info_chave, evento) - ver IdentificadorDocumento,
+        IndiceChaves.ler_chave e IndiceEventos.ler_evento.
+        """
+        try:
+            inicio = fonte.ler_inicio(BYTES_LEITURA)
+            ident = IdentificadorDocumento.identificar(inicio)
+            evento = None
+            if com_eventos and ident[0] == "evento":
+                if len(inicio) >= BYTES_LEITURA: inicio = fonte.ler()
+                evento = IndiceEventos.ler_evento(inicio)
+        except Exception:
+            # Falha de leitura: o worker tenta de novo e registra o erro
+            return (None, "", ""), False, None
+        info_chave = False
+        if com_chave and ident[0] in ("NFe", "CTe", None):
+            info_chave = IndiceChaves.ler_chave(fonte, inicio) or False
+        return ident, info_chave, evento
+
+    @staticmethod
+    def _processar_streaming(arquivo, ns):
+        """Lê o arquivo com iterparse, sem montar a árvore inteira em memória."""
+        local_nfe = []
+        local_cte = []
+        for tipo, linha in ExtratorFiscal.iterar_arquivo(arquivo, ns):
+            if tipo == "NFe": local_nfe.append(linha)
+            else: local_cte.append(linha)
+        return local_nfe, local_cte
+
+    @staticmethod
+    def _processar_lote(itens, ns, perfilar=False, cachear=False):
+        """
+        Tarefa do backend de processos: extrai um lote de (fonte, conteudo) e devolve
+        as linhas em formato compacto (colunas uma vez + tuplas de valores),
+        reduzindo o custo de serialização entre processos.
+        Retorna (colunas_nfe, colunas_cte, [(fonte, ok, nfe, cte, medidas, dados_cache)], perfil).
+        """
+        if perfilar:
+            pacote, perfil = PerfilWorkers.executar(ProcessadorFiscal._processar_lote, itens, ns, False, cachear)
+            return pacote[:3] + (perfil,)
+
+        colunas_nfe = ()
+        colunas_cte = ()
+        resultados = []
+        for fonte, conteudo in itens:
+            crono = Cronometro()
+            ok, nfe, cte = ProcessadorFiscal._tarefa_arquivo(fonte, ns, crono, conteudo)
+            if nfe: colunas_nfe = tuple(nfe[0])
+            if cte: colunas_cte = tuple(cte[0])
+            dados = None
+            if cachear and ok:
+                dados = CacheExtracao.serializar(nfe, cte)
+                crono.marcar("cache (serialização)")
+            tamanho = len(conteudo) if conteudo is not None else None
+            resultados.append((fonte, ok, [tuple(l.values()) for l in nfe], [tuple(l.values()) for l in cte],
+                               crono.medidas(fonte, tamanho), dados))
+        return colunas_nfe, colunas_cte, resultados, None
+
+    @staticmethod
+    def _expandir_lote(pacote):
+        colunas_nfe, colunas_cte, resultados, _ = pacote
+        return [
+            (fonte, ok, [dict(zip(colunas_nfe, v)) for v in nfe], [dict(zip(colunas_cte, v)) for v in cte],
+             medidas, dados)
+            for fonte, ok, nfe, cte, medidas, dados in resultados
+        ]
+
+    @staticmethod
+    def _formato_por_extensao(caminho):
+        if caminho.lower().endswith(('.csv.gz', '.gz')): return "csv.gz"
+        ext = os.path.splitext(caminho)[1].lower()
+        if ext == '.csv': return "csv"
+        for formato, ext_formato in ExportadorColunar.FORMATOS.items():
+            if ext == ext_formato: return formato
+        return "xlsx"
+
+    @staticmethod
+    def _base_saida(caminho):
+        for ext in (".csv.gz", ".gz"):
+            if caminho.lower().endswith(ext): return caminho[:-len(ext)]
+        return os.path.splitext(caminho)[0]
+
+    @staticmethod
+    def executar(pasta_xml, caminho_saida, callback_log, callback_progresso, callback_retry=None,
+                 backend=None, max_workers=None, usar_cache=None, politica_duplicados=None,
+                 recursivo=None, incluir=None, excluir=None, formato=None, callback_metricas=None,
+                 cancelamento=None, perfilar=None, relatorio_execucao=None, canceladas=None,
+                 rateio_frete=None, auditoria=None, normalizada=None):
+        """
+        pasta_xml: pasta com arquivos .xml e/ou .zip, um único arquivo .zip
+        (os membros são lidos direto do pacote, sem extração para o disco) ou .xml,
+        ou uma lista dessas entradas.
+        backend: "threads" (padrão) ou "processos". O backend de processos envia
+        lotes de arquivos para processos separados, escapando do GIL na extração.
+        usar_cache: reaproveita a extração de arquivos inalterados desde a última execução.
+        politica_duplicados: "proc", "recente" ou "nenhuma" (ver IndiceChaves).
+        recursivo/incluir/excluir: controle da varredura (ver VarredorFontes.varrer).
+        formato: "xlsx", "parquet", "arrow", "csv" ou "csv.gz"; se omitido, vem da
+        extensão de caminho_saida. Em CSV as linhas são gravadas conforme cada
+        arquivo termina (sem acumular o lote em memória).
+        Enquanto a varredura não termina, o progresso é enviado com valor None
+        (contagem corrente, sem percentual).
+        callback_metricas: opcional, recebe junto com o progresso um dict com
+        "arquivos" (concluídos), "encontrados", "linhas" (extraídas) e "varredura_concluida".
+        cancelamento: opcional, objeto com is_set() (ex.: threading.Event). Quando sinalizado,
+        as tarefas pendentes são canceladas, as em andamento terminam e é lançado
+        ProcessamentoCancelado (o CSV mantém o que já foi gravado).
+        Ao final, os tempos por etapa (parede/CPU), os arquivos mais lentos e o pico de
+        memória vão para o log e, se pedido, para um JSON: 'relatorio_execucao' é o caminho,
+        True para <base>_execucao.json, False para não gravar (None: config.RELATORIO_EXECUCAO).
+        perfilar: roda as tarefas dos workers sob cProfile e grava <base>_perfil.prof
+        (padrão: config.PERFILAR_WORKERS).
+        canceladas: "marcar", "excluir" ou "nenhuma" (ver IndiceEventos; padrão:
+        config.NOTAS_CANCELADAS). Os eventos de cancelamento da mesma varredura entram
+        na coluna "Situação" (ou removem as linhas). Em CSV, que é gravado em fluxo,
+        a lista vai para <base>_eventos.csv.
+        rateio_frete: base do rateio do frete dos CTes entre as NFes vinculadas e seus
+        itens - "valor", "igual" ou "nenhum" (ver RateioFrete; padrão: config.RATEIO_FRETE).
+        A tabela sai numa aba (ou arquivo) "Rateio Frete".
+        auditoria: confere Base x Alíquota dos impostos e o total de cada nota (aba
+        "Auditoria Impostos"; ver AuditoriaFiscal; padrão: config.AUDITORIA_IMPOSTOS).
+        normalizada: a tabela NFe sai em duas, "NFe Notas" (cabeçalho, uma linha por chave)
+        e "NFe Itens" (itens com a chave), em todos os formatos (ver SaidaNormalizada;
+        padrão: config.SAIDA_NORMALIZADA).
+        """
+        if perfilar is None: perfilar = config.PERFILAR_WORKERS
+        instr = Instrumentacao(config.INSTRUMENTACAO_MAIS_LENTOS)
+        perfil = PerfilWorkers() if perfilar else None
+        status = "erro"
+        try:
+            retorno = ProcessadorFiscal._executar(
+                pasta_xml, caminho_saida, callback_log, callback_progresso, callback_retry,
+                backend, max_workers, usar_cache, politica_duplicados, recursivo, incluir, excluir,
+                formato, callback_metricas, cancelamento, instr, perfil, canceladas, rateio_frete, auditoria,
+                normalizada
+            )
+            status = "ok"
+            return retorno
+        except ProcessamentoCancelado:
+            status = "cancelado"
+            raise
+        finally:
+            # Só relata execuções que passaram da validação
+            if "backend" in instr.info:
+                instr.info["status"] = status
+                ProcessadorFiscal._relatar_desempenho(
+                    instr, perfil, callback_log, ProcessadorFiscal._base_saida(caminho_saida), relatorio_execucao
+                )
 
+    @staticmethod
+    def _relatar_desempenho(instr, perfil, callback_log, base, relatorio_execucao):
+        try:
+            for linha in instr.resumo(): callback_log(linha)
+
+            if relatorio_execucao is None: relatorio_execucao = config.RELATORIO_EXECUCAO
+            if relatorio_execucao is True: relatorio_execucao = f"{base}_execucao.json"
+            if relatorio_execucao and instr.gravar(relatorio_execucao):
+                callback_log(f"Relatório da execução: {relatorio_execucao}")
+
+            if perfil is not None and perfil.gravar(f"{base}_perfil.prof"):
+                callback_log(f"Perfil dos workers ({perfil.tarefas} tarefas): {base}_perfil.prof")
+                for linha in perfil.resumo(15).splitlines():
+                    if linha.strip(): callback_log(linha)
         except Exception as e:
-            SistemaLog.registrar_erro(f"Falha ao processar arquivo: {os.path.basename(caminho_arquivo)}", e)
-            return [], []
+            SistemaLog.registrar_erro("Falha ao gerar o relatório de desempenho", e)
 
     @staticmethod
-    def executar(pasta_xml, caminho_saida, callback_log, callback_progresso, callback_retry=None):
+    def _executar(pasta_xml, caminho_saida, callback_log, callback_progresso, callback_retry,
+                  backend, max_workers, usar_cache, politica_duplicados, recursivo, incluir, excluir,
+                  formato, callback_metricas, cancelamento, instr, perfil, canceladas=None,
+                  rateio_frete=None, auditoria=None, normalizada=None):
         # 1. Definição do Caminho de Saída (Agora vem do argumento)
         saida = caminho_saida
+        backend = backend or config.BACKEND_EXECUCAO
+        if backend not in ("threads", "processos"):
+            raise Exception(f"Backend de execução inválido: {backend}")
+        if usar_cache is None: usar_cache = config.USAR_CACHE
+        if recursivo is None: recursivo = config.BUSCA_RECURSIVA
+        politica_duplicados = politica_duplicados or config.POLITICA_DUPLICADOS
+        incluir = incluir or config.PADROES_INCLUIR
+        formato = formato or ProcessadorFiscal._formato_por_extensao(saida)
+        if formato != "xlsx" and formato not in ExportadorColunar.FORMATOS and formato not in EscritorCSV.EXTENSOES:
+            raise Exception(f"Formato de saída inválido: {formato}")
+        excluir = excluir or config.PADROES_EXCLUIR
 
         # 2. VALIDAÇÃO PRÉVIA
-        valid_xml, msg_xml = Validador.validar_pasta_xml(pasta_xml)
-        if not valid_xml: raise Exception(msg_xml)
-
-        arqs = [f for f in os.listdir(pasta_xml) if f.lower().endswith('.xml')]
-        total = len(arqs)
-        
-        callback_log(f"Iniciando leitura de {total} arquivos (Modo Simples)...")
+        entradas = [pasta_xml] if isinstance(pasta_xml, str) else list(pasta_xml)
+        if not entradas: raise Exception("Nenhuma pasta ou arquivo informado.")
+        for entrada in entradas:
+            valid_xml, msg_xml = Validador.validar_pasta_xml(entrada, recursivo, incluir, excluir)
+            if not valid_xml:
+                raise Exception(msg_xml if len(entradas) == 1 else f"{entrada}: {msg_xml}")
         
-        lista_nfe = []
-        lista_cte = []
+        callback_log(f"Iniciando leitura dos arquivos (Modo Simples, backend: {backend})...")
+        medir = instr.etapa
+        instr.info.update(entradas=entradas, saida=saida, formato=formato, backend=backend,
+                          workers=max_workers or os.cpu_count() or 1)
         
-        # 3. PROCESSAMENTO PARALELO
-        with ThreadPoolExecutor() as executor:
-            futuros = []
-            for f in arqs:
-                caminho_completo = os.path.join(pasta_xml, f)
-                # Chamada sem o SAP
-                futuros.append(executor.submit(ProcessadorFiscal._processar_um_xml, caminho_completo, config.NS_MAP))
-            
-            for i, futuro in enumerate(as_completed(futuros)):
-                nfe, cte = futuro.result()
-                
-                if nfe: lista_nfe.extend(nfe)
-                if cte: lista_cte.extend(cte)
-                
-                if i % 10 == 0 or i == total - 1:
-                    pct = int(((i+1)/total)*100)
-                    callback_progresso(pct, f"Processando: {i+1}/{total} ({pct}%)")
+        indice = IndiceChaves(politica_duplicados)
+        eventos = IndiceEventos(canceladas or config.NOTAS_CANCELADAS)
+        rateio_frete = rateio_frete or config.RATEIO_FRETE
+        if rateio_frete not in RateioFrete.BASES:
+            raise Exception(f"Base de rateio de frete inválida: {rateio_frete}")
+        if auditoria is None: auditoria = config.AUDITORIA_IMPOSTOS
+
+        # Saída CSV em fluxo: as tabelas derivadas precisam do lote inteiro, então
+        # guardamos só as colunas NFe que elas leem (vazio: nenhuma tabela derivada)
+        colunas_derivadas = tuple(dict.fromkeys(
+            (COLUNAS_RESUMO_NFE if config.RESUMO_AGRUPAMENTOS else ())
+            + (COLUNAS_RATEIO_NFE if rateio_frete != "nenhum" else ())
+            + (COLUNAS_AUDITORIA_NFE if auditoria else ())
+        ))
+        # Linhas do lote por coluna (valores repetidos guardados uma vez), na ordem de conclusão
+        tabela_nfe = TabelaColunar(CAMPOS_NFE, colunas_derivadas if formato in EscritorCSV.EXTENSOES else None)
+        tabela_cte = TabelaColunar(CAMPOS_CTE)
+        descartadas = set()   # fontes que perderam para uma duplicata preferida
+        documentos = Counter()  # "NFe 4.00" -> arquivos identificados pela tag raiz
+        ignorados = Counter()   # tag raiz -> arquivos que não são NFe/CTe (eventos, NFSe...)
+        encontrados = 0
+        concluidos = 0
+        linhas = 0
+        ultimo_aviso = 0
+        varrendo = True
+
+        def metricas():
+            if callback_metricas:
+                callback_metricas({"arquivos": concluidos, "encontrados": encontrados,
+                                   "linhas": linhas, "varredura_concluida": not varrendo})
+
+        def registrar(qtd):
+            nonlocal concluidos, ultimo_aviso
+            concluidos += qtd
+            if varrendo:
+                if concluidos - ultimo_aviso >= 10:
+                    ultimo_aviso = concluidos
+                    callback_progresso(None, f"Processando: {concluidos} arquivos ({encontrados} encontrados até agora)")
+                    metricas()
+            elif concluidos - ultimo_aviso >= 10 or concluidos == encontrados:
+                ultimo_aviso = concluidos
+                pct = int((concluidos/encontrados)*100) if encontrados else 100
+                callback_progresso(pct, f"Processando: {concluidos}/{encontrados} ({pct}%)")
+                metricas()
+
+        def receber(fonte, ok, nfe, cte, dados_cache=None):
+            nonlocal linhas
+            linhas += (len(nfe) if nfe else 0) + (len(cte) if cte else 0)
+            if cache and ok and dados_cache is not None:
+                with medir("cache (gravação)"): cache.guardar(fonte, dados_cache)
+            if fonte in descartadas: return
+            if escritor:
+                with medir("csv (gravação)"): escritor.escrever(nfe, cte)
+                gravadas.add(fonte)
+                if not colunas_derivadas: return
+            with medir("acumulação (colunas)"):
+                tabela_nfe.adicionar(fonte, nfe)
+                tabela_cte.adicionar(fonte, cte)
+
+        def dataframes():
+            with medir("dataframe (colunas acumuladas)"):
+                return tabela_nfe.dataframe(), tabela_cte.dataframe()
+
+        def tabelas_derivadas(df_nfe, df_cte):
+            """[(nome, df, campos)] das tabelas montadas a partir de NFe/CTe já extraídas."""
+            extras = []
+            if config.RESUMO_AGRUPAMENTOS:
+                with medir("resumo (totais por categoria)"):
+                    df_resumo = ResumoFiscal.calcular(df_nfe)
+                if df_resumo is not None:
+                    extras.append((TABELA_RESUMO, df_resumo, CAMPOS_RESUMO))
+
+            if auditoria:
+                with medir("auditoria de impostos (vetorizada)"):
+                    df_auditoria = AuditoriaFiscal.calcular(df_nfe)
+                if df_auditoria is not None:
+                    divergentes = int((df_auditoria["Status"] != "OK").sum())
+                    callback_log(f"Auditoria de impostos: {divergentes} itens com divergência.")
+                    instr.info["auditoria_divergencias"] = divergentes
+                    extras.append((TABELA_AUDITORIA, df_auditoria, CAMPOS_AUDITORIA))
+
+            if rateio_frete == "nenhum": return extras
+            with medir("rateio de frete (junção CTe x NFe)"):
+                df_rateio = RateioFrete.calcular(df_nfe, df_cte, rateio_frete, set(eventos.situacoes()))
+            if df_rateio is not None:
+                ausentes = df_rateio.loc[df_rateio["Status Rateio"] == NFE_AUSENTE, "Chave NFe"].nunique()
+                callback_log(f"Rateio de frete: {df_rateio['Chave CTe'].nunique()} CTes, {len(df_rateio)} linhas"
+                             + (f" ({ausentes} NFes vinculadas fora do lote)" if ausentes else ""))
+                instr.info["rateio_frete"] = {"linhas": len(df_rateio), "nfes_fora_do_lote": int(ausentes)}
+                extras.append((TABELA_RATEIO, df_rateio, CAMPOS_RATEIO))
+            return extras
+
+        # Saída CSV: grava conforme os arquivos terminam, sem acumular o lote
+        escritor = EscritorCSV(saida, formato, normalizada=normalizada) if formato in EscritorCSV.EXTENSOES else None
+        gravadas = set()
+        duplicatas_gravadas = []
+
+        # 3. CACHE: arquivos inalterados não são lidos de novo
+        cache = None
+        if usar_cache:
+            try:
+                cache = CacheExtracao(
+                    os.path.join(config.PASTA_CACHE, "extracao.sqlite"),
+                    ExtratorFiscal.VERSAO, config.CACHE_LIMITE_MB
+                )
+            except Exception as e:
+                SistemaLog.registrar_erro("Cache de extração indisponível", e)
         
-        # 4. EXPORTAÇÃO
+        # 4. PROCESSAMENTO PARALELO (despacho conforme a varredura encontra os arquivos)
+        # Pipeline: varredura -> pré-leitura da chave e leitura dos bytes (threads de I/O)
+        # -> parse + extração (workers). Sem threads de leitura, cada worker lê o seu arquivo.
+        n_workers = max_workers or os.cpu_count() or 1
+        if backend == "processos":
+            executor = ProcessPoolExecutor(max_workers=max_workers)
+        else:
+            executor = ThreadPoolExecutor(max_workers=max_workers)
+        leitor = None
+        if config.LEITURA_THREADS > 0:
+            leitor = ThreadPoolExecutor(max_workers=config.LEITURA_THREADS, thread_name_prefix="leitura")
+        instr.info["threads_leitura"] = config.LEITURA_THREADS
+        # Limita as tarefas em andamento: a memória não cresce com o tamanho da pasta
+        limite_em_voo = n_workers * 4
+        tam_lote = config.TAMANHO_LOTE_PROCESSOS if backend == "processos" else 1
+        janela_leitura = max(config.LEITURA_EM_VOO, tam_lote) if leitor else tam_lote
+
+        try:
+            with executor:
+                em_voo = {}          # futuro -> ("leitura" | "extração", fonte)
+                prontos = deque()    # (fonte, conteudo) aguardando um worker
+                lendo = 0
+                extraindo = 0
+
+                def verificar_cancelamento():
+                    if cancelamento is not None and cancelamento.is_set():
+                        for futuro in em_voo: futuro.cancel()
+                        raise ProcessamentoCancelado("Processamento cancelado pelo usuário.")
+
+                def alimentar(final):
+                    """Envia os arquivos prontos aos workers (lotes completos, salvo se 'final')."""
+                    nonlocal extraindo
+                    while prontos and extraindo < limite_em_voo:
+                        if backend == "processos":
+                            if len(prontos) < tam_lote and not final: break
+                            itens = [prontos.popleft() for _ in range(min(tam_lote, len(prontos)))]
+                            futuro = executor.submit(ProcessadorFiscal._processar_lote, itens, config.NS_MAP,
+                                                     perfil is not None, cache is not None)
+                            em_voo[futuro] = ("extração", None)
+                        else:
+                            fonte, conteudo = prontos.popleft()
+                            futuro = executor.submit(ProcessadorFiscal._tarefa_medida, fonte, config.NS_MAP,
+                                                     perfil is not None, conteudo, cache is not None)
+                            em_voo[futuro] = ("extração", fonte)
+                        extraindo += 1
+
+                def colher():
+                    nonlocal lendo, extraindo
+                    verificar_cancelamento()
+                    # Nada em andamento: o lote incompleto segue assim mesmo
+                    if not em_voo: alimentar(True)
+                    # Timeout curto: um arquivo lento não atrasa o cancelamento
+                    with medir("espera pelos workers"):
+                        feitos, _ = wait(list(em_voo), timeout=0.5, return_when=FIRST_COMPLETED)
+                    for futuro in feitos:
+                        etapa, fonte = em_voo.pop(futuro)
+                        if etapa == "leitura":
+                            lendo -= 1
+                            conteudo, hash_conteudo, parede, cpu = futuro.result()
+                            instr.somar("leitura antecipada (threads de leitura)", parede, cpu)
+                            if hash_conteudo is not None:
+                                # Mesmo conteúdo com outro nome/data: o hash veio da thread de leitura
+                                with medir("cache (consulta por hash)"):
+                                    dados = cache.obter_por_hash(fonte, hash_conteudo)
+                                if dados is not None:
+                                    receber(fonte, False, *dados)
+                                    registrar(1)
+                                    continue
+                            prontos.append((fonte, conteudo))
+                            continue
+
+                        extraindo -= 1
+                        if backend == "processos":
+                            pacote = futuro.result()
+                            itens = ProcessadorFiscal._expandir_lote(pacote)
+                            perfil_tarefa = pacote[3]
+                        else:
+                            ok, nfe, cte, medidas, perfil_tarefa, dados = futuro.result()
+                            itens = [(fonte, ok, nfe, cte, medidas, dados)]
+                        if perfil is not None: perfil.acumular(perfil_tarefa)
+                        for fonte_item, ok, nfe, cte, medidas, dados in itens:
+                            instr.registrar_tarefa(fonte_item.nome, medidas)
+                            receber(fonte_item, ok, nfe, cte, dados)
+                        registrar(len(itens))
+                    alimentar(not varrendo and not lendo)
+
+                def despachar(fonte):
+                    nonlocal lendo
+                    if leitor is not None:
+                        em_voo[leitor.submit(ProcessadorFiscal._ler_antecipado, fonte, cache is not None)] = ("leitura", fonte)
+                        lendo += 1
+                    else:
+                        prontos.append((fonte, None))
+                    alimentar(False)
+                    while lendo + len(prontos) >= janela_leitura or extraindo >= limite_em_voo: colher()
+
+                fontes = (
+                    f for entrada in entradas for f in VarredorFontes.varrer(entrada, recursivo, incluir, excluir)
+                )
+                com_chave = indice.politica != "nenhuma"
+                if leitor is not None:
+                    # A pré-leitura (tipo do documento e chave) também sai da thread principal
+                    pares = VarredorFontes.antecipar(
+                        fontes, lambda f: ProcessadorFiscal._pre_ler(f, com_chave, eventos.ativo), leitor,
+                        config.LEITURA_EM_VOO
+                    )
+                    nome_etapa = "varredura + pré-leitura (espera)"
+                else:
+                    pares = ((f, None) for f in fontes)
+                    nome_etapa = "varredura (listagem)"
+
+                for fonte, pre in instr.cronometrar_iterador(nome_etapa, pares):
+                    verificar_cancelamento()
+                    encontrados += 1
+                    if pre is None:
+                        with medir("pré-leitura (tipo e chave)"):
+                            pre = ProcessadorFiscal._pre_ler(fonte, com_chave, eventos.ativo)
+                    (tipo_doc, raiz, versao), info_chave, evento = pre
+
+                    # Eventos, NFSe e outros XMLs da pasta não passam pelo parse
+                    if tipo_doc in ("evento", "outro"):
+                        if evento is not None: eventos.registrar(fonte, evento)
+                        ignorados[raiz] += 1
+                        registrar(1)
+                        continue
+                    if tipo_doc: documentos[f"{tipo_doc} {versao}".strip()] += 1
+
+                    # Duplicatas (mesma chave de acesso) saem antes da extração completa
+                    with medir("duplicados"):
+                        manter, substituida = indice.avaliar(fonte, info_chave)
+                    if substituida is not None:
+                        descartadas.add(substituida)
+                        tabela_nfe.remover(substituida)
+                        tabela_cte.remover(substituida)
+                        # No CSV não dá para retirar linhas já gravadas: apenas avisa
+                        if substituida in gravadas: duplicatas_gravadas.append(substituida)
+                    if not manter:
+                        registrar(1)
+                        continue
+
+                    dados = None
+                    if cache:
+                        # Só caminho + tamanho + mtime: o hash do conteúdo sai das threads de leitura
+                        with medir("cache (consulta)"): dados = cache.obter(fonte)
+                    if dados is not None:
+                        receber(fonte, False, *dados)
+                        registrar(1)
+                        continue
+
+                    despachar(fonte)
+
+                varrendo = False
+                alimentar(not lendo)
+                callback_log(f"Varredura concluída: {encontrados} arquivos encontrados.")
+                instr.info["arquivos"] = encontrados
+                if documentos:
+                    callback_log("Documentos: " + ", ".join(f"{k}: {n}" for k, n in sorted(documentos.items())))
+                if ignorados:
+                    callback_log(f"{sum(ignorados.values())} arquivos ignorados (não são NFe/CTe): "
+                                 + ", ".join(f"{raiz}: {n}" for raiz, n in ignorados.most_common()))
+                instr.info["documentos"] = dict(documentos)
+                instr.info["ignorados"] = dict(ignorados)
+                if eventos.ativo:
+                    callback_log(f"Eventos lidos: {eventos.eventos} ({eventos.canceladas} chaves com cancelamento"
+                                 + (f", {eventos.rejeitados} cancelamentos rejeitados pela SEFAZ)" if eventos.rejeitados else ")"))
+                    instr.info["canceladas"] = eventos.canceladas
+                registrar(0)
+
+                while em_voo or prontos: colher()
+                if cache:
+                    callback_log(f"{cache.acertos} arquivos reaproveitados do cache.")
+                    instr.info["arquivos_do_cache"] = cache.acertos
+        finally:
+            if leitor is not None: leitor.shutdown(wait=True, cancel_futures=True)
+            if cache: cache.fechar()
+            # Em caso de falha, preserva no CSV tudo o que já foi extraído
+            if escritor:
+                with medir("csv (gravação)"): arquivos_csv = escritor.fechar()
+
+        if cancelamento is not None and cancelamento.is_set():
+            raise ProcessamentoCancelado("Processamento cancelado pelo usuário.")
+
+        duplicados = indice.duplicados
+        if duplicados:
+            n_desc = sum(len(d[3]) for d in duplicados)
+            callback_log(f"{n_desc} arquivos duplicados ignorados ({len(duplicados)} chaves, política: {politica_duplicados}):")
+            for tipo, chave, mantido, perdedores in duplicados[:20]:
+                nomes = ", ".join(p.nome for p in perdedores)
+                callback_log(f"  {tipo} {chave}: mantido {mantido.nome} | ignorado(s): {nomes}")
+            if len(duplicados) > 20:
+                callback_log(f"  ... e mais {len(duplicados) - 20} chaves duplicadas.")
+
+        if escritor:
+            if duplicatas_gravadas:
+                callback_log(f"Atenção: {len(duplicatas_gravadas)} arquivos já gravados no CSV foram depois substituídos por duplicatas preferidas:")
+                for fonte in duplicatas_gravadas[:20]: callback_log(f"  {fonte.nome}")
+            if not arquivos_csv:
+                callback_log("Sem dados XML encontrados: nenhum arquivo gerado.")
+                return saida
+            instr.info["linhas"] = escritor.linhas_gravadas
+            callback_log(f"{escritor.linhas_gravadas} linhas gravadas em CSV:")
+            for arq in arquivos_csv: callback_log(f"  -> {arq}")
+            # As linhas já foram gravadas: a situação vai num arquivo à parte, para cruzar pela chave
+            if eventos.canceladas and eventos.gravar(f"{escritor.base}_eventos.csv"):
+                callback_log(f"  -> {escritor.base}_eventos.csv ({eventos.canceladas} chaves canceladas)")
+            # Tabelas derivadas a partir das colunas guardadas durante o fluxo
+            if colunas_derivadas:
+                df_nfe, df_cte = dataframes()
+                if eventos.ativo:
+                    df_nfe, _ = eventos.aplicar(df_nfe)
+                    df_cte, _ = eventos.aplicar(df_cte)
+                for nome, df, campos in tabelas_derivadas(df_nfe, df_cte):
+                    with medir("csv (gravação)"): callback_log(f"  -> {escritor.gravar_tabela(nome, df, campos)}")
+            return arquivos_csv[0]
+
+        # 5. EXPORTAÇÃO
+        df_nfe, df_cte = dataframes()
+
+        # Situação pelos eventos de cancelamento: junção por hash na chave de acesso
+        if eventos.ativo:
+            with medir("eventos (junção por chave)"):
+                df_nfe, n_nfe = eventos.aplicar(df_nfe)
+                df_cte, n_cte = eventos.aplicar(df_cte)
+            if n_nfe or n_cte:
+                acao = "removidas" if eventos.modo == "excluir" else "marcadas"
+                callback_log(f"Notas canceladas {acao}: {n_nfe} linhas NFe, {n_cte} linhas CTe.")
+        instr.info["linhas"] = {"NFe": len(df_nfe), "CTe": len(df_cte)}
+        extras = tabelas_derivadas(df_nfe, df_cte)
+
+        if formato in ExportadorColunar.FORMATOS:
+            callback_log(f"Gerando arquivos {formato.upper()}...")
+            try:
+                with medir(f"exportação {formato}"):
+                    arquivos = ExportadorColunar.exportar(saida, df_nfe, df_cte, formato, extras, normalizada)
+            except Exception as e:
+                raise Exception(f"Erro ao gerar a exportação {formato}: {e}")
+            if not arquivos:
+                callback_log("Sem dados XML encontrados: nenhum arquivo gerado.")
+                return saida
+            for arq in arquivos: callback_log(f"  -> {arq}")
+            return arquivos[0]
+
         callback_log("Gerando arquivo Excel...")
+        # O resumo ocupa a primeira aba (a antiga conciliação); as demais derivadas vão ao final
+        df_resumo = next((df for nome, df, _ in extras if nome == TABELA_RESUMO), None)
+        extras = [t for t in extras if t[0] != TABELA_RESUMO]
         
         while True:
             try:
-                # Passamos None para a conciliação
-                ExcelReportWriter.gerar_relatorio(
-                    saida,
-                    None, # df_concilia é None
-                    pd.DataFrame(lista_nfe),
-                    pd.DataFrame(lista_cte)
-                )
+                # O resumo vai no lugar da conciliação (None: aba não é criada)
+                with medir("excel"):
+                    gerados = ExcelReportWriter.gerar_relatorio(
+                        saida,
+                        df_resumo,
+                        df_nfe,
+                        df_cte,
+                        instrumentacao=instr,
+                        extras=extras,
+                        titulo_resumo=TABELA_RESUMO,
+                        normalizada=normalizada
+                    )
                 break 
             
             except PermissionError:
@@ -251,5 +705,9 @@ class ProcessadorFiscal:
             except Exception as e:
                 SistemaLog.registrar_erro("Erro ao salvar Excel final", e)
                 raise Exception(f"Erro ao gerar o relatório Excel: {e}")
+
+        if len(gerados) > 1:
+            callback_log("Dados acima do limite de linhas do Excel: relatório dividido em partes.")
+            for arq in gerados: callback_log(f"  -> {arq}")
         
         return saida
@@ -0,0 +1,121 @@
+# Arquivo: core/rateio_frete.py
+import numpy as np
+import pandas as pd
+
+from core.esquema import CAMPOS_RATEIO
+
+# Colunas de entrada (nomes das tabelas NFe/CTe do esquema)
+COLUNAS_NFE = ("Chave de Acesso", "Numero NF", "Fornecedor/Emitente", "Item", "Cod", "Produto",
+               "Valor Total", "Valor Total Nota")
+COLUNAS_CTE = ("Chave de Acesso", "Numero CTe", "Emitente (Transportadora)", "CNPJ Emitente",
+               "Valor Total Frete", "NFes Vinculadas")
+
+NOME_TABELA = "Rateio Frete"
+RATEADO = "OK"
+NFE_AUSENTE = "SÓ NO CTe"
+NFE_CANCELADA = "NFe CANCELADA"
+
+
+class RateioFrete:
+    """
+    Rateio do frete de cada CTe entre as NFes vinculadas (infDoc/infNFe) e seus itens,
+    por junção de hash entre as chaves de acesso (sem laço por linha):
+    1. a lista "NFes Vinculadas" de cada CTe vira uma linha por (CTe, NFe);
+    2. o frete vai para as notas encontradas no lote, na proporção do Valor Total Nota;
+    3. dentro da nota, para os itens, na proporção do Valor Total do item.
+    Com base zero (ou base "igual"), a divisão é em partes iguais. Os centavos que
+    sobram do arredondamento ficam no maior item de cada CTe, então o frete rateado
+    soma exatamente o Valor Total Frete. Chaves sem NFe no lote saem com status
+    "SÓ NO CTe" e NFes canceladas com "NFe CANCELADA", ambas sem valor e fora da base.
+    """
+
+    BASES = ("valor", "igual", "nenhum")
+
+    @staticmethod
+    def _chave(serie):
+        return serie.astype("string").str.lstrip("'")
+
+    @staticmethod
+    def _proporcao(peso, grupo):
+        """Participação de cada linha no seu grupo; grupos com soma zero dividem em partes iguais."""
+        total = peso.groupby(grupo, sort=False).transform("sum")
+        partes = peso.notna().groupby(grupo, sort=False).transform("sum")
+        return (peso / total).where(total > 0, 1.0 / partes)
+
+    @staticmethod
+    def vinculos(df_cte, ignorar=()):
+        """Uma linha por (CTe, chave de NFe vinculada); CTes em 'ignorar' (chaves) ficam de fora."""
+        if df_cte is None or df_cte.empty or "NFes Vinculadas" not in df_cte.columns:
+            return pd.DataFrame(columns=["Chave CTe", "Chave NFe"])
+
+        cte = df_cte.loc[:, list(COLUNAS_CTE)]
+        cte["Chave CTe"] = RateioFrete._chave(cte.pop("Chave de Acesso"))
+        if ignorar: cte = cte[~cte["Chave CTe"].isin(ignorar)]
+        # O mesmo CTe repetido no lote (duplicados mantidos) rateia uma vez só
+        cte = cte.drop_duplicates("Chave CTe")
+
+        cte["Chave NFe"] = cte.pop("NFes Vinculadas").astype(object).fillna("").astype(str).str.split(";")
+        vinc = cte.explode("Chave NFe", ignore_index=True)
+        vinc["Chave NFe"] = vinc["Chave NFe"].str.strip()
+        vinc = vinc[vinc["Chave NFe"].str.len() > 0]
+        return vinc.drop_duplicates(["Chave CTe", "Chave NFe"], ignore_index=True)
+
+    @staticmethod
+    def calcular(df_nfe, df_cte, base="valor", ignorar=()):
+        """
+        Retorna o DataFrame do rateio (colunas de CAMPOS_RATEIO) ou None se nenhum CTe
+        do lote tiver NFes vinculadas. ignorar: chaves canceladas; CTes nelas ficam fora
+        do rateio e NFes nelas não recebem frete.
+        """
+        if base not in RateioFrete.BASES:
+            raise Exception(f"Base de rateio de frete inválida: {base}")
+        if base == "nenhum": return None
+
+        vinc = RateioFrete.vinculos(df_cte, ignorar)
+        if vinc.empty: return None
+        vinc["Valor Total Frete"] = pd.to_numeric(vinc["Valor Total Frete"], errors="coerce").fillna(0.0).astype(np.float64)
+
+        # Índice das notas do lote pela chave (uma linha por item)
+        if df_nfe is not None and not df_nfe.empty:
+            itens = df_nfe.loc[:, list(COLUNAS_NFE)]
+            itens["Chave NFe"] = RateioFrete._chave(itens.pop("Chave de Acesso"))
+            # float64: as colunas podem vir em float32 (ver TabelaColunar) e as proporções não
+            for col in ("Valor Total", "Valor Total Nota"):
+                itens[col] = pd.to_numeric(itens[col], errors="coerce").fillna(0.0).astype(np.float64)
+        else:
+            itens = pd.DataFrame(columns=list(COLUNAS_NFE[1:]) + ["Chave NFe"])
+        if ignorar: itens = itens[~itens["Chave NFe"].isin(ignorar)]
+        notas = itens.drop_duplicates("Chave NFe")[["Chave NFe", "Valor Total Nota"]]
+
+        # 1-2. Frete por nota: só as notas encontradas entram na base
+        vinc = vinc.merge(notas, on="Chave NFe", how="left", sort=False)
+        achada = vinc["Valor Total Nota"].notna().to_numpy()
+        peso = vinc["Valor Total Nota"] if base == "valor" else pd.Series(1.0, index=vinc.index)
+        peso = peso.where(achada)
+        vinc["% Rateio Nota"] = RateioFrete._proporcao(peso, vinc["Chave CTe"]).where(achada)
+        vinc["Frete Nota"] = vinc["Valor Total Frete"] * vinc["% Rateio Nota"]
+
+        # 3. Frete por item da nota
+        peso = itens["Valor Total"] if base == "valor" else pd.Series(1.0, index=itens.index)
+        itens["% Rateio Item"] = RateioFrete._proporcao(peso, itens["Chave NFe"])
+        rateio = vinc.drop(columns="Valor Total Nota").merge(itens, on="Chave NFe", how="left", sort=False)
+        frete = (rateio["Frete Nota"] * rateio["% Rateio Item"]).round(2)
+
+        # Sobra dos centavos no maior item de cada CTe
+        achada = rateio["Frete Nota"].notna().to_numpy()
+        if achada.any():
+            por_cte = rateio.loc[achada, "Chave CTe"]
+            sobra = (rateio.loc[achada, "Valor Total Frete"].groupby(por_cte, sort=False).first()
+                     - frete[achada].groupby(por_cte, sort=False).sum()).round(2)
+            maior = frete[achada].groupby(por_cte, sort=False).idxmax()
+            frete.loc[maior.to_numpy()] += sobra.reindex(maior.index).to_numpy()
+        rateio["Frete Rateado"] = frete.round(2).where(achada)
+        cancelada = rateio["Chave NFe"].isin(ignorar).to_numpy() if ignorar else False
+        rateio["Status Rateio"] = np.where(achada, RATEADO, np.where(cancelada, NFE_CANCELADA, NFE_AUSENTE))
+
+        for col in ("Chave CTe", "Chave NFe"):
+            rateio[col] = ("'" + rateio[col]).astype(object)
+        rateio = rateio.rename(columns={"Emitente (Transportadora)": "Transportadora",
+                                        "CNPJ Emitente": "CNPJ Transportadora"})
+        return rateio[[c.coluna for c in CAMPOS_RATEIO]].reset_index(drop=True)
+
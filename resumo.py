@@ -0,0 +1,110 @@
+# Arquivo: core/resumo.py
+import numpy as np
+import pandas as pd
+
+from core.esquema import CAMPOS_RESUMO
+import config
+
+# Agrupamento -> coluna da tabela NFe usada como chave
+AGRUPAMENTOS = {
+    "CFOP": "CFOP",
+    "NCM": "NCM",
+    "CNPJ Emitente": "CNPJ",
+    "UF Emitente": "UF Emit.",
+    "UF Destinatário": "UF Destinatario",
+    "Mês": "Data Emissão",
+}
+
+# Totais somados em cada grupo (colunas da tabela NFe)
+TOTAIS = ("Valor Total", "Valor ICMS", "Valor ICMS ST", "Valor Pis", "Valor Cofins", "Valor IPI",
+          "Valor CBS", "Valor IBS")
+
+# Colunas da tabela NFe que o resumo lê
+COLUNAS_NFE = tuple(dict.fromkeys(
+    ("Chave de Acesso", "Fornecedor/Emitente") + tuple(AGRUPAMENTOS.values()) + TOTAIS
+))
+
+NOME_TABELA = "Resumo"
+
+
+class ResumoFiscal:
+    """
+    Totais dos itens NFe por CFOP, NCM, CNPJ do emitente, UF e mês de emissão, numa
+    tabela só (coluna "Agrupamento" para filtrar), para não depender de tabela dinâmica
+    do Excel sobre a aba detalhada. Cada chave vira categoria e a soma é feita sobre
+    os códigos inteiros (np.bincount), sem comparar textos item a item; o mês é
+    calculado uma vez por data distinta. Notas marcadas como canceladas ficam de fora.
+    """
+
+    @staticmethod
+    def _categorias(serie):
+        """(códigos, valores) da coluna como categoria; vazios/nulos viram a categoria ""."""
+        if not isinstance(serie.dtype, pd.CategoricalDtype):
+            serie = serie.astype("category")
+        codigos = serie.cat.codes.to_numpy()
+        valores = serie.cat.categories.astype(str).to_numpy(dtype=object)
+        if (codigos < 0).any():
+            codigos = np.where(codigos < 0, len(valores), codigos)
+            valores = np.append(valores, "")
+        return codigos, valores
+
+    @staticmethod
+    def _mes(codigos, datas):
+        """Datas 'dd/mm/aaaa' (já em categoria) -> categoria 'aaaa-mm'; sem data -> ""."""
+        datas = pd.Index(datas, dtype=object).str
+        meses = (datas[6:10] + "-" + datas[3:5]).where(datas.len() >= 10, "")
+        recodificar, valores = pd.factorize(meses)
+        return recodificar[codigos], valores.to_numpy(dtype=object)
+
+    @staticmethod
+    def calcular(df_nfe, agrupamentos=None):
+        """
+        Retorna o DataFrame do resumo (colunas de CAMPOS_RESUMO) ou None sem NFe.
+        agrupamentos: nomes de AGRUPAMENTOS (padrão: config.RESUMO_AGRUPAMENTOS).
+        """
+        if df_nfe is None or df_nfe.empty: return None
+        if agrupamentos is None: agrupamentos = config.RESUMO_AGRUPAMENTOS
+        for nome in agrupamentos:
+            if nome not in AGRUPAMENTOS:
+                raise Exception(f"Agrupamento de resumo inválido: {nome}")
+        if not agrupamentos: return None
+
+        if "Situação" in df_nfe.columns:
+            df_nfe = df_nfe[df_nfe["Situação"].fillna("").astype(str) == ""]
+            if df_nfe.empty: return None
+
+        totais = {col: pd.to_numeric(df_nfe[col], errors="coerce").fillna(0.0).to_numpy(dtype=np.float64)
+                  for col in TOTAIS if col in df_nfe.columns}
+        notas, _ = pd.factorize(df_nfe["Chave de Acesso"])
+        n_notas = int(notas.max()) + 1
+
+        partes = []
+        for nome in agrupamentos:
+            coluna = AGRUPAMENTOS[nome]
+            if coluna not in df_nfe.columns: continue
+            codigos, valores = ResumoFiscal._categorias(df_nfe[coluna])
+            if nome == "Mês":
+                codigos, valores = ResumoFiscal._mes(codigos, valores)
+            n = len(valores)
+
+            parte = pd.DataFrame({"Agrupamento": nome, "Código": valores})
+            parte["Itens"] = np.bincount(codigos, minlength=n)
+            # Notas distintas por grupo: pares (grupo, nota) únicos
+            pares = pd.unique(codigos.astype(np.int64) * n_notas + notas)
+            parte["Notas"] = np.bincount(pares // n_notas, minlength=n)
+            for col in TOTAIS:
+                soma = np.bincount(codigos, weights=totais[col], minlength=n) if col in totais else np.zeros(n)
+                parte[col] = soma.round(2)
+            if nome == "CNPJ Emitente" and "Fornecedor/Emitente" in df_nfe.columns:
+                # Nome do emitente: o do primeiro item de cada CNPJ
+                _, primeiro = np.unique(codigos, return_index=True)
+                parte.loc[codigos[primeiro], "Descrição"] = df_nfe["Fornecedor/Emitente"].to_numpy(dtype=object)[primeiro]
+            parte = parte[parte["Itens"] > 0]
+
+            # Mês em ordem cronológica; os demais do maior valor para o menor
+            ordem = "Código" if nome == "Mês" else "Valor Total"
+            partes.append(parte.sort_values(ordem, ascending=nome == "Mês", kind="stable"))
+
+        if not partes: return None
+        resumo = pd.concat(partes, ignore_index=True)
+        return resumo.reindex(columns=[c.coluna for c in CAMPOS_RESUMO])
@@ -0,0 +1,70 @@
+# Arquivo: tests/amostras.py
+# XMLs mínimos de NFe, CTe e evento de cancelamento para os testes
+NFE = "http://www.portalfiscal.inf.br/nfe"
+CTE = "http://www.portalfiscal.inf.br/cte"
+
+
+def chave(prefixo, n):
+    """Chave de acesso de 44 dígitos."""
+    return f"{prefixo}{n:042d}"
+
+
+def nfe(ch, itens=(100.0,), proc=True, emissao="2025-02-03T10:00:00-03:00"):
+    dets = "".join(
+        f'<det nItem="{i}"><prod><cProd>P{i}</cProd><xProd>Produto {i}</xProd><NCM>84710000</NCM>'
+        f'<CFOP>5102</CFOP><uCom>UN</uCom><qCom>1</qCom><vUnCom>{valor:.2f}</vUnCom><vProd>{valor:.2f}</vProd></prod>'
+        f'<imposto><ICMS><ICMS00><orig>0</orig><CST>00</CST><vBC>{valor:.2f}</vBC><pICMS>18.00</pICMS>'
+        f'<vICMS>{valor * 0.18:.2f}</vICMS></ICMS00></ICMS></imposto></det>'
+        for i, valor in enumerate(itens, 1)
+    )
+    corpo = (
+        f'<NFe xmlns="{NFE}"><infNFe Id="NFe{ch}" versao="4.00">'
+        f'<ide><cUF>35</cUF><natOp>VENDA</natOp><mod>55</mod><serie>1</serie><nNF>{int(ch[-9:])}</nNF>'
+        f'<dhEmi>{emissao}</dhEmi><tpNF>1</tpNF></ide>'
+        f'<emit><CNPJ>12345678000190</CNPJ><xNome>Emitente</xNome><enderEmit><UF>SP</UF></enderEmit><CRT>3</CRT></emit>'
+        f'<dest><CNPJ>98765432000110</CNPJ><xNome>Destinatario</xNome><enderDest><UF>RJ</UF></enderDest></dest>'
+        f'{dets}<total><ICMSTot><vNF>{sum(itens):.2f}</vNF></ICMSTot></total></infNFe></NFe>'
+    )
+    if not proc: return f'<?xml version="1.0" encoding="UTF-8"?>{corpo}'
+    return (f'<?xml version="1.0" encoding="UTF-8"?><nfeProc xmlns="{NFE}" versao="4.00">{corpo}'
+            f'<protNFe versao="4.00"><infProt><chNFe>{ch}</chNFe><cStat>100</cStat></infProt></protNFe></nfeProc>')
+
+
+def cte(ch, nfes=(), frete=90.0):
+    docs = "".join(f"<infNFe><chave>{c}</chave></infNFe>" for c in nfes)
+    return (
+        f'<?xml version="1.0" encoding="UTF-8"?><cteProc xmlns="{CTE}" versao="4.00"><CTe><infCte Id="CTe{ch}" versao="4.00">'
+        f'<ide><CFOP>5353</CFOP><serie>1</serie><nCT>{int(ch[-9:])}</nCT><dhEmi>2025-02-03T08:00:00-03:00</dhEmi>'
+        f'<xMunIni>Curitiba</xMunIni><UFIni>PR</UFIni><xMunFim>Santos</xMunFim><UFFim>SP</UFFim><toma3><toma>0</toma></toma3></ide>'
+        f'<emit><CNPJ>55500000000100</CNPJ><xNome>Transportes</xNome><enderEmit><UF>PR</UF></enderEmit></emit>'
+        f'<rem><CNPJ>12345678000190</CNPJ><xNome>Emitente</xNome></rem>'
+        f'<vPrest><vTPrest>{frete:.2f}</vTPrest></vPrest>'
+        f'<infCTeNorm><infCarga><vCarga>1000</vCarga></infCarga><infDoc>{docs}</infDoc></infCTeNorm>'
+        f'</infCte></CTe></cteProc>'
+    )
+
+
+def cancelamento(ch, protocolo="135250000000001"):
+    return (
+        f'<?xml version="1.0" encoding="UTF-8"?><procEventoNFe xmlns="{NFE}" versao="1.00"><evento versao="1.00">'
+        f'<infEvento Id="ID110111{ch}01"><chNFe>{ch}</chNFe><dhEvento>2025-02-04T09:00:00-03:00</dhEvento>'
+        f'<tpEvento>110111</tpEvento></infEvento></evento>'
+        f'<retEvento versao="1.00"><infEvento><cStat>135</cStat><nProt>{protocolo}</nProt></infEvento></retEvento>'
+        f'</procEventoNFe>'
+    )
+
+
+def gravar(pasta, nome, conteudo):
+    caminho = pasta / nome
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    caminho.write_text(conteudo, encoding="utf-8")
+    return str(caminho)
+
+
+def executar(entrada, saida, **opcoes):
+    """Roda o processamento completo e retorna as mensagens de log."""
+    from core.processador import ProcessadorFiscal
+    log = []
+    ProcessadorFiscal.executar(entrada, saida, log.append, lambda valor, texto: None,
+                               relatorio_execucao=False, **opcoes)
+    return log
@@ -0,0 +1,7 @@
+# Arquivo: tests/conftest.py
+import os
+import sys
+
+# Mesmo arranjo do benchmark: o pacote 'core' (pasta pai) e o config.py importáveis
+RAIZ = os.path.join(os.path.dirname(__file__), '..')
+sys.path[:0] = [os.path.join(RAIZ, '..'), RAIZ]
@@ -0,0 +1,68 @@
+# Arquivo: tests/test_acumulador.py
+import numpy as np
+import pandas as pd
+
+from core.acumulador import TabelaColunar
+from core.esquema import CAMPOS_NFE
+
+
+def _linhas(chave, itens, emitente="Emitente"):
+    return [{"Chave de Acesso": f"'{chave}", "Fornecedor/Emitente": emitente, "Item": str(i),
+             "Produto": f"{chave} produto {i}", "Qtde": float(i), "Valor Total": valor}
+            for i, valor in enumerate(itens, 1)]
+
+
+def test_dataframe_com_tipos_compactos():
+    tabela = TabelaColunar(CAMPOS_NFE)
+    tabela.adicionar("a.xml", _linhas("1", [10.1, 20.2, 30.3]))
+    tabela.adicionar("b.xml", _linhas("2", [5.5, None]))
+
+    df = tabela.dataframe()
+
+    assert df["Item"].dtype == np.int32
+    assert df["Item"].tolist() == [1, 2, 3, 1, 2]
+    assert df["Qtde"].dtype == np.float32             # inteiros: float32 sem perda
+    assert df["Valor Total"].dtype == np.float64      # centavos não cabem em float32
+    assert df["Valor Total"].tolist()[:4] == [10.1, 20.2, 30.3, 5.5]
+    assert np.isnan(df["Valor Total"].iloc[4])
+    assert isinstance(df["Fornecedor/Emitente"].dtype, pd.CategoricalDtype)
+    assert df["Fornecedor/Emitente"].cat.categories.tolist() == ["Emitente"]
+    assert not isinstance(df["Produto"].dtype, pd.CategoricalDtype)   # sem repetição: coluna comum
+    assert tabela.linhas == 0                         # dataframe() esvazia a tabela
+
+
+def test_item_ausente_vira_nan():
+    tabela = TabelaColunar(CAMPOS_NFE)
+    linhas = _linhas("1", [1.0, 2.0])
+    linhas[1]["Item"] = None
+    tabela.adicionar("a.xml", linhas)
+
+    df = tabela.dataframe()
+
+    assert df["Item"].dtype == np.float64
+    assert df["Item"].iloc[0] == 1 and np.isnan(df["Item"].iloc[1])
+
+
+def test_remover_retira_as_linhas_da_fonte():
+    tabela = TabelaColunar(CAMPOS_NFE)
+    tabela.adicionar("a.xml", _linhas("1", [1.0, 2.0]))
+    tabela.adicionar("b.xml", _linhas("2", [3.0], emitente="Outro"))
+    tabela.adicionar("c.xml", _linhas("3", [4.0, 5.0]))
+    tabela.remover("b.xml")
+    tabela.remover("inexistente.xml")
+
+    df = tabela.dataframe()
+
+    assert df["Chave de Acesso"].tolist() == ["'1", "'1", "'3", "'3"]
+    assert df["Valor Total"].tolist() == [1.0, 2.0, 4.0, 5.0]
+    assert df["Item"].tolist() == [1, 2, 1, 2]
+
+
+def test_colunas_filtradas():
+    tabela = TabelaColunar(CAMPOS_NFE, colunas=("Chave de Acesso", "Valor Total", "Ausente"))
+    tabela.adicionar("a.xml", _linhas("1", [1.5]))
+
+    df = tabela.dataframe()
+
+    assert list(df.columns) == ["Chave de Acesso", "Valor Total", "Ausente"]
+    assert df["Ausente"].isna().all()
@@ -0,0 +1,59 @@
+# Arquivo: tests/test_auditoria.py
+import pandas as pd
+
+from core.auditoria import AuditoriaFiscal, OK
+
+
+def _nota(chave, itens, valor_nota, situacao=""):
+    return [{"Chave de Acesso": f"'{chave}", "Situação": situacao, "Numero NF": chave[-3:],
+             "Fornecedor/Emitente": "Fornecedor", "Item": i, "Produto": f"Produto {i}", "CST": "00",
+             "Valor Total": valor, "Valor Total Nota": valor_nota} for i, valor in enumerate(itens, 1)]
+
+
+def test_ignora_notas_canceladas():
+    ativa, cancelada = "35" + "1" * 42, "35" + "2" * 42
+    df_nfe = pd.DataFrame(_nota(ativa, [100.0], 100.0) + _nota(cancelada, [50.0], 999.0, "CANCELADA"))
+
+    auditoria = AuditoriaFiscal.calcular(df_nfe, somente_divergencias=False)
+
+    assert auditoria["Chave de Acesso"].tolist() == [f"'{ativa}"]
+    assert auditoria["Status"].tolist() == [OK]
+
+
+def test_nota_repetida_nao_soma_em_dobro():
+    chave = "35" + "3" * 42
+    # Política de duplicados "nenhuma": o mesmo documento aparece duas vezes no lote
+    df_nfe = pd.DataFrame(_nota(chave, [100.0, 200.0], 300.0) * 2)
+
+    auditoria = AuditoriaFiscal.calcular(df_nfe, somente_divergencias=False)
+
+    assert auditoria["Soma Itens"].tolist() == [300.0] * 4
+    assert auditoria["Status"].tolist() == [OK] * 4
+
+
+def test_total_com_ii_fcp_st_e_ipi_devolvido():
+    chave = "35" + "4" * 42
+    df_nfe = pd.DataFrame(_nota(chave, [100.0, 50.0], 187.0))
+    # Importação (II) no item 1; FCP-ST e IPI devolvido no item 2
+    df_nfe["Valor II"] = [20.0, 0.0]
+    df_nfe["Valor FCP ST"] = [0.0, 2.0]
+    df_nfe["IPI Devolvido"] = [0.0, 15.0]
+
+    auditoria = AuditoriaFiscal.calcular(df_nfe, somente_divergencias=False)
+
+    assert auditoria["Soma Itens"].tolist() == [187.0, 187.0]
+    assert auditoria["Status"].tolist() == [OK, OK]
+
+
+def test_icms_desonerado_deduzido_ou_nao():
+    deduz, nao_deduz, errada = "35" + "5" * 42, "35" + "6" * 42, "35" + "7" * 42
+    df_nfe = pd.DataFrame(_nota(deduz, [100.0, 100.0], 170.0) + _nota(nao_deduz, [100.0], 100.0)
+                          + _nota(errada, [100.0], 80.0))
+    df_nfe["ICMS Desonerado"] = [18.0, 12.0, 18.0, 18.0]
+
+    auditoria = AuditoriaFiscal.calcular(df_nfe, somente_divergencias=False)
+
+    assert auditoria["Soma Itens"].tolist() == [170.0, 170.0, 100.0, 82.0]
+    assert auditoria["Status"].tolist()[:3] == [OK] * 3
+    assert auditoria["Status"].iloc[3] != OK
+    assert auditoria["Dif. Total Nota"].iloc[3] == -2.0
@@ -0,0 +1,101 @@
+# Arquivo: tests/test_cache_extracao.py
+import hashlib
+import os
+import shutil
+import zipfile
+
+import pandas as pd
+import pytest
+
+import config
+from core.cache_extracao import CacheExtracao
+from core.fontes import FonteXML
+import amostras
+
+
+@pytest.fixture
+def pasta_cache(tmp_path, monkeypatch):
+    pasta = tmp_path / "cache"
+    monkeypatch.setattr(config, "PASTA_CACHE", str(pasta))
+    return pasta
+
+
+def _lote(pasta):
+    amostras.gravar(pasta, "a.xml", amostras.nfe(amostras.chave(35, 1), [100.0, 50.0]))
+    amostras.gravar(pasta, "b.xml", amostras.nfe(amostras.chave(35, 2), [70.0]))
+    return str(pasta)
+
+
+def _nfe(caminho):
+    # As linhas saem na ordem em que os arquivos terminam
+    return pd.read_csv(caminho, sep=";").sort_values(["Chave de Acesso", "Item"], ignore_index=True)
+
+
+def _reaproveitados(log):
+    return [m for m in log if "reaproveitados do cache" in m]
+
+
+def test_arquivos_inalterados_vem_do_cache(tmp_path, pasta_cache):
+    entrada = _lote(tmp_path / "xml")
+    amostras.executar(entrada, str(tmp_path / "r1.csv"), usar_cache=True)
+    log = amostras.executar(entrada, str(tmp_path / "r2.csv"), usar_cache=True)
+
+    assert _reaproveitados(log) == ["2 arquivos reaproveitados do cache."]
+    assert _nfe(tmp_path / "r2_NFe.csv").equals(_nfe(tmp_path / "r1_NFe.csv"))
+
+
+def test_copia_reaproveitada_pelo_hash(tmp_path, pasta_cache):
+    entrada = _lote(tmp_path / "xml")
+    amostras.executar(entrada, str(tmp_path / "r1.csv"), usar_cache=True)
+    # Outro caminho (e outra data): só o hash do conteúdo encontra a extração
+    copia = shutil.copytree(entrada, tmp_path / "copia", copy_function=shutil.copyfile)
+    log = amostras.executar(str(copia), str(tmp_path / "r2.csv"), usar_cache=True)
+
+    assert _reaproveitados(log) == ["2 arquivos reaproveitados do cache."]
+
+
+def test_arquivo_alterado_e_extraido_de_novo(tmp_path, pasta_cache):
+    entrada = _lote(tmp_path / "xml")
+    amostras.executar(entrada, str(tmp_path / "r1.csv"), usar_cache=True)
+    amostras.gravar(tmp_path / "xml", "b.xml", amostras.nfe(amostras.chave(35, 2), [70.0, 30.0]))
+    log = amostras.executar(entrada, str(tmp_path / "r2.csv"), usar_cache=True)
+
+    assert _reaproveitados(log) == ["1 arquivos reaproveitados do cache."]
+    assert len(_nfe(tmp_path / "r2_NFe.csv")) == 4
+
+
+def test_versao_do_extrator_invalida_o_cache(tmp_path):
+    fonte = FonteXML(amostras.gravar(tmp_path, "a.xml", amostras.nfe(amostras.chave(35, 1))))
+    db = str(tmp_path / "cache.sqlite")
+    linhas = ([{"Chave de Acesso": "'1"}], [])
+
+    cache = CacheExtracao(db, "1")
+    cache.guardar(fonte, CacheExtracao.serializar(*linhas))
+    cache.fechar()
+
+    cache = CacheExtracao(db, "1")
+    assert cache.obter(fonte) == linhas
+    cache.fechar()
+
+    cache = CacheExtracao(db, "2")
+    assert cache.obter(fonte) is None
+    cache.fechar()
+
+
+def test_hash_de_membro_zip_vem_do_conteudo(tmp_path):
+    # Mesmo tamanho, conteúdos diferentes: o hash não pode depender só de CRC/tamanho
+    xml_a = amostras.nfe(amostras.chave(35, 1)).encode()
+    xml_b = amostras.nfe(amostras.chave(35, 2)).encode()
+    assert len(xml_a) == len(xml_b)
+    pacote = tmp_path / "lote.zip"
+    with zipfile.ZipFile(pacote, "w") as zf:
+        zf.writestr("a.xml", xml_a)
+        zf.writestr("b.xml", xml_b)
+
+    membro_a, membro_b = FonteXML(str(pacote), "a.xml"), FonteXML(str(pacote), "b.xml")
+    esperado = hashlib.blake2b(xml_a, digest_size=16).hexdigest()
+    assert membro_a.hash_conteudo() == esperado
+    assert membro_a.hash_conteudo(membro_a.ler()) == esperado
+    assert membro_b.hash_conteudo() != esperado
+    solto = FonteXML(amostras.gravar(tmp_path, "a.xml", xml_a.decode()))
+    assert solto.hash_conteudo() == esperado
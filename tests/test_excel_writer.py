@@ -0,0 +1,59 @@
+# Arquivo: tests/test_excel_writer.py
+import os
+
+import pandas as pd
+import pytest
+
+from core.excel_writer import ExcelReportWriter
+
+
+def _tabelas():
+    nfe = pd.DataFrame({"Chave de Acesso": [f"'35{i:042d}" for i in range(5)], "Valor Total": [1.0, 2.0, 3.0, 4.0, 5.0]})
+    cte = pd.DataFrame({"Chave de Acesso": ["'41" + "0" * 42], "Valor Total Frete": [90.0]})
+    return nfe, cte
+
+
+def _indice(caminho):
+    return pd.read_csv(caminho, sep=";", encoding="utf-8-sig").values.tolist()
+
+
+@pytest.mark.parametrize("modo", ["streaming", "pandas"])
+def test_tabela_dividida_em_abas(tmp_path, modo):
+    nfe, cte = _tabelas()
+    saida = str(tmp_path / "r.xlsx")
+
+    gerados = ExcelReportWriter.gerar_relatorio(saida, None, nfe, cte, modo=modo, linhas_por_aba=2, divisao="abas")
+
+    assert gerados == [saida, str(tmp_path / "r_indice.csv")]
+    abas = pd.read_excel(saida, sheet_name=None)
+    assert list(abas) == ["NFe - Detalhado (1)", "NFe - Detalhado (2)", "NFe - Detalhado (3)", "CTe - Detalhado"]
+    assert pd.concat([abas[f"NFe - Detalhado ({p})"] for p in (1, 2, 3)])["Valor Total"].tolist() == [1, 2, 3, 4, 5]
+    assert _indice(gerados[1]) == [
+        ["NFe - Detalhado", 1, "r.xlsx", "NFe - Detalhado (1)", 1, 2],
+        ["NFe - Detalhado", 2, "r.xlsx", "NFe - Detalhado (2)", 3, 4],
+        ["NFe - Detalhado", 3, "r.xlsx", "NFe - Detalhado (3)", 5, 5],
+        ["CTe - Detalhado", 1, "r.xlsx", "CTe - Detalhado", 1, 1],
+    ]
+
+
+def test_tabela_dividida_em_arquivos(tmp_path):
+    nfe, cte = _tabelas()
+    saida = str(tmp_path / "r.xlsx")
+
+    gerados = ExcelReportWriter.gerar_relatorio(saida, None, nfe, cte, linhas_por_aba=3, divisao="arquivos")
+
+    parte2 = str(tmp_path / "r_NFe_Detalhado_parte2.xlsx")
+    assert gerados == [saida, parte2, str(tmp_path / "r_indice.csv")]
+    # A primeira parte e as tabelas pequenas ficam no arquivo principal
+    assert list(pd.read_excel(saida, sheet_name=None)) == ["NFe - Detalhado (1)", "CTe - Detalhado"]
+    assert pd.read_excel(parte2, sheet_name="NFe - Detalhado (2)")["Valor Total"].tolist() == [4, 5]
+    assert [l[:3] for l in _indice(gerados[2])] == [
+        ["NFe - Detalhado", 1, "r.xlsx"], ["NFe - Detalhado", 2, os.path.basename(parte2)], ["CTe - Detalhado", 1, "r.xlsx"]]
+
+
+def test_sem_divisao_nao_grava_indice(tmp_path):
+    nfe, cte = _tabelas()
+    saida = str(tmp_path / "r.xlsx")
+
+    assert ExcelReportWriter.gerar_relatorio(saida, None, nfe, cte) == [saida]
+    assert not os.path.exists(tmp_path / "r_indice.csv")
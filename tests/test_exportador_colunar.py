@@ -0,0 +1,47 @@
+# Arquivo: tests/test_exportador_colunar.py
+import datetime
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+import amostras
+
+
+def test_parquet_com_schema_tipado(tmp_path):
+    pasta = tmp_path / "xml"
+    amostras.gravar(pasta, "nfe.xml", amostras.nfe(amostras.chave(35, 1), [100.0, 50.0]))
+    amostras.gravar(pasta, "cte.xml", amostras.cte(amostras.chave(41, 9), [amostras.chave(35, 1)]))
+
+    amostras.executar(str(pasta), str(tmp_path / "r.parquet"))
+
+    tabela = pq.read_table(tmp_path / "r_NFe.parquet")
+    schema = tabela.schema
+    assert schema.field("Chave de Acesso").type == pa.dictionary(pa.int32(), pa.string())
+    assert schema.field("Valor Total").type == pa.float64()
+    assert schema.field("Item").type == pa.int32()
+    assert schema.field("Data Emissão").type == pa.date32()
+    # Parquet não tem time32 em segundos: a hora volta em milissegundos
+    assert schema.field("Hora Emissão").type == pa.time32("ms")
+
+    linhas = tabela.sort_by("Item").to_pylist()
+    assert [l["Valor Total"] for l in linhas] == [100.0, 50.0]
+    assert linhas[0]["Chave de Acesso"] == amostras.chave(35, 1)   # sem o apóstrofo do Excel
+    assert linhas[0]["Data Emissão"] == datetime.date(2025, 2, 3)
+    assert linhas[0]["Hora Emissão"] == datetime.time(10, 0)
+
+    cte = pq.read_table(tmp_path / "r_CTe.parquet")
+    assert cte.schema.field("Chave de Acesso").type == pa.dictionary(pa.int32(), pa.string())
+    assert cte.column("Chave de Acesso").to_pylist() == [amostras.chave(41, 9)]
+
+
+def test_arrow_mantem_a_hora_em_segundos(tmp_path):
+    pasta = tmp_path / "xml"
+    amostras.gravar(pasta, "nfe.xml", amostras.nfe(amostras.chave(35, 1)))
+
+    amostras.executar(str(pasta), str(tmp_path / "r.arrow"))
+
+    with pa.memory_map(str(tmp_path / "r_NFe.arrow")) as origem:
+        tabela = pa.ipc.open_file(origem).read_all()
+    assert tabela.schema.field("Hora Emissão").type == pa.time32("s")
+    assert tabela.schema.field("Item").type == pa.int32()
+    assert tabela.column("Hora Emissão").to_pylist() == [datetime.time(10, 0)]
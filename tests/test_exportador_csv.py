@@ -0,0 +1,47 @@
+# Arquivo: tests/test_exportador_csv.py
+import csv
+import gzip
+
+import pandas as pd
+
+from core.exportador_csv import EscritorCSV
+import amostras
+
+
+def _linhas(caminho):
+    with open(caminho, encoding="utf-8-sig", newline="") as f:
+        return list(csv.reader(f, delimiter=";"))
+
+
+def test_linhas_vao_para_o_disco_conforme_chegam(tmp_path):
+    escritor = EscritorCSV(str(tmp_path / "r.csv"), buffer_linhas=2)
+    nota = lambda n: {"Chave de Acesso": f"'{amostras.chave(35, n)}", "Item": 1, "Valor Total": 10.5}
+
+    escritor.escrever([nota(1)], [])
+    assert escritor.linhas_gravadas == 0   # ainda no buffer
+    escritor.escrever([nota(2)], [])
+    # Buffer cheio: já está no disco, antes do fechar()
+    assert escritor.linhas_gravadas == 2
+    assert [l[0] for l in _linhas(tmp_path / "r_NFe.csv")[1:]] == [amostras.chave(35, 1), amostras.chave(35, 2)]
+
+    escritor.escrever([nota(3)], [{"Chave de Acesso": f"'{amostras.chave(41, 1)}", "Valor Total Frete": 90.0}])
+    gerados = escritor.fechar()
+
+    assert sorted(gerados) == [str(tmp_path / "r_CTe.csv"), str(tmp_path / "r_NFe.csv")]
+    assert len(_linhas(tmp_path / "r_NFe.csv")) == 4
+    assert _linhas(tmp_path / "r_CTe.csv")[1] == [amostras.chave(41, 1), "90.0"]
+
+
+def test_csv_gz_do_processamento_sem_apostrofo_na_chave(tmp_path):
+    pasta = tmp_path / "xml"
+    amostras.gravar(pasta, "nfe.xml", amostras.nfe(amostras.chave(35, 1), [100.0, 50.0]))
+    amostras.gravar(pasta, "cte.xml", amostras.cte(amostras.chave(41, 9), [amostras.chave(35, 1)]))
+
+    amostras.executar(str(pasta), str(tmp_path / "r.csv.gz"))
+
+    with gzip.open(tmp_path / "r_NFe.csv.gz", "rt", encoding="utf-8") as f:
+        nfe = pd.read_csv(f, sep=";", dtype=str)
+    assert nfe["Chave de Acesso"].tolist() == [amostras.chave(35, 1)] * 2
+    rateio = pd.read_csv(tmp_path / "r_Rateio_Frete.csv.gz", sep=";", dtype=str)
+    assert rateio["Chave CTe"].tolist() == [amostras.chave(41, 9)] * 2
+    assert rateio["Chave NFe"].tolist() == [amostras.chave(35, 1)] * 2
@@ -0,0 +1,65 @@
+# Arquivo: tests/test_extrator.py
+import config
+from core.processador import ProcessadorFiscal
+from core.xml_parser import XMLParser
+from core.extrator import ExtratorFiscal
+from core.cache_extracao import CacheExtracao
+from core.fontes import FonteXML
+import amostras
+
+CTE = "http://www.portalfiscal.inf.br/cte"
+CHAVE = "41250200000000000000670010000000011000000018"
+
+CTEOS = f'''<?xml version="1.0"?>
+<cteOSProc xmlns="{CTE}" versao="4.00"><CTeOS versao="4.00"><infCte Id="CTe{CHAVE}" versao="4.00">
+<ide><CFOP>5357</CFOP><serie>1</serie><nCT>1</nCT><dhEmi>2025-02-03T08:00:00-03:00</dhEmi>
+<xMunIni>Curitiba</xMunIni><UFIni>PR</UFIni><xMunFim>Londrina</xMunFim><UFFim>PR</UFFim></ide>
+<emit><CNPJ>55500000000100</CNPJ><xNome>Transportes OS</xNome><enderEmit><UF>PR</UF></enderEmit></emit>
+<vPrest><vTPrest>350.00</vTPrest></vPrest>
+<imp><ICMS><ICMS00><CST>00</CST><vBC>350.00</vBC><pICMS>12.00</pICMS><vICMS>42.00</vICMS></ICMS00></ICMS></imp>
+</infCte></CTeOS><protCTe versao="4.00"><infProt><chCTe>{CHAVE}</chCTe></infProt></protCTe></cteOSProc>'''
+
+
+def test_streaming_le_cteos(tmp_path, monkeypatch):
+    caminho = tmp_path / "cteos.xml"
+    caminho.write_text(CTEOS, encoding="utf-8")
+    esperado = ExtratorFiscal.extrair_documento(XMLParser.carregar(str(caminho)), config.NS_MAP)
+    assert esperado[1], "o CTeOS deve gerar uma linha CTe"
+
+    # Limite 0: todo arquivo vai para o streaming (iterparse)
+    monkeypatch.setattr(config, "LIMITE_STREAMING_MB", 0)
+    ok, linhas_nfe, linhas_cte = ProcessadorFiscal._tarefa_arquivo(str(caminho), config.NS_MAP)
+
+    assert ok
+    assert linhas_nfe == []
+    assert linhas_cte == esperado[1]
+
+
+def test_versao_do_extrator_invalida_cache_sem_cteos(tmp_path):
+    # Cache de antes da correção: o CTeOS grande ficou gravado sem linhas
+    caminho = tmp_path / "cteos.xml"
+    caminho.write_text(CTEOS, encoding="utf-8")
+    fonte = FonteXML(str(caminho))
+    db = str(tmp_path / "cache.sqlite")
+    cache = CacheExtracao(db, "2")
+    cache.guardar(fonte, CacheExtracao.serializar([], []))
+    cache.fechar()
+
+    cache = CacheExtracao(db, ExtratorFiscal.VERSAO)
+    assert cache.obter(fonte) is None
+    cache.fechar()
+
+
+def test_nfe_le_parcelas_do_total(tmp_path):
+    xml = amostras.nfe(amostras.chave(35, 1)).replace(
+        "</ICMS00></ICMS>",
+        "<vICMSDeson>18.00</vICMSDeson><vFCPST>2.00</vFCPST></ICMS00></ICMS>"
+        "<II><vBC>100.00</vBC><vDespAdu>0</vDespAdu><vII>20.00</vII><vIOF>0</vIOF></II>",
+    ).replace("</imposto>", "</imposto><impostoDevol><pDevol>100</pDevol><IPI><vIPIDevol>15.00</vIPIDevol></IPI></impostoDevol>")
+    caminho = tmp_path / "nfe.xml"
+    caminho.write_text(xml, encoding="utf-8")
+
+    linhas_nfe, _ = ExtratorFiscal.extrair_documento(XMLParser.carregar(str(caminho)), config.NS_MAP)
+
+    linha = linhas_nfe[0]
+    assert (linha["ICMS Desonerado"], linha["Valor FCP ST"], linha["Valor II"], linha["IPI Devolvido"]) == (18.0, 2.0, 20.0, 15.0)
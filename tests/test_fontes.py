@@ -0,0 +1,63 @@
+# Arquivo: tests/test_fontes.py
+import zipfile
+
+import pandas as pd
+
+from core.fontes import FonteXML, VarredorFontes
+import amostras
+
+
+def _zip(caminho, membros):
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    with zipfile.ZipFile(caminho, "w", zipfile.ZIP_DEFLATED) as zf:
+        for nome, conteudo in membros.items():
+            zf.writestr(nome, conteudo)
+    return str(caminho)
+
+
+def test_membros_do_zip_sao_lidos_sem_extrair(tmp_path):
+    xml = amostras.nfe(amostras.chave(35, 1))
+    pacote = _zip(tmp_path / "lote.zip", {"a.xml": xml, "sub/b.XML": amostras.nfe(amostras.chave(35, 2)),
+                                         "leiame.txt": "x", "vazia/": ""})
+
+    fontes = list(VarredorFontes.varrer(pacote))
+
+    assert sorted(f.membro for f in fontes) == ["a.xml", "sub/b.XML"]
+    fonte = FonteXML(pacote, "a.xml")
+    assert fonte.ler() == xml.encode()
+    assert fonte.tamanho() == len(xml.encode())
+    assert fonte.nome == "lote.zip/a.xml"
+    assert fonte.id == f"{pacote}::a.xml"
+    assert list(tmp_path.iterdir()) == [tmp_path / "lote.zip"]
+
+
+def test_processa_zip_dentro_da_pasta(tmp_path):
+    pasta = tmp_path / "xml"
+    amostras.gravar(pasta, "solta.xml", amostras.nfe(amostras.chave(35, 1)))
+    _zip(pasta / "lote.zip", {"b.xml": amostras.nfe(amostras.chave(35, 2), [10.0, 20.0])})
+
+    amostras.executar(str(pasta), str(tmp_path / "r.csv"))
+
+    df = pd.read_csv(tmp_path / "r_NFe.csv", sep=";", dtype=str)
+    assert df.groupby("Chave de Acesso").size().to_dict() == {amostras.chave(35, 1): 1, amostras.chave(35, 2): 2}
+
+
+def _nomes(fontes):
+    return sorted(f.nome if f.membro else f.caminho.split("arvore/", 1)[1] for f in fontes)
+
+
+def test_varredura_com_padroes_incluir_excluir(tmp_path):
+    raiz = tmp_path / "arvore"
+    for nome in ("a.xml", "canc_a.xml", "notas.txt", "sub/b.xml", "sub/fundo/c.xml", "backup/d.xml"):
+        amostras.gravar(raiz, nome, "<NFe/>")
+    _zip(raiz / "lote.zip", {"e.xml": "<NFe/>", "canc_e.xml": "<NFe/>"})
+    entrada = str(raiz)
+
+    assert _nomes(VarredorFontes.varrer(entrada)) == [
+        "a.xml", "backup/d.xml", "canc_a.xml", "lote.zip/canc_e.xml", "lote.zip/e.xml", "sub/b.xml", "sub/fundo/c.xml"]
+    assert _nomes(VarredorFontes.varrer(entrada, excluir=("*canc*", "backup/*"))) == [
+        "a.xml", "lote.zip/e.xml", "sub/b.xml", "sub/fundo/c.xml"]
+    # Padrão de caminho relativo: só a pasta sub
+    assert _nomes(VarredorFontes.varrer(entrada, incluir=("sub/*",))) == ["sub/b.xml", "sub/fundo/c.xml"]
+    assert _nomes(VarredorFontes.varrer(entrada, recursivo=False)) == [
+        "a.xml", "canc_a.xml", "lote.zip/canc_e.xml", "lote.zip/e.xml"]
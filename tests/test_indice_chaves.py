@@ -0,0 +1,46 @@
+# Arquivo: tests/test_indice_chaves.py
+import os
+
+import pandas as pd
+import pytest
+
+import amostras
+
+CHAVE = amostras.chave(35, 1)
+
+
+def _itens(caminho):
+    df = pd.read_csv(caminho, sep=";", dtype=str)
+    return df.groupby("Chave de Acesso").size().to_dict()
+
+
+@pytest.fixture
+def duplicados(tmp_path):
+    """Mesma nota em dois arquivos: nfeProc (1 item, mais antigo) e NFe solta (2 itens, mais recente)."""
+    pasta = tmp_path / "xml"
+    proc = amostras.gravar(pasta, "proc.xml", amostras.nfe(CHAVE, [100.0]))
+    solta = amostras.gravar(pasta, "solta.xml", amostras.nfe(CHAVE, [100.0, 50.0], proc=False))
+    os.utime(proc, (1_700_000_000, 1_700_000_000))
+    os.utime(solta, (1_800_000_000, 1_800_000_000))
+    return str(pasta)
+
+
+@pytest.mark.parametrize("politica, itens", [("proc", 1), ("recente", 2), ("nenhuma", 3)])
+def test_politicas_de_duplicados(tmp_path, duplicados, politica, itens):
+    amostras.executar(duplicados, str(tmp_path / "r.csv"), politica_duplicados=politica)
+
+    assert _itens(tmp_path / "r_NFe.csv") == {CHAVE: itens}
+
+
+def test_lote_com_varias_notas_nao_e_descartado(tmp_path):
+    outra = amostras.chave(35, 2)
+    notas = "".join(amostras.nfe(c, [10.0], proc=False).split("?>", 1)[1] for c in (CHAVE, outra))
+    pasta = tmp_path / "xml"
+    amostras.gravar(pasta, "lote.xml", f'<?xml version="1.0"?><enviNFe xmlns="{amostras.NFE}" versao="4.00">'
+                                       f'<idLote>1</idLote>{notas}</enviNFe>')
+    amostras.gravar(pasta, "nota.xml", amostras.nfe(CHAVE, [10.0]))
+
+    amostras.executar(str(pasta), str(tmp_path / "r.csv"), politica_duplicados="proc")
+
+    # O lote fica inteiro (a segunda nota não pode se perder); a nota solta também
+    assert _itens(tmp_path / "r_NFe.csv") == {CHAVE: 2, outra: 1}
@@ -0,0 +1,67 @@
+# Arquivo: tests/test_indice_eventos.py
+import pandas as pd
+import pytest
+
+from core.fontes import FonteXML
+from core.indice_eventos import IndiceEventos, CANCELADA, CANCELADA_SEM_PROTOCOLO
+import amostras
+
+ATIVA, CANCELADA_1, CANCELADA_2 = (amostras.chave(35, n) for n in (1, 2, 3))
+
+
+def _indice(modo):
+    eventos = IndiceEventos(modo)
+    eventos.registrar(FonteXML("canc1.xml"), IndiceEventos.ler_evento(amostras.cancelamento(CANCELADA_1).encode()))
+    sem_retorno = amostras.cancelamento(CANCELADA_2).split("<retEvento", 1)[0] + "</procEventoNFe>"
+    eventos.registrar(FonteXML("canc2.xml"), IndiceEventos.ler_evento(sem_retorno.encode()))
+    # Cancelamento rejeitado pela SEFAZ não vale
+    rejeitado = amostras.cancelamento(ATIVA).replace("<cStat>135</cStat>", "<cStat>573</cStat>")
+    eventos.registrar(FonteXML("rej.xml"), IndiceEventos.ler_evento(rejeitado.encode()))
+    return eventos
+
+
+def _nfe():
+    return pd.DataFrame({"Chave de Acesso": [f"'{c}" for c in (ATIVA, CANCELADA_1, CANCELADA_1, CANCELADA_2)],
+                         "Item": [1, 1, 2, 1]})
+
+
+def test_marcar_insere_situacao_apos_a_chave():
+    eventos = _indice("marcar")
+
+    df, afetadas = eventos.aplicar(_nfe())
+
+    assert (eventos.eventos, eventos.canceladas, eventos.rejeitados) == (3, 2, 1)
+    assert afetadas == 3
+    assert list(df.columns) == ["Chave de Acesso", "Situação", "Item"]
+    assert df["Situação"].tolist() == ["", CANCELADA, CANCELADA, CANCELADA_SEM_PROTOCOLO]
+
+
+def test_excluir_remove_as_linhas_canceladas():
+    df, afetadas = _indice("excluir").aplicar(_nfe())
+
+    assert afetadas == 3
+    assert df.to_dict("list") == {"Chave de Acesso": [f"'{ATIVA}"], "Item": [1]}
+
+
+def test_nenhuma_nao_altera_a_tabela():
+    original = _nfe()
+    df, afetadas = _indice("nenhuma").aplicar(original)
+
+    assert afetadas == 0
+    assert df is original
+
+
+@pytest.mark.parametrize("modo, linhas", [("marcar", 3), ("excluir", 1)])
+def test_evento_na_mesma_pasta_das_notas(tmp_path, modo, linhas):
+    pasta = tmp_path / "xml"
+    amostras.gravar(pasta, "ativa.xml", amostras.nfe(ATIVA))
+    amostras.gravar(pasta, "cancelada.xml", amostras.nfe(CANCELADA_1, [10.0, 20.0]))
+    amostras.gravar(pasta, "evento.xml", amostras.cancelamento(CANCELADA_1))
+
+    amostras.executar(str(pasta), str(tmp_path / "r.parquet"), canceladas=modo)
+
+    df = pd.read_parquet(tmp_path / "r_NFe.parquet")
+    assert len(df) == linhas
+    if modo == "marcar":
+        assert df.groupby("Chave de Acesso", observed=True)["Situação"].first().to_dict() == {
+            ATIVA: "", CANCELADA_1: CANCELADA}
@@ -0,0 +1,62 @@
+# Arquivo: tests/test_normalizacao.py
+import pandas as pd
+
+from core.esquema import CAMPOS_NOTA_NFE, CAMPOS_ITEM_NFE
+from core.normalizacao import SaidaNormalizada, NOME_NOTAS, NOME_ITENS
+import amostras
+
+CHAVE = "Chave de Acesso"
+
+
+def _detalhada(tmp_path):
+    pasta = tmp_path / "xml"
+    amostras.gravar(pasta, "a.xml", amostras.nfe(amostras.chave(35, 1), [100.0, 50.0, 25.0]))
+    amostras.gravar(pasta, "b.xml", amostras.nfe(amostras.chave(35, 2), [70.0]))
+    amostras.executar(str(pasta), str(tmp_path / "detalhada.parquet"))
+    return pd.read_parquet(tmp_path / "detalhada_NFe.parquet")
+
+
+def test_notas_e_itens_reconstroem_a_tabela_detalhada(tmp_path):
+    detalhada = _detalhada(tmp_path)
+
+    (nome_notas, notas, _), (nome_itens, itens, _) = SaidaNormalizada.tabelas(detalhada)
+
+    assert (nome_notas, nome_itens) == (NOME_NOTAS, NOME_ITENS)
+    assert len(notas) == 2 and notas[CHAVE].is_unique
+    assert len(itens) == 4
+    colunas_nota = {c.coluna for c in CAMPOS_NOTA_NFE}
+    colunas_item = {c.coluna for c in CAMPOS_ITEM_NFE}
+    assert set(notas.columns) <= colunas_nota and "Valor Total Nota" in notas.columns
+    assert set(itens.columns) - {CHAVE} <= colunas_item and "Fornecedor/Emitente" not in itens.columns
+    # A junção pela chave devolve a tabela detalhada
+    juntas = itens.merge(notas, on=CHAVE)[list(detalhada.columns)]
+    ordem = [CHAVE, "Item"]
+    assert juntas.sort_values(ordem, ignore_index=True).astype(str).equals(
+        detalhada.sort_values(ordem, ignore_index=True).astype(str))
+
+
+def test_linhas_gravam_cada_nota_uma_vez():
+    gravadas = set()
+    linha = lambda chave, item: {CHAVE: chave, "Numero NF": chave, "Item": item, "Valor Total": 1.0}
+
+    primeiro = SaidaNormalizada.linhas([linha("'1", "1"), linha("'1", "2"), linha("'2", "1")], gravadas)
+    segundo = SaidaNormalizada.linhas([linha("'2", "2"), linha("'3", "1")], gravadas)
+
+    notas, itens = primeiro
+    assert [l[CHAVE] for l in notas[1]] == ["'1", "'2"]
+    assert len(itens[1]) == 3 and CHAVE in itens[2] and "Numero NF" not in itens[2]
+    assert [l[CHAVE] for l in segundo[0][1]] == ["'3"]   # a nota '2 já foi gravada
+    assert gravadas == {"'1", "'2", "'3"}
+
+
+def test_csv_normalizado(tmp_path):
+    pasta = tmp_path / "xml"
+    amostras.gravar(pasta, "a.xml", amostras.nfe(amostras.chave(35, 1), [100.0, 50.0]))
+
+    amostras.executar(str(pasta), str(tmp_path / "r.csv"), normalizada=True)
+
+    notas = pd.read_csv(tmp_path / "r_NFe_Notas.csv", sep=";", dtype=str)
+    itens = pd.read_csv(tmp_path / "r_NFe_Itens.csv", sep=";", dtype=str)
+    assert notas[CHAVE].tolist() == [amostras.chave(35, 1)]
+    assert itens[CHAVE].tolist() == [amostras.chave(35, 1)] * 2
+    assert not (tmp_path / "r_NFe.csv").exists()
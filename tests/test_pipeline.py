@@ -0,0 +1,50 @@
+# Arquivo: tests/test_pipeline.py
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pytest
+
+import config
+from core.fontes import VarredorFontes
+import amostras
+
+
+def test_antecipar_mantem_a_ordem_e_a_janela():
+    em_andamento = []
+    maximo = []
+    trava = threading.Lock()
+
+    def ler(n):
+        with trava:
+            em_andamento.append(n)
+            maximo.append(len(em_andamento))
+        time.sleep(0.01 * (n % 3))   # leituras terminam fora de ordem
+        with trava: em_andamento.remove(n)
+        return n * 10
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        resultado = list(VarredorFontes.antecipar(range(12), ler, executor, janela=4))
+
+    assert resultado == [(n, n * 10) for n in range(12)]
+    assert max(maximo) <= 4
+
+
+@pytest.mark.parametrize("backend", ["threads", "processos"])
+def test_leitura_antecipada_igual_a_leitura_no_worker(tmp_path, monkeypatch, backend):
+    pasta = tmp_path / "xml"
+    for n in range(1, 9):
+        amostras.gravar(pasta, f"nfe_{n}.xml", amostras.nfe(amostras.chave(35, n), [10.0 * n, 1.0]))
+    amostras.gravar(pasta, "cte.xml", amostras.cte(amostras.chave(41, 1), [amostras.chave(35, 1)]))
+
+    saidas = []
+    for threads in (0, 4):
+        monkeypatch.setattr(config, "LEITURA_THREADS", threads)
+        saida = tmp_path / f"r{threads}.csv"
+        amostras.executar(str(pasta), str(saida), backend=backend, max_workers=2)
+        saidas.append(pd.read_csv(tmp_path / f"r{threads}_NFe.csv", sep=";", dtype=str)
+                      .sort_values(["Chave de Acesso", "Item"], ignore_index=True))
+
+    assert len(saidas[0]) == 16
+    assert saidas[0].equals(saidas[1])
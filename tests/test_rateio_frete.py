@@ -0,0 +1,29 @@
+# Arquivo: tests/test_rateio_frete.py
+import pandas as pd
+
+from core.rateio_frete import RateioFrete, RATEADO, NFE_CANCELADA
+
+
+def _nfe(chave, valor_nota, itens):
+    return [{"Chave de Acesso": f"'{chave}", "Numero NF": chave[-3:], "Fornecedor/Emitente": "Fornecedor",
+             "Item": i, "Cod": f"P{i}", "Produto": f"Produto {i}", "Valor Total": valor,
+             "Valor Total Nota": valor_nota} for i, valor in enumerate(itens, 1)]
+
+
+def test_nfe_cancelada_fica_fora_do_rateio():
+    ativa, cancelada = "35" + "1" * 42, "35" + "2" * 42
+    df_nfe = pd.DataFrame(_nfe(ativa, 300.0, [100.0, 200.0]) + _nfe(cancelada, 700.0, [700.0]))
+    df_nfe.insert(1, "Situação", ["", "", "CANCELADA"])
+    df_cte = pd.DataFrame([{"Chave de Acesso": "'41" + "9" * 42, "Numero CTe": "1",
+                            "Emitente (Transportadora)": "Transportes", "CNPJ Emitente": "555",
+                            "Valor Total Frete": 90.0, "NFes Vinculadas": f"{ativa}; {cancelada}"}])
+
+    rateio = RateioFrete.calcular(df_nfe, df_cte, "valor", {cancelada})
+
+    # Todo o frete vai para a nota ativa, na proporção dos itens
+    ok = rateio[rateio["Status Rateio"] == RATEADO]
+    assert ok["Chave NFe"].tolist() == [f"'{ativa}"] * 2
+    assert ok["Frete Rateado"].tolist() == [30.0, 60.0]
+    excluida = rateio[rateio["Chave NFe"] == f"'{cancelada}"]
+    assert excluida["Status Rateio"].tolist() == [NFE_CANCELADA]
+    assert excluida["Frete Rateado"].isna().all()
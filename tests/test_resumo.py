@@ -0,0 +1,15 @@
+# Arquivo: tests/test_resumo.py
+import pandas as pd
+
+from core.resumo import ResumoFiscal
+
+
+def test_mes_sem_data_fica_vazio():
+    df_nfe = pd.DataFrame({"Chave de Acesso": ["'1", "'2", "'3"],
+                           "Data Emissão": ["03/02/2025", "", None],
+                           "Valor Total": [10.0, 20.0, 30.0]})
+
+    resumo = ResumoFiscal.calcular(df_nfe, ["Mês"])
+
+    assert resumo["Código"].tolist() == ["", "2025-02"]
+    assert resumo["Valor Total"].tolist() == [50.0, 10.0]
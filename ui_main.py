@@ -1,6 +1,7 @@
 # Arquivo: interface/ui_main.py (VERSÃO FINAL - COM ÍCONE EMBUTIDO)
 import os
 import sys
+import time
 import tkinter as tk
 from tkinter import filedialog, ttk, scrolledtext, messagebox
 
@@ -8,8 +9,8 @@ from tkinter import filedialog, ttk, scrolledtext, messagebox
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 import config
-from core.processador import ProcessadorFiscal
-from interface.ui_utils import ViewLogger, UIHelper
+from core.processador import ProcessadorFiscal, ProcessamentoCancelado
+from interface.ui_utils import ViewLogger, UIHelper, ExecucaoEmSegundoPlano
 
 # --- FUNÇÃO MÁGICA: Encontra arquivos dentro do .EXE ---
 def resource_path(relative_path):
@@ -27,7 +28,10 @@ class FiscalApp:
     def __init__(self, root):
         self.root = root
         self.logger = None
+        self.execucao = None
+        self.fechando_ate = None   # prazo (monotonic) para a thread terminar antes de fechar
         self.setup_ui()
+        self.root.protocol("WM_DELETE_WINDOW", self.fechar_janela)
         
     def setup_ui(self):
         # Configurações da Janela Principal
@@ -109,6 +113,15 @@ class FiscalApp:
                              height=2, width=45, cursor="hand2")
         self.btn.pack(pady=10)
 
+        # --- BOTÃO CANCELAR (só habilitado durante o processamento) ---
+        self.btn_cancelar = tk.Button(card_frame, text="CANCELAR",
+                                      command=self.cancelar_processamento,
+                                      font=("Segoe UI", 9, "bold"),
+                                      bg="#F0F0F0", fg="#C0392B",
+                                      relief="flat", width=20, cursor="hand2",
+                                      state="disabled")
+        self.btn_cancelar.pack()
+
         # --- BARRA DE PROGRESSO ---
         progress_frame = tk.Frame(card_frame, bg="white")
         progress_frame.pack(fill="x", padx=40, pady=(30, 5))
@@ -139,11 +152,13 @@ class FiscalApp:
         self.logger = ViewLogger(txt_log)
 
     def atualizar_progresso(self, valor, texto):
-        self.progress['value'] = valor
+        # valor None: varredura ainda em andamento (só a contagem no texto)
+        if valor is not None: self.progress['value'] = valor
         self.lbl_progresso.config(text=texto)
-        self.root.update()
 
     def iniciar_processamento(self):
+        if self.execucao is not None: return
+
         # 1. Selecionar Pasta XML
         pasta = filedialog.askdirectory(title="Selecione a pasta com os XMLs")
         if not pasta: return
@@ -159,28 +174,94 @@ class FiscalApp:
         
         if not arquivo_saida: return
         
-        # 3. Executar Lógica
-        try:
-            self.btn.config(state="disabled", text="PROCESSANDO...", bg="#555")
-            self.root.update()
-            
-            saida_final = ProcessadorFiscal.executar(
-                pasta_xml=pasta,
-                caminho_saida=arquivo_saida,
-                callback_log=self.logger.log,
-                callback_progresso=self.atualizar_progresso,
-                callback_retry=tk.messagebox.askretrycancel
-            )
-            
+        # 3. Executar Lógica (em segundo plano: a janela continua respondendo)
+        self.btn.config(state="disabled", text="PROCESSANDO...", bg="#555")
+        self.btn_cancelar.config(state="normal", text="CANCELAR")
+        self.progress['value'] = 0
+
+        self.execucao = ExecucaoEmSegundoPlano(config.UI_INTERVALO_PROGRESSO_MS)
+        self.execucao.iniciar(
+            ProcessadorFiscal.executar,
+            pasta_xml=pasta,
+            caminho_saida=arquivo_saida,
+            callback_log=self.execucao.log,
+            callback_progresso=self.execucao.progresso,
+            callback_retry=self.execucao.perguntar_retry,
+            cancelamento=self.execucao.cancelamento
+        )
+        self.root.after(int(1000 / config.UI_FPS), self.consumir_fila)
+
+    def consumir_fila(self):
+        """Chamado UI_FPS vezes por segundo enquanto o processamento roda."""
+        execucao = self.execucao
+        if execucao is None: return
+
+        ultimo_progresso = None
+        for mensagem in execucao.pendentes():
+            tipo = mensagem[0]
+            if tipo == "log":
+                self.logger.log(mensagem[1])
+            elif tipo == "progresso":
+                # Só o mais recente importa para a barra
+                ultimo_progresso = mensagem[1:]
+            elif tipo == "retry":
+                _, titulo, msg, resposta = mensagem
+                # Fechando: não abre diálogo, só libera a thread para terminar
+                resposta.put(False if self.fechando_ate else messagebox.askretrycancel(titulo, msg))
+            elif tipo in ("fim", "erro") and self.fechando_ate:
+                self.execucao = None
+                self.root.destroy()
+                return
+            elif tipo == "fim":
+                self.finalizar_processamento(saida_final=mensagem[1])
+                return
+            elif tipo == "erro":
+                self.finalizar_processamento(erro=mensagem[1])
+                return
+
+        if self.fechando_ate and time.monotonic() > self.fechando_ate:
+            # A thread não respondeu ao cancelamento no prazo: fecha assim mesmo
+            self.root.destroy()
+            return
+        if ultimo_progresso is not None: self.atualizar_progresso(*ultimo_progresso)
+        self.root.after(int(1000 / config.UI_FPS), self.consumir_fila)
+
+    def finalizar_processamento(self, saida_final=None, erro=None):
+        self.execucao = None
+        cor_padrao = getattr(config, 'COR_PRINCIPAL', '#00061A')
+        self.btn.config(state="normal", text="SELECIONAR PASTA E GERAR RELATÓRIO", bg=cor_padrao)
+        self.btn_cancelar.config(state="disabled", text="CANCELAR")
+
+        if isinstance(erro, ProcessamentoCancelado):
+            self.logger.log("Processamento cancelado.")
+            self.lbl_progresso.config(text="Cancelado pelo usuário.")
+        elif erro is not None:
+            self.logger.log(f"ERRO FATAL: {erro}")
+            UIHelper.erro("Erro no Processamento", str(erro))
+        else:
+            self.atualizar_progresso(100, "Concluído.")
             self.logger.log("Processo finalizado com sucesso.")
             UIHelper.sucesso("Sucesso", f"Relatório salvo em:\n{saida_final}")
             try: os.startfile(saida_final)
             except: pass
 
-        except Exception as e:
-            self.logger.log(f"ERRO FATAL: {e}")
-            UIHelper.erro("Erro no Processamento", str(e))
-        
-        finally:
-            cor_padrao = getattr(config, 'COR_PRINCIPAL', '#00061A')
-            self.btn.config(state="normal", text="SELECIONAR PASTA E GERAR RELATÓRIO", bg=cor_padrao)
+    def cancelar_processamento(self):
+        if self.execucao is None: return
+        self.execucao.cancelar()
+        self.btn_cancelar.config(state="disabled", text="CANCELANDO...")
+        self.logger.log("Cancelando: aguardando os arquivos em andamento...")
+
+    def fechar_janela(self):
+        if self.execucao is None:
+            self.root.destroy()
+            return
+        if self.fechando_ate: return
+        if not UIHelper.perguntar("Processamento em andamento", "Cancelar o processamento e sair?"):
+            return
+        # Cancela e continua consumindo a fila: a janela só fecha quando a thread
+        # avisar o fim (consumir_fila), para não destruir o Tk com ela ainda rodando
+        self.execucao.cancelar()
+        self.fechando_ate = time.monotonic() + config.UI_ESPERA_FECHAR_S
+        self.btn.config(state="disabled")
+        self.btn_cancelar.config(state="disabled", text="FECHANDO...")
+        self.logger.log("Cancelando: a janela fecha quando os arquivos em andamento terminarem...")
@@ -2,6 +2,9 @@
 import tkinter as tk
 from tkinter import messagebox
 import re
+import time
+import queue
+import threading
 
 class ViewLogger:
     """Gerencia o log na tela (ScrolledText)"""
@@ -14,6 +17,61 @@ class ViewLogger:
             self.widget.insert(tk.END, msg + "\n")
             self.widget.see(tk.END)
 
+class ExecucaoEmSegundoPlano:
+    """
+    Roda uma função numa thread separada. A thread nunca toca no Tk: log,
+    progresso e perguntas vão para uma fila que a tela consome com after().
+    Mensagens da fila: ("log", msg), ("progresso", valor, texto),
+    ("retry", titulo, msg, fila_resposta), ("fim", retorno) e ("erro", exceção).
+    """
+    def __init__(self, intervalo_progresso_ms=100):
+        self.fila = queue.Queue()
+        self.cancelamento = threading.Event()
+        self.intervalo = intervalo_progresso_ms / 1000
+        self._ultimo_progresso = 0.0
+        self._thread = None
+
+    # --- Lado da thread de processamento ---
+    def log(self, msg):
+        self.fila.put(("log", msg))
+
+    def progresso(self, valor, texto):
+        """Descarta atualizações mais frequentes que o intervalo (exceto a de 100%)."""
+        agora = time.monotonic()
+        if valor != 100 and agora - self._ultimo_progresso < self.intervalo: return
+        self._ultimo_progresso = agora
+        self.fila.put(("progresso", valor, texto))
+
+    def perguntar_retry(self, titulo, msg):
+        """Pergunta feita pela thread: espera a tela responder."""
+        resposta = queue.Queue(maxsize=1)
+        self.fila.put(("retry", titulo, msg, resposta))
+        return resposta.get()
+
+    # --- Lado da tela ---
+    def iniciar(self, funcao, *args, **kwargs):
+        def alvo():
+            try:
+                self.fila.put(("fim", funcao(*args, **kwargs)))
+            except Exception as e:
+                self.fila.put(("erro", e))
+
+        self._thread = threading.Thread(target=alvo, daemon=True)
+        self._thread.start()
+
+    def cancelar(self):
+        self.cancelamento.set()
+
+    def pendentes(self, limite=500):
+        """Retira até 'limite' mensagens da fila sem bloquear."""
+        mensagens = []
+        while len(mensagens) < limite:
+            try:
+                mensagens.append(self.fila.get_nowait())
+            except queue.Empty:
+                break
+        return mensagens
+
 class UIHelper:
     """Funções utilitárias de interface e formatação visual"""
     
@@ -1,15 +1,25 @@
 # Arquivo: core/validators.py
 import os
+import zipfile
+
+from core.fontes import VarredorFontes
 
 class Validador:
     @staticmethod
-    def validar_pasta_xml(pasta):
+    def validar_pasta_xml(pasta, recursivo=True, incluir=None, excluir=None):
         if not os.path.exists(pasta):
             return False, "A pasta selecionada não existe."
+
+        if os.path.isfile(pasta):
+            if pasta.lower().endswith('.xml'):
+                return True, "Arquivo XML encontrado."
+            if not zipfile.is_zipfile(pasta):
+                return False, "O arquivo selecionado não é um .ZIP válido."
         
-        arqs = [f for f in os.listdir(pasta) if f.lower().endswith('.xml')]
+        # Basta o primeiro: a contagem completa sai durante o processamento
+        primeiro = next(VarredorFontes.varrer(pasta, recursivo, incluir, excluir), None)
         
-        if len(arqs) == 0:
+        if primeiro is None:
             return False, "Nenhum arquivo .XML encontrado nesta pasta."
             
-        return True, f"{len(arqs)} arquivos encontrados."
\ No newline at end of file
+        return True, "Arquivos XML encontrados."
\ No newline at end of file
@@ -2,8 +2,48 @@
 import xml.etree.ElementTree as ET
 import re
 
+import config
+
+try:
+    # Opcional: parser em C mais rápido
+    from lxml import etree as LET
+except ImportError:
+    LET = None
+
+_PARSER_LXML = None
+
 class XMLParser:
-    
+
+    # --- Backend de parse (lxml se disponível/selecionado, senão ElementTree) ---
+    @staticmethod
+    def backend():
+        """'lxml' ou 'etree', conforme config.BACKEND_XML e o que está instalado."""
+        escolha = getattr(config, 'BACKEND_XML', 'etree')
+        if escolha == "etree" or LET is None: return "etree"
+        return "lxml"
+
+    @staticmethod
+    def _parser_lxml():
+        global _PARSER_LXML
+        if _PARSER_LXML is None:
+            # Sem comentários/instruções: os filhos ficam iguais aos do ElementTree
+            _PARSER_LXML = LET.XMLParser(remove_comments=True, remove_pis=True,
+                                         resolve_entities=False)
+        return _PARSER_LXML
+
+    @staticmethod
+    def carregar(origem):
+        """Faz o parse de um caminho ou arquivo aberto e retorna o elemento raiz."""
+        if XMLParser.backend() == "lxml":
+            return LET.parse(origem, XMLParser._parser_lxml()).getroot()
+        return ET.parse(origem).getroot()
+
+    @staticmethod
+    def carregar_bytes(conteudo: bytes):
+        if XMLParser.backend() == "lxml":
+            return LET.fromstring(conteudo, XMLParser._parser_lxml())
+        return ET.fromstring(conteudo)
+
     @staticmethod
     def pegar_texto(elemento: ET.Element, caminho: str, ns: dict) -> str:
         if elemento is None: return ""
@@ -65,9 +105,9 @@ class XMLParser:
     def obter_uf_destinatario(root: ET.Element, ns: dict) -> str:
         try:
             dest = root.find('.//nfe:dest', ns)
-            if dest:
+            if dest is not None:
                 ender = dest.find('nfe:enderDest', ns)
-                if ender: return XMLParser.pegar_texto(ender, 'nfe:UF', ns)
+                if ender is not None: return XMLParser.pegar_texto(ender, 'nfe:UF', ns)
         except: pass
         return ""
 
@@ -95,10 +135,10 @@ class XMLParser:
     def extrair_tributos(det: ET.Element, ns: dict) -> dict:
         dados = {}
         imposto = det.find('nfe:imposto', ns)
-        if not imposto: return dados
+        if imposto is None: return dados
         
         icms = imposto.find('nfe:ICMS', ns)
-        if icms:
+        if icms is not None:
             for child in icms:
                 if 'ICMS' in child.tag:
                     dados["CST"] = XMLParser.pegar_texto(child, 'nfe:CST', ns) or XMLParser.pegar_texto(child, 'nfe:CSOSN', ns)
@@ -133,11 +173,11 @@ class XMLParser:
         """
         dados = {}
         imposto = det.find('nfe:imposto', ns)
-        if not imposto: return dados
+        if imposto is None: return dados
         
         # --- 1. Busca CBS (Contribuição sobre Bens e Serviços) ---
         cbs = imposto.find('nfe:CBS', ns)
-        if cbs:
+        if cbs is not None:
             # Procura CST dentro de subgrupos da CBS (ex: CBS01, CBS02...)
             # Como a tag muda (nfe:CBS01, nfe:CBS02), iteramos nos filhos
             for child in cbs:
@@ -150,7 +190,7 @@ class XMLParser:
 
         # --- 2. Busca IBS (Imposto sobre Bens e Serviços) ---
         ibs = imposto.find('nfe:IBS', ns)
-        if ibs:
+        if ibs is not None:
             for child in ibs:
                 dados["BC_IBS"] = XMLParser.pegar_float(child, 'nfe:vBC', ns)
                 dados["ALIQ_IBS"] = XMLParser.pegar_float(child, 'nfe:pAliq', ns) / 100
@@ -167,10 +207,10 @@ class XMLParser:
     def extrair_pis_cofins(det: ET.Element, ns: dict) -> dict:
         dados = {}
         imposto = det.find('nfe:imposto', ns)
-        if not imposto: return dados
+        if imposto is None: return dados
         
         pis = imposto.find('nfe:PIS', ns)
-        if pis:
+        if pis is not None:
             for child in pis:
                 dados["PIS_CST"] = XMLParser.pegar_texto(child, 'nfe:CST', ns)
                 dados["PIS_BC"] = XMLParser.pegar_float(child, 'nfe:vBC', ns)
@@ -179,7 +219,7 @@ class XMLParser:
                 if "CST" in dados: break
         
         cof = imposto.find('nfe:COFINS', ns)
-        if cof:
+        if cof is not None:
             for child in cof:
                 dados["COF_CST"] = XMLParser.pegar_texto(child, 'nfe:CST', ns)
                 dados["COF_BC"] = XMLParser.pegar_float(child, 'nfe:vBC', ns)
@@ -192,9 +232,9 @@ class XMLParser:
     def extrair_ipi(det: ET.Element, ns: dict) -> dict:
         dados = {}
         ipi = det.find('.//nfe:imposto/nfe:IPI', ns)
-        if ipi:
+        if ipi is not None:
             ipitrib = ipi.find('nfe:IPITrib', ns)
-            if ipitrib:
+            if ipitrib is not None:
                 dados["IPI_CST"] = XMLParser.pegar_texto(ipitrib, 'nfe:CST', ns)
                 dados["IPI_BC"] = XMLParser.pegar_float(ipitrib, 'nfe:vBC', ns)
                 dados["IPI_ALIQ"] = XMLParser.pegar_float(ipitrib, 'nfe:pIPI', ns) / 100
@@ -207,19 +247,19 @@ class XMLParser:
         toma4 = root.find('.//cte:ide/cte:toma4', ns)
         
         toma_ele = None
-        if toma: 
+        if toma is not None: 
             toma_tag = toma.find('cte:toma', ns)
             tipo = toma_tag.text if toma_tag is not None else '0'
             # 0: Remetente, 1: Expedidor, 2: Recebedor, 3: Destinatário
             mapa = {'0': 'rem', '1': 'exped', '2': 'receb', '3': 'dest'}
             role = mapa.get(tipo, 'rem')
             toma_ele = root.find(f'.//cte:{role}', ns)
-        elif toma4:
+        elif toma4 is not None:
             toma_ele = toma4
             
         nome = ""
         doc = ""
-        if toma_ele:
+        if toma_ele is not None:
             nome = XMLParser.pegar_texto(toma_ele, 'cte:xNome', ns)
             doc = XMLParser.pegar_texto(toma_ele, 'cte:CNPJ', ns) or XMLParser.pegar_texto(toma_ele, 'cte:CPF', ns)
             
@@ -228,9 +268,9 @@ class XMLParser:
     @staticmethod
     def extrair_origem(node: ET.Element, ns: dict) -> str:
         imp = node.find('nfe:imposto', ns)
-        if not imp: return ""
+        if imp is None: return ""
         icms = imp.find('nfe:ICMS', ns)
-        if not icms: return ""
+        if icms is None: return ""
         
         for child in icms:
             orig = XMLParser.pegar_texto(child, 'nfe:orig', ns)
@@ -241,7 +281,11 @@ class XMLParser:
     def obter_data_hora(root: ET.Element, ns: dict, tipo="NFe"):
         prefix = "nfe" if tipo == "NFe" else "cte"
         raw = XMLParser.pegar_texto(root, f'.//{prefix}:ide/{prefix}:dhEmi', ns)
-        
+        return XMLParser.formatar_data_hora(raw)
+
+    @staticmethod
+    def formatar_data_hora(raw: str):
+        """Converte o dhEmi ISO (AAAA-MM-DDTHH:MM:SS-03:00) em ('DD/MM/AAAA', 'HH:MM:SS')."""
         if 'T' in raw:
             try:
                 data_iso, hora_full = raw.split('T')
@@ -289,10 +333,10 @@ class XMLParser:
         rntrc = ""
         try:
             rodo = root.find('.//cte:rodo', ns)
-            if rodo:
+            if rodo is not None:
                 rntrc = XMLParser.pegar_texto(rodo, 'cte:RNTRC', ns)
                 veic = rodo.find('cte:veic', ns)
-                if veic:
+                if veic is not None:
                     placa = XMLParser.pegar_texto(veic, 'cte:placa', ns)
         except: pass
         return placa, rntrc
@@ -332,12 +376,12 @@ class XMLParser:
         }
         try:
             rem = root.find('.//cte:rem', ns)
-            if rem:
+            if rem is not None:
                 atores["Remetente_Nome"] = XMLParser.pegar_texto(rem, 'cte:xNome', ns)
                 atores["Remetente_CNPJ"] = XMLParser.pegar_texto(rem, 'cte:CNPJ', ns) or XMLParser.pegar_texto(rem, 'cte:CPF', ns)
 
             dest = root.find('.//cte:dest', ns)
-            if dest:
+            if dest is not None:
                 atores["Destinatario_Nome"] = XMLParser.pegar_texto(dest, 'cte:xNome', ns)
                 atores["Destinatario_CNPJ"] = XMLParser.pegar_texto(dest, 'cte:CNPJ', ns) or XMLParser.pegar_texto(dest, 'cte:CPF', ns)
         except: pass